@@ -27,9 +27,12 @@ __all__ = [
     'Machine', 'State', 'Mode',
     'NullMachine', 'NullState', 'NullMode',
     'Position', 'CoordinateSystem',
+    'Toolpath', 'Simulation', 'TimeEstimator', 'MotionLimits',
 
     # Line
     'Line',
+    # File
+    'parse_file', 'parse_file_parallel', 'ParseCache', 'CheckpointIndex', 'GCodeWriter',
     # Block
     'Block',
     # Comment
@@ -175,10 +178,19 @@ from .machine import (
     Machine, State, Mode,
     NullMachine, NullState, NullMode,
 )
+from .toolpath import Toolpath
+from .simulation import Simulation
+from .timing import TimeEstimator, MotionLimits
 
 # Line
 from .line import Line
 
+# File
+from .parser import parse_file, parse_file_parallel
+from .cache import ParseCache
+from .checkpoint import CheckpointIndex
+from .writer import GCodeWriter
+
 # Block
 from .block import Block
 
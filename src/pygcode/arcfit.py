@@ -0,0 +1,386 @@
+from math import atan2, hypot, pi, sqrt
+
+from .gcodes import word_gcode_class
+from .gcodes_base import GCodeMotion
+from .machine import Machine, GCodeIncrementalDistanceMode
+from .toolpath import Toolpath
+from .line import Line
+from .words import Word
+from .pipeline import LineProcessor
+
+
+# ==================== Linear Motion (G1) --> Arcs (G2,G3) ====================
+
+# Plane selection word value: (<1st plane axis>, <2nd plane axis>, <normal axis>)
+#   (axes ordered so a positive angle is counter-clockwise about the normal)
+PLANE_AXES = {
+    17: ('X', 'Y', 'Z'),  # G17
+    18: ('Z', 'X', 'Y'),  # G18
+    19: ('Y', 'Z', 'X'),  # G19
+}
+ARC_CENTER_LETTERS = {'X': 'I', 'Y': 'J', 'Z': 'K'}
+
+LINEAR_MOVE_WORD = Word('G', 1)
+ARC_CW_WORD = Word('G', 2)
+ARC_CCW_WORD = Word('G', 3)
+ABSOLUTE_ARC_DISTANCE_WORD = Word('G', 90.1)
+
+
+def circle_through(p1, p2, p3):
+    """
+    Circle through 3 points (of a plane)
+    :param p1: point as (a, b) tuple
+    :return: ((<center a>, <center b>), <radius>), or None if points are collinear
+    """
+    ((ax, ay), (bx, by), (cx, cy)) = (p1, p2, p3)
+    d = 2. * (ax * (by - cy) + bx * (cy - ay) + cx * (ay - by))
+    if d == 0:
+        return None
+    (a2, b2, c2) = (ax * ax + ay * ay, bx * bx + by * by, cx * cx + cy * cy)
+    center = (
+        (a2 * (by - cy) + b2 * (cy - ay) + c2 * (ay - by)) / d,
+        (a2 * (cx - bx) + b2 * (ax - cx) + c2 * (bx - ax)) / d,
+    )
+    return (center, hypot(ax - center[0], ay - center[1]))
+
+
+class LinearMoveRuns(LineProcessor):
+    """
+    Base of streaming transforms of runs of linear moves (G1).
+
+    Lines are processed by a machine; consecutive G1 moves (in absolute
+    distance mode, only moving the run's axes, extruding, and setting the
+    feed rate) are held back while :meth:`_fit` accepts them. Runs are
+    ended by any other line (yielded as-is), and by a feed rate change;
+    lines of a run are replaced with those of :meth:`_run_lines`.
+
+    Extrusion is tracked in the extruder's distance mode (M82 / M83).
+    """
+    # (extruder positioning mode words: see Toolpath)
+    E_MODE_WORDS = Toolpath.E_MODE_WORDS
+    E_SET_POSITION_WORD = Toolpath.E_SET_POSITION_WORD
+
+    def __init__(self, machine=None, max_segments=200):
+        """
+        :param machine: Machine instance to process gcode with (default: Machine())
+        :param max_segments: maximum number of lines in a run
+        """
+        if machine is None:
+            machine = Machine()
+        self.machine = machine
+        self.max_segments = max_segments
+
+        # Extruder (not kept by the machine)
+        self.e = 0.0
+        self.e_relative = False
+
+        # Current run: vertices (points of run's axes: from the run's start), and for each line:
+        #   (<line>, <G1 gcode>, <extrusion>, <extruder position after line>)
+        self._points = []
+        self._segments = []
+        self._axes = None  # axes of run's points
+
+    # --- Candidate lines
+    def _run_axes(self):
+        # axes a run's lines may move (in the machine's current mode), None if there can't be a run
+        raise NotImplementedError("_run_axes must be overridden")
+
+    def _linear_move(self, line):
+        # G1 gcode of a line that's only a linear move (otherwise None)
+        if line.comment or line.macro or not line.block:
+            return None
+        mode = self.machine.mode
+        if isinstance(mode.distance, GCodeIncrementalDistanceMode):
+            return None
+        gcodes = self.machine.block_modal_gcodes(line.block)
+        if (len(gcodes) != 1) or (gcodes[0].word != LINEAR_MOVE_WORD):
+            return None
+        gcode = gcodes[0]
+        axes = self._run_axes()
+        if axes is None:
+            return None
+        for letter in gcode.params:
+            if (letter not in axes) and (letter not in ('E', 'F')):
+                return None
+        return gcode
+
+    # --- Processing
+    def _process(self, line):
+        # process line with the machine (also tracking the extruder)
+        start_e = self.e
+        if not line.block:
+            return 0.
+        for gcode in self.machine.block_modal_gcodes(line.block):
+            key = (gcode.word.letter, gcode.word.value)
+            if key in self.E_MODE_WORDS:
+                self.e_relative = self.E_MODE_WORDS[key]
+            elif 'E' in gcode.params:
+                e = float(gcode.params['E'].value)
+                if key == self.E_SET_POSITION_WORD:
+                    (self.e, start_e) = (e, e)  # (not extruded)
+                elif isinstance(gcode, GCodeMotion):
+                    self.e = (self.e + e) if self.e_relative else e
+        self._process_block(line.block)
+        return self.e - start_e
+
+    def _point(self, axes):
+        pos = self.machine.pos
+        return tuple(getattr(pos, axis) for axis in axes)
+
+    def process_line(self, line, state=None):
+        """
+        Process a line
+        :param line: Line instance
+        :param state: LineState of line (see LineProcessor)
+        :return: list of Line instances that are ready (in order)
+        """
+        self._follow(state)
+        gcode = self._linear_move(line)
+        if gcode is None:
+            output = self.flush()
+            self._process(line)
+            return output + [line]
+
+        output = []
+        axes = self._run_axes()
+        if self._segments and ((axes != self._axes) or ('F' in gcode.params)):
+            output += self.flush()  # (feed rate changes: new run)
+        if not self._segments:
+            (self._points, self._axes) = ([self._point(axes)], axes)
+
+        extrusion = self._process(line)
+        self._points.append(self._point(axes))
+        self._segments.append((line, gcode, extrusion, self.e))
+        while not self._fit(self._points, self._segments):
+            # doesn't fit: lines before the last line, then try again without them
+            output += self._yield_segments(self._unfit_count())
+        if len(self._segments) >= self.max_segments:
+            output += self.flush()
+        return output
+
+    def process_lines(self, lines):
+        """
+        Process lines, and end the last run
+        :param lines: iterable of Line instances
+        :return: generator of Line instances
+        """
+        for line in lines:
+            for output_line in self.process_line(line):
+                yield output_line
+        for output_line in self.flush():
+            yield output_line
+
+    def flush(self):
+        """
+        End the current run (eg: at the end of the program)
+        :return: list of Line instances
+        """
+        return self._yield_segments(len(self._segments))
+
+    @property
+    def held(self):
+        """Number of lines held back (the latest lines processed: the current run)"""
+        return len(self._segments)
+
+    def _yield_segments(self, count):
+        # Lines replacing the first <count> lines of the run
+        (points, segments) = (self._points[:count + 1], self._segments[:count])
+        (self._points, self._segments) = (self._points[count:], self._segments[count:])
+        if not segments:
+            return []
+        return self._run_lines(points, segments)
+
+    def _fit(self, points, segments):
+        # True if lines (between points) can (still) be replaced
+        return True
+
+    def _unfit_count(self):
+        # number of lines replaced when the last line doesn't fit
+        return len(self._segments) - 1
+
+    def _run_lines(self, points, segments):
+        # Lines replacing a run's lines (between points)
+        return [segment[0] for segment in segments]
+
+    # --- Utilities
+    def _uniform_extrusion(self, points, segments, e_tolerance):
+        # True if extrusion per length is the same (within e_tolerance), or there is none
+        extrusions = [segment[2] for segment in segments]
+        if not any(extrusions):
+            return True
+        lengths = [_distance(p1, p2) for (p1, p2) in zip(points[:-1], points[1:])]
+        if not all(extrusions) or not all(lengths):
+            return False
+        rates = [e / l for (e, l) in zip(extrusions, lengths)]
+        mean = sum(rates) / len(rates)
+        return (max(rates) - min(rates)) <= e_tolerance * abs(mean)
+
+    def _move_text(self, word, params):
+        # text of a gcode line: params as [(<letter>, <value>, <decimal places>), ...]
+        return ' '.join([str(word)] + [
+            '%s%s' % (letter, _format_number(value, places))
+            for (letter, value, places) in params
+        ])
+
+
+class ArcFitter(LinearMoveRuns):
+    """
+    Streaming conversion of runs of linear moves (G1) into arcs (G2, G3).
+
+    Lines are processed by a machine; consecutive G1 moves (in absolute
+    distance mode, in the selected plane only) are held back while they
+    can be replaced by a single arc:
+
+    - every vertex is within ``tolerance`` of the arc,
+      and so is the middle of every line (the chord's sagitta)
+    - all lines turn the same way, less than a full circle in total
+    - extrusion per unit of length is the same for all lines (within
+      ``e_tolerance``, a proportion), so the arc's extrusion can be
+      interpolated along it (as marlin does); or nothing is extruded
+
+    The arc is given the end point, the center (as IJK), the feed rate (if
+    given with the first line), and the run's total extrusion (``E``, in
+    the extruder's distance mode: M82 / M83). Any other line is yielded
+    as-is, and ends the run.
+
+    .. code-block:: python
+
+        from pygcode import parse_file
+        from pygcode.arcfit import fit_arcs
+        for line in fit_arcs(parse_file('part.gcode')):
+            print(line.text)
+
+    """
+
+    def __init__(self, machine=None, tolerance=0.05, e_tolerance=0.05,
+                 min_segments=3, max_segments=200, max_radius=1000.,
+                 decimal_places=3, e_decimal_places=5):
+        """
+        :param machine: Machine instance to process gcode with (default: Machine())
+        :param tolerance: maximum distance lines (vertices & mid-points) may be from an arc
+        :param e_tolerance: maximum variation of extrusion per unit of length (proportion)
+        :param min_segments: minimum number of lines replaced by an arc
+        :param max_segments: maximum number of lines replaced by an arc
+        :param max_radius: maximum arc radius (nearly straight lines are left as they are)
+        :param decimal_places: decimal places of arc coordinates & center
+        :param e_decimal_places: decimal places of arc's extrusion
+        """
+        super(ArcFitter, self).__init__(machine=machine, max_segments=max_segments)
+        self.tolerance = tolerance
+        self.e_tolerance = e_tolerance
+        self.min_segments = max(min_segments, 2)
+        self.max_radius = max_radius
+        self.decimal_places = decimal_places
+        self.e_decimal_places = e_decimal_places
+
+        # Planes arcs can be in (the dialect's arc gcodes accept their center letters)
+        self._arc_planes = set(
+            plane for plane in PLANE_AXES.values()
+            if all(
+                set(ARC_CENTER_LETTERS[a] for a in plane[:2]) <= set(word_gcode_class(w).param_letters)
+                for w in (ARC_CW_WORD, ARC_CCW_WORD)
+            )
+        )
+
+    # --- Candidate lines
+    def _run_axes(self):
+        plane = self.machine.mode.plane_selection
+        plane = PLANE_AXES.get(plane.word.value if plane else 17, None)
+        if (plane is None) or (plane not in self._arc_planes):
+            return None
+        return plane[:2]
+
+    def _unfit_count(self):
+        # arc (or line) before the last line
+        count = len(self._segments) - 1
+        return count if (count >= self.min_segments) else 1
+
+    def _run_lines(self, points, segments):
+        # an arc if there are enough lines
+        if len(segments) >= self.min_segments:
+            return [self._arc_line(points, segments)]
+        return [segment[0] for segment in segments]
+
+    # --- Arcs
+    def _circle(self, points):
+        return circle_through(points[0], points[len(points) // 2], points[-1])
+
+    def _fit(self, points, segments):
+        # True if lines (between points) can be replaced by an arc
+        if len(segments) < 2:
+            return True
+        circle = self._circle(points)
+        if circle is None:
+            return False
+        ((ca, cb), radius) = circle
+        if radius > self.max_radius:
+            return False
+
+        # Vertices & chord mid-points are close to the arc
+        tolerance = self.tolerance
+        for (i, (a, b)) in enumerate(points):
+            if abs(hypot(a - ca, b - cb) - radius) > tolerance:
+                return False
+            if i:
+                (pa, pb) = points[i - 1]
+                if abs(hypot((a + pa) / 2. - ca, (b + pb) / 2. - cb) - radius) > tolerance:
+                    return False
+
+        # Lines turn the same way, less than a full circle
+        angles = [atan2(b - cb, a - ca) for (a, b) in points]
+        deltas = [((a2 - a1 + pi) % (2 * pi)) - pi for (a1, a2) in zip(angles[:-1], angles[1:])]
+        if not (all(d > 0 for d in deltas) or all(d < 0 for d in deltas)):
+            return False
+        if abs(sum(deltas)) >= 2 * pi:
+            return False
+
+        # Extrusion per length is the same (or there is none)
+        return self._uniform_extrusion(points, segments, self.e_tolerance)
+
+    def _arc_line(self, points, segments):
+        # Line with an arc gcode replacing the given lines
+        ((ca, cb), radius) = self._circle(points)
+        (start, end) = (points[0], points[-1])
+        ccw = ((start[0] - ca) * (points[1][1] - cb) - (start[1] - cb) * (points[1][0] - ca)) > 0
+        word = ARC_CCW_WORD if ccw else ARC_CW_WORD
+
+        arc_ijk_distance = self.machine.mode.arc_ijk_distance
+        if (arc_ijk_distance is not None) and (arc_ijk_distance.word == ABSOLUTE_ARC_DISTANCE_WORD):
+            center = (ca, cb)
+        else:
+            center = (ca - start[0], cb - start[1])
+
+        (a1, a2) = self._axes
+        params = [
+            (a1, end[0], self.decimal_places), (a2, end[1], self.decimal_places),
+            (ARC_CENTER_LETTERS[a1], center[0], self.decimal_places),
+            (ARC_CENTER_LETTERS[a2], center[1], self.decimal_places),
+        ]
+        extrusions = [segment[2] for segment in segments]
+        if any(extrusions):
+            e = sum(extrusions) if self.e_relative else segments[-1][3]
+            params.append(('E', e, self.e_decimal_places))
+        first_params = segments[0][1].params
+        if 'F' in first_params:
+            params.append(('F', float(first_params['F'].value), self.decimal_places))
+
+        return Line(self._move_text(word, params))
+
+
+def _format_number(value, places):
+    text = ('%.*f' % (places, value)).rstrip('0').rstrip('.')
+    return '0' if text in ('', '-0') else text
+
+
+def _distance(p1, p2):
+    return sqrt(sum((b - a) ** 2 for (a, b) in zip(p1, p2)))
+
+
+def fit_arcs(lines, **kwargs):
+    """
+    Replace runs of linear moves (G1) with arcs (G2, G3) (see ArcFitter)
+    :param lines: iterable of Line instances
+    :param kwargs: ArcFitter parameters
+    :return: generator of Line instances
+    """
+    return ArcFitter(**kwargs).process_lines(lines)
@@ -1,57 +1,152 @@
 import re
-from .words import text2words
+from .words import text2words, dialect_word_map
 from .gcodes import words2gcodes
 from . import dialects
 
 
 class Block(object):
     """GCode block (effectively any gcode file line that defines any <word><value>)"""
+    __slots__ = (
+        '_raw_text', '_text', '_words', '_gcodes', '_modal_params',
+        'dialect', '_verify', '_cache', '_dirty',
+    )
 
-    def __init__(self, text=None, dialect=None, verify=True):
+    def __init__(self, text=None, dialect=None, verify=True, lazy=False, cache=None):
         """
         Block Constructor
         :param text: gcode line content (including comments) as string
         :type text: :class:`str`
         :param verify: verify given codes (modal & non-modal are not repeated)
         :type verify: :class:`bool`
+        :param lazy: if True, words & gcodes are parsed when first accessed
+        :type lazy: :class:`bool`
+        :param cache: cache to get parsed words & gcodes from
+        :type cache: :class:`ParseCache <pygcode.cache.ParseCache>`
 
         .. note::
 
             State & machine specific codes cannot be verified at this point;
             they must be processed by a virtual machine to be fully verified.
 
+        .. note::
+
+            When ``lazy``, parsing (and verification) errors are raised on
+            first access of :attr:`words` or :attr:`gcodes`, not here.
+
         """
 
         self._raw_text = None
         self._text = None
-        self.words = []
-        self.gcodes = []
-        self.modal_params = []
+        self._words = []
+        self._gcodes = []
+        self._modal_params = []
 
         if dialect is None:
             dialect = dialects.get_default()
         self.dialect = dialect
 
-        self._word_map = getattr(getattr(dialects, dialect), 'WORD_MAP')
+        self._verify = verify
+        self._cache = cache
+        self._dirty = False  # words, gcodes or modal parameters set (see dirty)
 
-        # clean up block string
         if text:
             self._raw_text = text  # unaltered block content (before alteration)
-            text = re.sub(r'(^\s+|\s+$)', '', text) # remove whitespace padding
-            text = re.sub(r'\s+', ' ', text) # remove duplicate whitespace with ' '
-            self._text = text  # cleaned up block content
+            (self._words, self._gcodes, self._modal_params) = (None, None, None)  # not yet parsed
+            if not lazy:
+                self._parse_gcodes()
+
+    def _parse_words(self):
+        # clean up block string
+        text = re.sub(r'(^\s+|\s+$)', '', self._raw_text) # remove whitespace padding
+        text = re.sub(r'\s+', ' ', text) # remove duplicate whitespace with ' '
+        self._text = text  # cleaned up block content
+
+        if self._cache is not None:
+            # Get words & gcodes from cache
+            (self._words, self._gcodes, self._modal_params) = self._cache.parse(text, self.dialect)
+            self._cache = None  # (no longer needed)
+            if self._verify:
+                self._assert_gcodes()
+        else:
+            # Get words from text
+            self._words = list(text2words(self._text, dialect=self.dialect))
 
-            # Get words from text, and group into gcodes
-            self.words = list(text2words(self._text))
-            (self.gcodes, self.modal_params) = words2gcodes(self.words)
+    def _parse_gcodes(self):
+        words = self.words  # (gcodes may also be parsed)
+        if self._gcodes is None:
+            # Group words into gcodes
+            (self._gcodes, self._modal_params) = words2gcodes(words)
 
             # Verification
-            if verify:
+            if self._verify:
                 self._assert_gcodes()
 
+    @property
+    def words(self):
+        if self._words is None:
+            self._parse_words()
+        return self._words
+
+    @words.setter
+    def words(self, value):
+        self._words = value
+        self._dirty = True
+
+    @property
+    def gcodes(self):
+        if self._gcodes is None:
+            self._parse_gcodes()
+        return self._gcodes
+
+    @gcodes.setter
+    def gcodes(self, value):
+        if self._gcodes is None:
+            self._parse_gcodes()  # (also sets modal_params)
+        self._gcodes = value
+        self._dirty = True
+
+    @property
+    def modal_params(self):
+        if self._modal_params is None:
+            self._parse_gcodes()
+        return self._modal_params
+
+    @modal_params.setter
+    def modal_params(self, value):
+        if self._modal_params is None:
+            self._parse_gcodes()  # (also sets gcodes)
+        self._modal_params = value
+        self._dirty = True
+
+    @property
+    def dirty(self):
+        """
+        True if block has been changed since it was parsed: its words, gcodes
+        or modal parameters set, or any of its gcodes changed (see GCode.dirty)
+
+        .. note::
+
+            Lists changed in place (eg: ``block.gcodes.append(gcode)``) are
+            not detected; set ``block.dirty = True`` after changing them.
+
+        """
+        if self._dirty:
+            return True
+        if self._gcodes:
+            for gcode in self._gcodes:
+                if gcode._dirty:
+                    return True
+        return False
+
+    @dirty.setter
+    def dirty(self, value):
+        self._dirty = bool(value)
+
     @property
     def text(self):
-        if self._text:
+        if self._words is None:
+            self._parse_words()  # (sets cleaned up text)
+        if self._text and not self.dirty:
             return self._text
         return str(self)
 
@@ -79,7 +174,8 @@ class Block(object):
                 modal_groups.add(gc.modal_group)
 
     def __getattr__(self, k):
-        if k in self._word_map:
+        # (word letters are single characters; unset slots are not looked up)
+        if (len(k) == 1) and (k in dialect_word_map(self.dialect)):
             for w in self.words:
                 if w.letter == k:
                     return w
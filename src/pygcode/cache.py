@@ -0,0 +1,90 @@
+from collections import OrderedDict
+from copy import copy
+
+from .words import dialect_tokenizer, FrozenWord
+from .gcodes import words2gcodes
+from . import dialects
+
+
+class ParseCache(object):
+    """
+    Bounded (least recently used) cache of parsed blocks, keyed by
+    (dialect, cleaned up block text).
+
+    Cached words are :class:`FrozenWord <pygcode.words.FrozenWord>` instances,
+    shared by every block parsed from the same text. By default, each block
+    gets its own (shallow) copy of each gcode; changing a parameter copies the
+    (frozen) word it replaces. Unless ``copy`` is set, gcodes are also shared,
+    and frozen (see :meth:`GCode.freeze <pygcode.gcodes_base.GCode.freeze>`):
+    changing them raises an AttributeError.
+
+    .. code-block:: python
+
+        from pygcode import ParseCache, parse_file
+        cache = ParseCache(max_size=1024)
+        for line in parse_file('part.gcode', cache=cache):
+            pass
+        print(cache.hits, cache.misses, cache.evictions)
+
+    """
+    DEFAULT_MAX_SIZE = 4096
+
+    def __init__(self, max_size=DEFAULT_MAX_SIZE, copy=True):
+        """
+        :param max_size: maximum number of cached blocks
+        :param copy: if True, gcodes are copied for each block (so they may be changed),
+                     otherwise (immutable) gcodes are shared
+        """
+        assert max_size > 0, "invalid max_size: %r" % max_size
+        self.max_size = max_size
+        self.copy = copy
+        self._entries = OrderedDict()  # of the form: {(<dialect>, <text>): (<words>, <gcodes>, <modal params>), ... }
+
+        # Counters
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __repr__(self):
+        return "<{class_name}: {size}/{max_size} hits={hits} misses={misses} evictions={evictions}>".format(
+            class_name=self.__class__.__name__,
+            size=len(self), max_size=self.max_size,
+            hits=self.hits, misses=self.misses, evictions=self.evictions,
+        )
+
+    def clear(self):
+        """Remove all cached blocks, and reset counters"""
+        self._entries.clear()
+        self.hits = self.misses = self.evictions = 0
+
+    def parse(self, text, dialect=None):
+        """
+        Parse (cleaned up) block text, or get its cached result
+        :param text: block text with comments removed, and whitespace cleaned up
+        :param dialect: dialect name (default if None)
+        :return: tuple of new lists: ([<Word>, ...], [<GCode>, ...], [<modal param Word>, ...])
+        """
+        if dialect is None:
+            dialect = dialects.get_default()
+        key = (dialect, text)
+        try:
+            (words, gcodes, modal_params) = self._entries[key]
+        except KeyError:
+            self.misses += 1
+            words = tuple(dialect_tokenizer(dialect).iter_words(text, dialect=dialect, word_class=FrozenWord))
+            (gcodes, modal_params) = words2gcodes(words)
+            (gcodes, modal_params) = (tuple(g.freeze() for g in gcodes), tuple(modal_params))
+            self._entries[key] = (words, gcodes, modal_params)
+            if len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)  # least recently used
+                self.evictions += 1
+        else:
+            self.hits += 1
+            self._entries.move_to_end(key)
+
+        if self.copy:
+            return (list(words), [copy(g) for g in gcodes], list(modal_params))
+        return (list(words), list(gcodes), list(modal_params))
@@ -0,0 +1,287 @@
+import io
+import json
+import os
+from bisect import bisect_right
+from collections import namedtuple
+from itertools import chain
+
+from .machine import Machine, CoordinateSystem
+from .gcodes import text2gcodes
+from .parser import parse_file
+from . import dialects
+
+DEFAULT_INTERVAL = 1000  # lines between checkpoints
+SIDECAR_SUFFIX = '.checkpoints.json'
+FORMAT_VERSION = 2
+
+
+# A machine's snapshot (as json compatible data), taken before the line at line_number & byte_offset
+Checkpoint = namedtuple('Checkpoint', ['line_number', 'byte_offset', 'data'])
+
+
+def sidecar_path(gcode_path):
+    """
+    Checkpoint index filename for the given gcode file
+    :param gcode_path: gcode filename
+    :return: filename of the index, next to the gcode file
+    """
+    return gcode_path + SIDECAR_SUFFIX
+
+
+def _file_stamp(path):
+    # (size, modification time) of a file: an index is stale if either changed
+    stat = os.stat(path)
+    return (stat.st_size, stat.st_mtime)
+
+
+# --- Snapshot (de)serialization
+def _position2data(pos):
+    return [''.join(sorted(pos.axes)), pos.unit, dict((k, v) for (k, v) in pos.values.items() if v)]
+
+
+def _data2position(machine, data):
+    (axes, unit, values) = data
+    return machine.Position(axes=axes, unit=unit, **values)
+
+
+def _machine2data(machine):
+    state = machine.state
+    return {
+        'mode': [str(g) for g in machine.mode.gcodes],
+        'state': {
+            'cur_coord_sys': state.cur_coord_sys,
+            'offset': _position2data(state.offset),
+            'coord_systems': dict(
+                (str(i), _position2data(cs.offset))
+                for (i, cs) in state.coord_systems.items()
+            ),
+        },
+        'abs_pos': _position2data(machine.abs_pos),
+        'abs_range_min': _position2data(machine.abs_range_min),
+        'abs_range_max': _position2data(machine.abs_range_max),
+    }
+
+
+def _data2snapshot(machine, data, dialect=None):
+    mode = machine.mode.__class__(set_default=False)
+    for gcode_str in data['mode']:
+        mode.set_mode(*text2gcodes(gcode_str, dialect=dialect))
+
+    state = machine.state.snapshot()  # (keeps any other attributes)
+    state['_cur_coord_sys'] = data['state']['cur_coord_sys']
+    state['_offset'] = _data2position(machine, data['state']['offset'])
+    coord_systems = {}
+    for (i, offset_data) in data['state']['coord_systems'].items():
+        coord_systems[int(i)] = cs = CoordinateSystem(axes=machine.axes)
+        cs.offset = _data2position(machine, offset_data)
+    state['_coord_systems'] = coord_systems
+
+    return machine.snapshot()._replace(
+        mode=mode.snapshot(),
+        state=state,
+        abs_pos=_data2position(machine, data['abs_pos']),
+        abs_range_min=_data2position(machine, data['abs_range_min']),
+        abs_range_max=_data2position(machine, data['abs_range_max']),
+    )
+
+
+class CheckpointIndex(object):
+    """
+    Index of machine snapshots, taken while processing a gcode file, to
+    quickly get the machine's state at any line (see :meth:`seek`).
+
+    .. code-block:: python
+
+        from pygcode.checkpoint import CheckpointIndex, sidecar_path
+        index = CheckpointIndex.build('part.gcode', interval=5000)
+        index.save(sidecar_path('part.gcode'))
+
+    """
+
+    def __init__(self, checkpoints=None, dialect=None, default_mode=None, axes=None,
+                 file_size=None, file_mtime=None):
+        """
+        :param checkpoints: list of Checkpoint instances
+        :param dialect: dialect the file was parsed with (default if None)
+        :param default_mode: default mode of the machine that processed the file
+        :param axes: axes of the machine that processed the file
+        :param file_size: size of the file indexed (in bytes)
+        :param file_mtime: modification time of the file indexed (see os.stat)
+        """
+        self.checkpoints = list(checkpoints or [])  # in line order
+        self.dialect = dialect or dialects.get_default()
+        self.default_mode = default_mode
+        self.axes = ''.join(sorted(axes or ''))
+        self.file_size = file_size
+        self.file_mtime = file_mtime
+
+    def __len__(self):
+        return len(self.checkpoints)
+
+    def __repr__(self):
+        return "<{class_name}: {count} checkpoints>".format(
+            class_name=self.__class__.__name__,
+            count=len(self),
+        )
+
+    @classmethod
+    def build(cls, path, machine=None, interval=DEFAULT_INTERVAL, layers=False, dialect=None):
+        """
+        Process a gcode file, taking snapshots of the machine along the way
+        :param path: gcode filename
+        :param machine: machine to process the file with (default: a new Machine)
+        :param interval: lines between checkpoints
+        :param layers: if True, a checkpoint is also taken when the machine's Z changes
+        :param dialect: dialect of file's gcode (default if None)
+        :return: CheckpointIndex instance
+        """
+        if machine is None:
+            machine = Machine()
+        (file_size, file_mtime) = _file_stamp(path)
+        index = cls(
+            dialect=dialect, default_mode=machine.mode.default_mode,
+            axes=machine.axes, file_size=file_size, file_mtime=file_mtime,
+        )
+        layer_z = getattr(machine.abs_pos, 'Z', None)
+        for line in parse_file(path, dialect=dialect):
+            if line.line_number > 1:
+                if (line.line_number - 1) % interval == 0:
+                    index.add(line.line_number, line.byte_offset, machine)
+                elif layers and (getattr(machine.abs_pos, 'Z', None) != layer_z):
+                    index.add(line.line_number, line.byte_offset, machine)
+            layer_z = getattr(machine.abs_pos, 'Z', None)
+            machine.process_block(line.block)
+        return index
+
+    def add(self, line_number, byte_offset, machine):
+        """
+        Add a checkpoint (line numbers must be added in order)
+        :param line_number: number of the next line to be processed by the machine
+        :param byte_offset: offset of the next line to be processed by the machine
+        :param machine: Machine instance
+        """
+        self.checkpoints.append(Checkpoint(line_number, byte_offset, _machine2data(machine)))
+
+    def find(self, line_number=None, byte_offset=None):
+        """
+        Find the last checkpoint before the given line (or byte offset)
+        :param line_number: line to seek
+        :param byte_offset: offset (in bytes) to seek, if line_number is not given
+        :return: Checkpoint instance, or None if there isn't one
+        """
+        if line_number is not None:
+            keys = [cp.line_number for cp in self.checkpoints]
+            i = bisect_right(keys, line_number)
+        else:
+            keys = [cp.byte_offset for cp in self.checkpoints]
+            i = bisect_right(keys, byte_offset)
+        return self.checkpoints[i - 1] if i else None
+
+    def matches(self, machine, path=None, dialect=None):
+        """
+        :param machine: Machine instance
+        :param path: gcode filename (if given, the file's size & modification time are checked)
+        :param dialect: dialect the file is parsed with (default if None)
+        :return: True if index can be used for the given machine (and file)
+        """
+        return (
+            (self.dialect == (dialect or dialects.get_default())) and
+            (self.default_mode == machine.mode.default_mode) and
+            (self.axes == ''.join(sorted(machine.axes))) and
+            ((path is None) or ((self.file_size, self.file_mtime) == _file_stamp(path)))
+        )
+
+    def restore(self, checkpoint, machine):
+        """
+        Set the machine's mode, state & position to those of a checkpoint
+        :param checkpoint: Checkpoint instance
+        :param machine: Machine instance
+        """
+        machine.restore(_data2snapshot(machine, checkpoint.data, dialect=self.dialect))
+
+    # --- Sidecar file
+    def save(self, filename):
+        """
+        :param filename: index filename (see :meth:`sidecar_path`)
+        """
+        with io.open(filename, 'w') as fh:
+            json.dump({
+                'version': FORMAT_VERSION,
+                'dialect': self.dialect,
+                'default_mode': self.default_mode,
+                'axes': self.axes,
+                'file_size': self.file_size,
+                'file_mtime': self.file_mtime,
+                'checkpoints': [list(cp) for cp in self.checkpoints],
+            }, fh, separators=(',', ':'))
+
+    @classmethod
+    def load(cls, filename):
+        """
+        :param filename: index filename (see :meth:`sidecar_path`)
+        :return: CheckpointIndex instance, or None if the file doesn't exist (or is an unknown version)
+        """
+        try:
+            with io.open(filename, 'r') as fh:
+                data = json.load(fh)
+        except (IOError, OSError):
+            return None
+        if data.get('version') != FORMAT_VERSION:
+            return None
+        return cls(
+            checkpoints=[Checkpoint(*cp) for cp in data['checkpoints']],
+            dialect=data['dialect'],
+            default_mode=data['default_mode'],
+            axes=data['axes'],
+            file_size=data['file_size'],
+            file_mtime=data['file_mtime'],
+        )
+
+
+def seek(path, machine, line_number=None, byte_offset=None, index=None, dialect=None):
+    """
+    Bring machine to its state just before the given line, and parse the file from there.
+    :param path: gcode filename
+    :param machine: Machine instance, in its initial state
+    :param line_number: line to seek
+    :param byte_offset: offset (in bytes) to seek, if line_number is not given;
+                        the first line starting at, or after it is found
+    :param index: CheckpointIndex instance (default: loaded from the file's sidecar, if present)
+    :param dialect: dialect of file's gcode (default if None)
+    :return: iterator of :class:`Line` instances, starting with the line seeked
+
+    Lines from the nearest (prior) checkpoint are processed by the machine
+    (or from the start of the file if there isn't one) before seek returns;
+    so the machine is in its state before the line seeked.
+
+    .. code-block:: python
+
+        from pygcode import Machine
+        from pygcode.checkpoint import seek
+        machine = Machine()
+        for line in seek('part.gcode', machine, line_number=123456):
+            machine.process_block(line.block)
+
+    """
+    assert (line_number is not None) or (byte_offset is not None), "line_number or byte_offset required"
+    if index is None:
+        index = CheckpointIndex.load(sidecar_path(path))
+    if (index is not None) and not index.matches(machine, path, dialect=dialect):
+        index = None  # stale, or for a different machine
+
+    start = (1, 0)
+    checkpoint = index.find(line_number=line_number, byte_offset=byte_offset) if index else None
+    if checkpoint is not None:
+        index.restore(checkpoint, machine)
+        start = (checkpoint.line_number, checkpoint.byte_offset)
+
+    lines = parse_file(path, dialect=dialect, line_number=start[0], byte_offset=start[1])
+    for line in lines:
+        if line_number is not None:
+            found = line.line_number >= line_number
+        else:
+            found = line.byte_offset >= byte_offset
+        if found:
+            return chain([line], lines)
+        machine.process_block(line.block)
+    return iter([])
@@ -2,6 +2,7 @@ import re
 
 
 class CommentBase(object):
+    __slots__ = ('text',)
     ORDER = 0
     MULTICOMMENT_JOINER = ". " # joiner if multiple comments are found on the same line
     def __init__(self, text):
@@ -16,6 +17,7 @@ class CommentBase(object):
 
 class CommentSemicolon(CommentBase):
     "Comments of the format: 'G00 X1 Y2 ; something profound'"
+    __slots__ = ()
     ORDER = 1
     AUTO_REGEX = re.compile(r'\s*;\s*(?P<text>.*)$')
 
@@ -25,6 +27,7 @@ class CommentSemicolon(CommentBase):
 
 class CommentBrackets(CommentBase):
     "Comments of the format: 'G00 X1 Y2 (something profound)"
+    __slots__ = ()
     ORDER = 2
     AUTO_REGEX = re.compile(r'\((?P<text>[^\)]*)\)')
 
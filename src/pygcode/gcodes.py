@@ -1,6 +1,5 @@
 # vim: ts=4 number
 import sys
-from collections import defaultdict
 from copy import copy
 import six
 
@@ -199,15 +198,24 @@ def _gcode_class_infostr(base_class=GCode, prefix=''):
 _gcode_maps_created = False  # only set when the below values are populated
 _gcode_word_map = {} # of the form: {Word('G', 0): GCodeRapidMove, ... }
 _gcode_function_list = [] # of the form: [(lambda w: w.letter == 'F', GCodeFeedRate), ... ]
+_gcode_function_map = {} # _gcode_function_list by letter, of the form: {'F': [(lambda w: ..., GCodeFeedRate)], ... }
+
+# Negative cache: words known not to map to any class, by letter
+_gcode_unmatched = {} # of the form: {'M': set([123, 500, ...]), ... }
+UNMATCHED_MAX_SIZE = 1024  # per letter
 
 
 def build_maps():
-    """Populate _gcode_word_map and _gcode_function_list"""
+    """Populate _gcode_word_map, _gcode_function_list and _gcode_function_map"""
     # Ensure Word maps / lists are clear
     global _gcode_word_map
     global _gcode_function_list
+    global _gcode_function_map
+    global _gcode_unmatched
     _gcode_word_map = {}
     _gcode_function_list = []
+    _gcode_function_map = {}
+    _gcode_unmatched = {}
 
     for cls in _subclasses(GCode):
         try:
@@ -215,13 +223,22 @@ def build_maps():
         except AttributeError:
             pass
         if cls.word_key is not None:
-            # Map Word instance to g-code class
-            if cls.word_key in _gcode_word_map:
-                raise RuntimeError("Multiple GCode classes map to '%s'" % str(cls.word_key))
-            _gcode_word_map[cls.word_key] = cls
+            word_keys = [cls.word_key]
         elif cls.word_matches is not None:
-            # Add to list of functions
-            _gcode_function_list.append((cls.word_matches, cls))
+            word_keys = cls.word_keys
+            if word_keys is None:
+                # Open-ended match: add to list of functions (for its letter)
+                _gcode_function_list.append((cls.word_matches, cls))
+                _gcode_function_map.setdefault(cls.word_letter, []).append((cls.word_matches, cls))
+                continue
+        else:
+            continue
+
+        # Map Word instance(s) to g-code class
+        for word_key in word_keys:
+            if word_key in _gcode_word_map:
+                raise RuntimeError("Multiple GCode classes map to '%s'" % str(word_key))
+            _gcode_word_map[word_key] = cls
 
     global _gcode_maps_created
     _gcode_maps_created = True
@@ -245,14 +262,25 @@ def word_gcode_class(word, exhaustive=False):
         return None
 
     # by Word Map (faster)
-    if word in _gcode_word_map:
-        return _gcode_word_map[word]
+    gcode_class = _gcode_word_map.get(word)
+    if gcode_class is not None:
+        return gcode_class
 
-    # by Function List (slower, so checked last)
-    for (match_function, gcode_class) in _gcode_function_list:
+    # known not to match
+    unmatched = _gcode_unmatched.get(word.letter)
+    if (unmatched is not None) and (word.value in unmatched):
+        return None
+
+    # by Function Map (slower, so checked last)
+    for (match_function, gcode_class) in _gcode_function_map.get(word.letter, ()):
         if match_function(word):
             return gcode_class
 
+    if unmatched is None:
+        unmatched = _gcode_unmatched[word.letter] = set()
+    if len(unmatched) < UNMATCHED_MAX_SIZE:
+        unmatched.add(word.value)
+
     return None
 
 
@@ -270,7 +298,6 @@ def words2gcodes(words):
     -
     """
 
-    gcodes = []
     # Lines to consider
     # Conflicts with non G|M codes (ie: S|F|T)
     #   Spindle Control:
@@ -281,57 +308,49 @@ def words2gcodes(words):
     #       - M6 T1
     #
     # Conclusion: words are parameters first, gcodes second
-
-    # First determine which words are GCode candidates
-    word_info_list = [
-        {
-            'index': i, # for internal referencing
-            'word': word,
-            'gcode_class': word_gcode_class(word), # if not None, word is a candidate
-            'param_to_index': None,
-        }
-        for (i, word) in enumerate(words)
-    ]
-
-    # Link parameters to candidates
-    # note: gcode candidates may be valid parameters... therefore
-    # Also eliminate candidates that are parameters for earlier gcode candidates
-    for word_info in word_info_list:
-        if word_info['gcode_class'] is None:
-            continue # not a gcode candidate, so cannot have parameters
-        # which of the words following this gcode candidate are a valid parameter
-        for param_info in word_info_list[word_info['index'] + 1:]:
-            if param_info['word'].letter in word_info['gcode_class'].param_letters:
-                param_info['param_to_index'] = word_info['index']
-                param_info['gcode_class'] = None # no longer a valid candidate
-
-    # Map parameters
-    parameter_map = defaultdict(list) # {<gcode word index>: [<parameter words>], ... }
-    for word_info in word_info_list:
-        if word_info['gcode_class']:
-            continue # will form a gcode, so must not also be a parameter
-        parameter_map[word_info['param_to_index']].append(word_info['word'])
+    #
+    # A single pass through the words:
+    #   - a word is a parameter of the closest gcode (candidate) before it
+    #     that accepts its letter,
+    #   - otherwise, it's a gcode if it maps to a GCode class,
+    #   - otherwise, it's a modal parameter.
+    # param_owners maps each letter to the parameter list of the last gcode
+    # accepting it; so each word is linked in constant time.
+
+    gcode_items = []  # of the form: [(<GCode class>, <gcode word>, [<parameter words>]), ... ]
+    modal_params = []
+    param_owners = {}  # of the form: {<letter>: [<parameter words>], ... }
+    for word in words:
+        params = param_owners.get(word.letter)
+        if params is not None:
+            params.append(word)  # parameter of an earlier gcode
+            continue
+        gcode_class = word_gcode_class(word)
+        if gcode_class is None:
+            modal_params.append(word)
+            continue
+        params = []
+        gcode_items.append((gcode_class, word, params))
+        for letter in gcode_class.param_letters:
+            param_owners[letter] = params
 
     # Create gcode instances
-    for word_info in word_info_list:
-        if word_info['gcode_class'] is None:
-            continue # not a gcode candidate
-        gcode = word_info['gcode_class'](
-            word_info['word'],
-            *parameter_map[word_info['index']] # gcode parameters
-        )
-        gcodes.append(gcode)
+    gcodes = [
+        gcode_class(word, *params)
+        for (gcode_class, word, params) in gcode_items
+    ]
 
-    return (gcodes, parameter_map[None])
+    return (gcodes, modal_params)
 
 
-def text2gcodes(text):
+def text2gcodes(text, dialect=None):
     """
     Convert text to GCode instances (must be fully formed; no modal parameters)
     :param text: line from a g-code file
+    :param dialect: dialect of text (default if None)
     :return: tuple([<GCode>, <GCode>, ...], list(<unused words>))
     """
-    words = list(text2words(text))
+    words = list(text2words(text, dialect=dialect))
     (gcodes, modal_words) = words2gcodes(words)
     if modal_words:
         raise GCodeWordStrError("gcode text not fully formed, unassigned parameters: %r" % modal_words)
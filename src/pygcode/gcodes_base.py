@@ -1,6 +1,10 @@
+from copy import copy
+from types import MappingProxyType
+import six
+
 from .gcodes import MODAL_GROUP_MAP
 from .words import Word, text2words
-import six
+from .exceptions import GCodeParameterError
 
 """
     These class types can be used by external programs to classify the type of instructions
@@ -13,11 +17,26 @@ import six
     things that are related to each other (ie. SD card stuff)
 """
 
+class _GCodeSlotsMeta(type):
+    """
+    GCode subclasses without their own __slots__ are given empty ones; so
+    instances never get a __dict__ (there are many, one per parsed gcode).
+    To allow arbitrary attributes, declare ``__slots__ = ('__dict__',)``
+    """
+    def __new__(mcs, name, bases, namespace):
+        namespace.setdefault('__slots__', ())
+        return type.__new__(mcs, name, bases, namespace)
+
+
+@six.add_metaclass(_GCodeSlotsMeta)
 class GCode(object):
     """ base gcode class ; prefer not to use it """
+    __slots__ = ('word', 'params', '_whitespace_prefix', '_dirty', '_frozen')
+
     # Defining Word
     word_key = None # Word instance to use in lookup
     word_matches = None # function (secondary)
+    word_keys = None # Word instances word_matches is True for, if finite (used in lookup)
     default_word = None
     word_letter = 'G'
     word_value_configurable = False  # if set, word value can be the first parameter
@@ -37,6 +56,7 @@ class GCode(object):
         :param word: Word instance defining gcode (eg: Word('G0') for rapid movement)
         :param params: list of Word instances (eg: Word('X-1.2') as x-coordinate)
         """
+        object.__setattr__(self, '_frozen', False)  # (see freeze)
         gcode_word_list = words[:1]
         param_words = words[1:]
         if gcode_word_list:
@@ -59,6 +79,9 @@ class GCode(object):
         for (k, v) in params.items():
             self.add_parameter(Word(k, v))
 
+        # Changed since created (see dirty)
+        self._dirty = False
+
     def __repr__(self):
         param_str = ''
         if self.params:
@@ -96,6 +119,27 @@ class GCode(object):
             return hash(self.word_letter) # May also want to retrieve additional value info
         
 
+    def __copy__(self):
+        # parameters dict is copied (words are not)
+        obj = self.__class__.__new__(self.__class__)
+        object.__setattr__(obj, 'word', self.word)
+        object.__setattr__(obj, 'params', dict(self.params))
+        object.__setattr__(obj, '_whitespace_prefix', self._whitespace_prefix)
+        object.__setattr__(obj, '_dirty', self._dirty)
+        object.__setattr__(obj, '_frozen', False)
+        return obj
+
+    def __getstate__(self):
+        return (self.word, dict(self.params), self._whitespace_prefix, self._dirty, self._frozen)
+
+    def __setstate__(self, state):
+        (word, params, whitespace_prefix, dirty, frozen) = state
+        for (key, value) in [('word', word), ('params', params), ('_whitespace_prefix', whitespace_prefix),
+                             ('_dirty', dirty), ('_frozen', False)]:
+            object.__setattr__(self, key, value)
+        if frozen:
+            self.freeze()
+
     def _default_word(self):
         if self.default_word:
             return copy(self.default_word)
@@ -133,12 +177,15 @@ class GCode(object):
         :param word: Word instance
         """
         assert isinstance(word, Word), "invalid parameter class: %r" % word
+        if self._frozen:
+            raise AttributeError("'%s' cannot be changed, copy it first" % self)
         if word.letter not in self.param_letters:
             raise GCodeParameterError("invalid parameter for %s: %s" % (self.__class__.__name__, str(word)))
         if word.letter in self.params:
             raise GCodeParameterError("parameter defined twice: %s -> %s" % (self.params[word.letter], word))
 
         self.params[word.letter] = word
+        self._dirty = True
 
     # Assert Parameters
     def assert_params(self):
@@ -165,14 +212,54 @@ class GCode(object):
         ))
 
     def __setattr__(self, key, value):
+        if self._frozen:
+            raise AttributeError("'%s' cannot be changed, copy it first" % self)
         if key in self.param_letters:
             if key in self.params:
-                self.params[key].value = value
+                word = self.params[key]
+                if word.frozen:  # shared word; copy on write
+                    word = copy(word)
+                    self.params[key] = word
+                word.value = value
+                self._dirty = True
             else:
                 self.add_parameter(Word(key, value))
 
         else:
-            self.__dict__[key] = value
+            object.__setattr__(self, key, value)
+            if key in self._DIRTYING_ATTRIBUTES:
+                object.__setattr__(self, '_dirty', True)
+
+    # Attributes that change gcode when set
+    _DIRTYING_ATTRIBUTES = frozenset(['word', 'params', '_whitespace_prefix'])
+
+    @property
+    def dirty(self):
+        """
+        True if gcode has been changed (its word, or parameters set) since it was created;
+        parameter words changed in place (eg: ``gcode.params['X'].value = 1``) are not detected
+        """
+        return self._dirty
+
+    @dirty.setter
+    def dirty(self, value):
+        self._dirty = bool(value)
+
+    def freeze(self):
+        """
+        Make gcode immutable, so it's safe to share (eg: between blocks parsed
+        from the same text, see ParseCache); copying it returns a mutable gcode.
+        Its parameters should be FrozenWord instances.
+        :return: self
+        """
+        object.__setattr__(self, 'params', MappingProxyType(self.params))
+        object.__setattr__(self, '_frozen', True)
+        return self
+
+    @property
+    def frozen(self):
+        """True if gcode is immutable (see freeze)"""
+        return self._frozen
 
     @property
     def description(self):
@@ -274,7 +361,7 @@ class GCodeMotion(GCode):
     exec_order = 242
 
     def _process(self, machine):
-        machine.move_to(**self.get_param_dict(letters=machine.axes))
+        machine.move_to_params(self.params)
 
 
 class GCodeArcMove(GCodeMotion):
@@ -292,19 +379,21 @@ class GCodeArcMove(GCodeMotion):
         # --- Parameter Groups
         # XYZ: at least 1
         if not params_xyz:
-            raise GCodeParameterError("no XYZ parameters set for destination: %r" % arc_gcode)
+            raise GCodeParameterError("no XYZ parameters set for destination: %r" % self)
         # IJK or R: only in 1 group
         if params_ijk and params_r:
-            raise GCodeParameterError("both IJK and R parameters defined: %r" % arc_gcode)
+            raise GCodeParameterError("both IJK and R parameters defined: %r" % self)
         # IJKR: at least 1
         if not params_ijkr:
-            raise GCodeParameterError("neither IJK or R parameters defined: %r" % arc_gcode)
+            raise GCodeParameterError("neither IJK or R parameters defined: %r" % self)
 
         # --- Parameter Values
         if params_r and (self.R == 0):
-            raise GCodeParameterError("cannot plot a circle with a radius of zero: %r" % arc_gcode)
+            raise GCodeParameterError("cannot plot a circle with a radius of zero: %r" % self)
 
 # ======================= Canned Cycles =======================
+CANNED_RETURN_TO_R_WORD = Word('G', 99)  # (G99: canned cycle return to the level set by R)
+
 class GCodeCannedCycle(GCode):
     param_letters = set('XYZUVW')
     modal_group = MODAL_GROUP_MAP['canned_cycle']
@@ -312,7 +401,8 @@ class GCodeCannedCycle(GCode):
 
     def _process(self, machine):
         moveto_coords = self.get_param_dict(letters=machine.axes)
-        if isinstance(machine.mode.canned_cycles_return, GCodeCannedCycleReturnToR):
+        canned_cycles_return = machine.mode.canned_cycles_return
+        if (canned_cycles_return is not None) and (canned_cycles_return.word == CANNED_RETURN_TO_R_WORD):
             # canned return is to this.R, not this.Z (plane dependent)
             moveto_coords.update({
                 machine.mode.plane_selection.normal_axis: self.R,
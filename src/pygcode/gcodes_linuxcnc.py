@@ -23,7 +23,7 @@ class GCodeRapidMove(GCodeMotion):
     word_key = Word('G', 0)
 
     def _process(self, machine):
-        machine.move_to(rapid=True, **self.get_param_dict(letters=machine.axes))
+        machine.move_to_params(self.params, rapid=True)
 
 
 class GCodeLinearMove(GCodeMotion):
@@ -767,6 +767,7 @@ class GCodeGotoPredefinedPosition(GCodeNonModal):
     def word_matches(cls, w):
         return (w.letter == 'G') and (w.value in [28, 30])
     default_word = Word('G', 28)
+    word_keys = [Word('G', v) for v in [28, 30]]
     exec_order = 230
 
 
@@ -777,6 +778,7 @@ class GCodeSetPredefinedPosition(GCodeNonModal):
     def word_matches(cls, w):
         return (w.letter == 'G') and (w.value in [28.1, 30.1])
     default_word = Word('G', 28.1)
+    word_keys = [Word('G', v) for v in [28.1, 30.1]]
     exec_order = 230
 
 class GCodeMoveInMachineCoords(GCodeNonModal):
@@ -798,6 +800,7 @@ class GCodeResetCoordSystemOffset(GCodeNonModal):
     def word_matches(cls, w):
         return (w.letter == 'G') and (w.value in [92.1, 92.2])
     default_word = Word('G', 92.1)
+    word_keys = [Word('G', v) for v in [92.1, 92.2]]
     exec_order = 230
 
     # TODO: machine.state.offset *= 0
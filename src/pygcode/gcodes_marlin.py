@@ -9,6 +9,7 @@ class GCodeLinearMove(GCodeMotion):
     def word_matches(cls, w):
         return (w.letter == 'G') and (w.value in [0, 1])
     default_word = Word('G', 0)
+    word_keys = [Word('G', v) for v in [0, 1]]
 
 class GCodeArcOrCircleMove(GCodeArcMove):
     """G2, G3: Add an arc or circle movement to the planner"""
@@ -18,6 +19,7 @@ class GCodeArcOrCircleMove(GCodeArcMove):
     def word_matches(cls, w):
         return (w.letter == 'G') and (w.value in [2, 3])
     default_word = Word('G', 2)
+    word_keys = [Word('G', v) for v in [2, 3]]
 
 class GCodeDwell(GCode):
     """G4: Pause the planner"""
@@ -57,6 +59,7 @@ class GCodeCNCWorkspacePlanes(GCodePlaneSelect):
     def word_matches(cls, w):
         return (w.letter == 'G') and (w.value in [17, 18, 19])
     default_word = Word('G', 17)
+    word_keys = [Word('G', v) for v in [17, 18, 19]]
 
 class GCodeInchUnits(GCodeUnit):
     """G20: Set Units to Inches."""
@@ -156,6 +159,7 @@ class GCodeProbeTarget(GCodeMachineRoutines):
     def word_matches(cls, w):
         return (w.letter == 'G') and (w.value in [38.2, 38.3, 38.4, 38.5])
     default_word = Word('G', 38)
+    word_keys = [Word('G', v) for v in [38.2, 38.3, 38.4, 38.5]]
 
 class GCodeMoveToMeshCoordinate(GCodeMotion):
     """G42: Move to a specific point in the leveling mesh"""
@@ -175,6 +179,7 @@ class GCodeWorkspaceCoordinateSystem(GCodeSelectCoordinateSystem):
     def word_matches(cls, w):
         return (w.letter == 'G') and (w.value in [54, 55, 56, 57, 58, 59, 59.1, 59.2, 59.3])
     default_word = Word('G', 54)
+    word_keys = [Word('G', v) for v in [54, 55, 56, 57, 58, 59, 59.1, 59.2, 59.3]]
 
 class GCodeSaveCurrentPosition(GCodeOtherModal):
     """G60: Save current position to specified slot"""
@@ -224,6 +229,7 @@ class GCodeUnconditionalStop(GCodeProgramControl):
     def word_matches(cls, w):
         return (w.letter == 'M') and (w.value in [0, 1])
     default_word = Word('M', 0)
+    word_keys = [Word('M', v) for v in [0, 1]]
 
 class GCodeSpindleCWLaserOn(GCodeToolState):
     """M3: Set the spindle CW speed or laser power"""
@@ -248,6 +254,7 @@ class GCodeCoolantControls(GCodeCoolantHeaters):
     def word_matches(cls, w):
         return (w.letter == 'M') and (w.value in [7, 8, 9])
     default_word = Word('M', 7)
+    word_keys = [Word('M', v) for v in [7, 8, 9]]
 
 class GCodeVacuumBlowerControl(GCodeIO):
     """M10, M11: Enable and disable the Cutter Vacuum or Laser Blower Motor."""
@@ -257,6 +264,7 @@ class GCodeVacuumBlowerControl(GCodeIO):
     def word_matches(cls, w):
         return (w.letter == 'M') and (w.value in [10, 11])
     default_word = Word('M', 10)
+    word_keys = [Word('M', v) for v in [10, 11]]
 
 class GCodeExpectedPrinterCheck(GCodeOtherModal):
     """M16: Prevent G-code usage on the wrong machine"""
@@ -276,6 +284,7 @@ class GCodeDisableSteppers(GCodeOtherModal):
     def word_matches(cls, w):
         return (w.letter == 'M') and (w.value in [18, 84])
     default_word = Word('M', 18)
+    word_keys = [Word('M', v) for v in [18, 84]]
 
 class GCodeListSDCard(GCodeIO):
     """M20: List the contents of the SD Card."""
@@ -1095,6 +1104,7 @@ class GCodeGcodeMacros(GCodeProgramControl):
     def word_matches(cls, w):
         return (w.letter == 'M') and (w.value in [810, 811, 812, 813, 814, 815, 816, 817, 818, 819])
     default_word = Word('M', 810)
+    word_keys = [Word('M', v) for v in [810, 811, 812, 813, 814, 815, 816, 817, 818, 819]]
 
 class GCodeXYZProbeOffset(GCodeToolGeometry):
     """M851: Set the Z probe XYZ offset from nozzle"""
@@ -1114,6 +1124,7 @@ class GCodeI2CPositionEncoders(GCodeMachineConfig):
     def word_matches(cls, w):
         return (w.letter == 'M') and (w.value in [860, 861, 862, 863, 864, 865, 866, 867, 868, 869])
     default_word = Word('M', 860)
+    word_keys = [Word('M', v) for v in [860, 861, 862, 863, 864, 865, 866, 867, 868, 869]]
 
 class GCodeProbeTemperatureConfig(GCodeMachineConfig):
     """M871: Configure probe temperature compensation"""
@@ -1243,6 +1254,7 @@ class GCodeSelectOrReportTool(GCodeOtherModal):
     def word_matches(cls, w):
         return (w.letter == 'T') and (w.value in [0, 1, 2, 3, 4, 5, 6, 7])
     default_word = Word('T', 0)
+    word_keys = [Word('T', v) for v in [0, 1, 2, 3, 4, 5, 6, 7]]
 
 class GCodeMMU2SpecialCommands(GCodeOtherModal):
     """'T?', Tc, Tx: MMU2 special filament loading commands"""
@@ -1252,4 +1264,5 @@ class GCodeMMU2SpecialCommands(GCodeOtherModal):
     def word_matches(cls, w):
         return (w.letter == 'T') and (w.value in ['?', 'c', 'x'])
     default_word = Word('T', 1)
+    word_keys = [Word('T', v) for v in ['?', 'c', 'x']]
 
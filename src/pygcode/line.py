@@ -4,32 +4,110 @@ from .comment import split_line
 from .block import Block
 
 class Line(object):
+    __slots__ = (
+        '_text', '_block', '_comment', '_macro', '_lazy', '_cache', 'dialect',
+        'line_number', 'byte_offset', '_dirty',
+    )
 
     line_regex = re.compile(r'^(?P<block_and_comment>.*?)?(?P<macro>%.*%?)?\s*$')
 
-    def __init__(self, text=None):
+    def __init__(self, text=None, dialect=None, lazy=False, cache=None):
+        """
+        :param text: line from a gcode file
+        :param dialect: dialect of line's block (default if None)
+        :param lazy: if True, line is only split (into block, comment & macro)
+                     when any of them are first accessed; its block's words &
+                     gcodes are also parsed lazily
+        :param cache: ParseCache to get block's parsed words & gcodes from
+        """
         self._text = text
+        self._lazy = lazy and (text is not None)  # True until split
+        self.dialect = dialect
+        self._cache = cache
+
+        # Source location (set by parse_file)
+        self.line_number = None  # 1-based
+        self.byte_offset = None
 
         # Initialize
-        self.block = None
-        self.comment = None
-        self.macro = None
+        self._block = None
+        self._comment = None
+        self._macro = None
+        self._dirty = False  # block, comment or macro set (see dirty)
+
+        if (text is not None) and not lazy:
+            self._split()
 
+    def _split(self):
         # Split line into block text, and comments
-        if text is not None:
-            match = self.line_regex.search(text)
+        match = self.line_regex.search(self._text)
+
+        block_and_comment = match.group('block_and_comment')
+        self._macro = match.group('macro')
+
+        (block_str, comment) = split_line(block_and_comment)
+        self._block = Block(block_str, dialect=self.dialect, lazy=self._lazy, cache=self._cache)
+        if comment:
+            self._comment = comment
+        (self._lazy, self._cache) = (False, None)  # (no longer needed)
+
+    @property
+    def block(self):
+        if self._lazy:
+            self._split()
+        return self._block
+
+    @block.setter
+    def block(self, value):
+        if self._lazy:
+            self._split()
+        self._block = value
+        self._dirty = True
 
-            block_and_comment = match.group('block_and_comment')
-            self.macro = match.group('macro')
+    @property
+    def comment(self):
+        if self._lazy:
+            self._split()
+        return self._comment
+
+    @comment.setter
+    def comment(self, value):
+        if self._lazy:
+            self._split()
+        self._comment = value
+        self._dirty = True
+
+    @property
+    def macro(self):
+        if self._lazy:
+            self._split()
+        return self._macro
+
+    @macro.setter
+    def macro(self, value):
+        if self._lazy:
+            self._split()
+        self._macro = value
+        self._dirty = True
+
+    @property
+    def dirty(self):
+        """
+        True if line has been changed since it was parsed: its block, comment
+        or macro set, or its block changed (see Block.dirty)
+        """
+        if self._dirty:
+            return True
+        return (self._block is not None) and self._block.dirty
 
-            (block_str, comment) = split_line(block_and_comment)
-            self.block = Block(block_str)
-            if comment:
-                self.comment = comment
+    @dirty.setter
+    def dirty(self, value):
+        self._dirty = bool(value)
 
     @property
     def text(self):
-        if self._text is None:
+        """Line's original text (if it's unchanged), otherwise as str(line)"""
+        if (self._text is None) or self.dirty:
             return str(self)
         return self._text
 
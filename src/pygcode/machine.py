@@ -1,6 +1,6 @@
 import re
-from copy import copy, deepcopy
-from collections import defaultdict
+from copy import copy
+from collections import defaultdict, namedtuple
 
 from .gcodes import (
     MODAL_GROUP_MAP, GCode,
@@ -46,64 +46,101 @@ UNIT_MAP = {
 }
 
 
+# Position's axes, in the order they're stored
+POSITION_AXES = 'XYZABCUVW'
+_AXIS_INDEX = dict((axis, i) for (i, axis) in enumerate(POSITION_AXES))
+
+
+class _PositionAxis(object):
+    """Position attribute for an axis' value (in its fixed slot)"""
+    __slots__ = ('axis', 'index')
+
+    def __init__(self, axis):
+        self.axis = axis
+        self.index = _AXIS_INDEX[axis]
+
+    def __get__(self, obj, cls=None):
+        if obj is None:
+            return self
+        if self.axis in obj.axes:
+            return obj._value[self.index]
+        raise AttributeError("'{cls}' object has no attribute '{key}'".format(
+            cls=obj.__class__.__name__,
+            key=self.axis
+        ))
+
+    def __set__(self, obj, value):
+        if self.axis not in obj.axes:
+            raise MachineInvalidAxis("'%s' axis is not defined to be set" % self.axis)
+        obj._value[self.index] = value
+
+
 class Position(object):
+    """
+    Coordinates of a machine's axes.
+
+    Values are stored in a list with a fixed slot for each of the axes
+    XYZABCUVW (in that order); slots of axes not in ``axes`` are zero.
+    """
+    __slots__ = ('axes', '_unit', '_value')
+
     default_axes = 'XYZABCUVW'
     default_unit = UNIT_METRIC
-    POSSIBLE_AXES = set('XYZABCUVW')
+    POSSIBLE_AXES = set(POSITION_AXES)
+
+    X = _PositionAxis('X')
+    Y = _PositionAxis('Y')
+    Z = _PositionAxis('Z')
+    A = _PositionAxis('A')
+    B = _PositionAxis('B')
+    C = _PositionAxis('C')
+    U = _PositionAxis('U')
+    V = _PositionAxis('V')
+    W = _PositionAxis('W')
 
     def __init__(self, axes=None, **kwargs):
-        # Set axes (note: usage in __getattr__ and __setattr__)
+        # Set axes
         if axes is None:
             axes = self.__class__.default_axes
         else:
             invalid_axes = set(axes) - self.POSSIBLE_AXES
             if invalid_axes:
                 raise MachineInvalidAxis("invalid axes proposed %s" % invalid_axes)
-        self.__dict__['axes'] = set(axes) & self.POSSIBLE_AXES
+        self.axes = set(axes) & self.POSSIBLE_AXES
 
         # Unit
         self._unit = kwargs.pop('unit', self.default_unit)
 
         # Initial Values
-        self._value = defaultdict(lambda: 0.0, dict((k, 0.0) for k in self.axes))
-        self._value.update(kwargs)
+        self._value = [0.0] * len(POSITION_AXES)
+        for (k, v) in kwargs.items():
+            setattr(self, k, v)
+
+    @classmethod
+    def _from_values(cls, axes, unit, values):
+        # new instance, sharing given axes (set), and owning given values (list)
+        obj = cls.__new__(cls)
+        obj.axes = axes
+        obj._unit = unit
+        obj._value = values
+        return obj
 
     def __copy__(self):
-        return self.__class__(axes=copy(self.axes), unit=self._unit, **self.values)
+        return self._from_values(set(self.axes), self._unit, list(self._value))
 
     def update(self, **coords):
         for (k, v) in coords.items():
             setattr(self, k, v)
 
-    # Attributes Get/Set
-    def __getattr__(self, key):
-        if key in self.axes:
-            return self._value[key]
-
-        raise AttributeError("'{cls}' object has no attribute '{key}'".format(
-            cls=self.__class__.__name__,
-            key=key
-        ))
-
-    def __setattr__(self, key, value):
-        if key in self.axes:
-            self._value[key] = value
-        elif key in self.POSSIBLE_AXES:
-            raise MachineInvalidAxis("'%s' axis is not defined to be set" % key)
-        else:
-            self.__dict__[key] = value
-
     # Equality
     def __eq__(self, other):
         if self.axes ^ other.axes:
             return False
         else:
-            if self._unit == other._unit:
-                return self._value == other._value
-            else:
-                x = copy(other)
-                x.unit = self._unit
-                return self._value == x._value
+            if self._unit != other._unit:
+                other = copy(other)
+                other.unit = self._unit
+            return all(self._value[_AXIS_INDEX[k]] == other._value[_AXIS_INDEX[k]] for k in self.axes)
 
     def __ne__(self, other):
         return not self.__eq__(other)
@@ -112,33 +149,48 @@ class Position(object):
     def __add__(self, other):
         if self.axes ^ other.axes:
             raise MachineInvalidAxis("axes: %r != %r" % (self.axes, other.axes))
-        new_obj = copy(self)
-        for k in new_obj._value:
-            new_obj._value[k] += other._value[k]
-        return new_obj
+        return self._from_values(self.axes, self._unit, [a + b for (a, b) in zip(self._value, other._value)])
 
     def __sub__(self, other):
         if other.axes - self.axes:
             raise MachineInvalidAxis("for a - b: axes in b, that are not in a: %r" % (other.axes - self.axes))
-        new_obj = copy(self)
-        for k in other._value:
-            new_obj._value[k] -= other._value[k]
-        return new_obj
+        return self._from_values(self.axes, self._unit, [a - b for (a, b) in zip(self._value, other._value)])
 
     def __mul__(self, scalar):
-        new_obj = copy(self)
-        for k in self._value:
-            new_obj._value[k] = self._value[k] * scalar
-        return new_obj
+        return self._from_values(self.axes, self._unit, [a * scalar for a in self._value])
 
     def __div__(self, scalar):
-        new_obj = copy(self)
-        for k in self._value:
-            new_obj._value[k] = self._value[k] / scalar
-        return new_obj
+        return self._from_values(self.axes, self._unit, [a / scalar for a in self._value])
 
     __truediv__ = __div__ # Python 3 division
 
+    # In-place Arithmetic
+    def __iadd__(self, other):
+        if self.axes ^ other.axes:
+            raise MachineInvalidAxis("axes: %r != %r" % (self.axes, other.axes))
+        value = self._value
+        for (i, b) in enumerate(other._value):
+            value[i] += b
+        return self
+
+    def __isub__(self, other):
+        if other.axes - self.axes:
+            raise MachineInvalidAxis("for a -= b: axes in b, that are not in a: %r" % (other.axes - self.axes))
+        value = self._value
+        for (i, b) in enumerate(other._value):
+            value[i] -= b
+        return self
+
+    def __imul__(self, scalar):
+        self._value[:] = [a * scalar for a in self._value]
+        return self
+
+    def __idiv__(self, scalar):
+        self._value[:] = [a / scalar for a in self._value]
+        return self
+
+    __itruediv__ = __idiv__
+
     # Conversion
     @property
     def unit(self):
@@ -148,8 +200,7 @@ class Position(object):
     def unit(self, value):
         if value != self._unit:
             factor = UNIT_MAP[self._unit]['conversion_factor'][value]
-            for k in [k for (k, v) in self._value.items() if v is not None]:
-                self._value[k] *= factor
+            self._value[:] = [v * factor for v in self._value]
             self._unit = value
 
     # Min/Max
@@ -181,18 +232,68 @@ class Position(object):
     def max(cls, a, b):
         return cls._cmp(a, b, key=max)
 
+    def update_min(self, other):
+        """Lower each of this position's values to other's, if it's lower (in place)"""
+        if other.unit != self._unit:
+            other = copy(other)
+            other.unit = self._unit
+        self._value[:] = [a if a <= b else b for (a, b) in zip(self._value, other._value)]
+
+    def update_max(self, other):
+        """Raise each of this position's values to other's, if it's higher (in place)"""
+        if other.unit != self._unit:
+            other = copy(other)
+            other.unit = self._unit
+        self._value[:] = [a if a >= b else b for (a, b) in zip(self._value, other._value)]
+
     # Words & Values
     @property
     def words(self):
-        return sorted(Word(k, self._value[k]) for k in self.axes)
+        return sorted(Word(k, self._value[_AXIS_INDEX[k]]) for k in self.axes)
 
     @property
     def values(self):
-        return dict(self._value)
+        return dict((k, self._value[_AXIS_INDEX[k]]) for k in self.axes)
 
     @property
     def vector(self):
-        return Vector3(self._value['X'], self._value['Y'], self._value['Z'])
+        return Vector3(self._value[0], self._value[1], self._value[2])
+
+    # NumPy
+    @property
+    def array(self):
+        """Values of all axes (in POSITION_AXES order) as a numpy array (requires numpy)"""
+        import numpy
+        return numpy.array(self._value, dtype=float)
+
+    @classmethod
+    def to_numpy(cls, positions):
+        """
+        Values of many positions as a single numpy array (requires numpy)
+        :param positions: iterable of Position instances
+        :return: numpy.ndarray of shape (<count>, 9), columns in POSITION_AXES order
+        """
+        import numpy
+        values = [p._value for p in positions]
+        return numpy.array(values, dtype=float).reshape(len(values), len(POSITION_AXES))
+
+    @classmethod
+    def from_numpy(cls, array, axes=None, unit=None):
+        """
+        Positions from a numpy array (requires numpy)
+        :param array: numpy.ndarray of shape (9,) or (<count>, 9), columns in POSITION_AXES order
+        :param axes: axes of the new positions (default: default_axes)
+        :param unit: unit of the new positions (default: default_unit)
+        :return: Position instance for a 1 dimensional array, otherwise a list of them
+        """
+        axes = set(cls.default_axes if axes is None else axes)
+        if unit is None:
+            unit = cls.default_unit
+        mask = [(a in axes) for a in POSITION_AXES]
+        array = array * mask  # zero axes not in axes (also copies it)
+        if array.ndim == 1:
+            return cls._from_values(axes, unit, array.tolist())
+        return [cls._from_values(set(axes), unit, values) for values in array.tolist()]
 
     # String representation(s)
     def __repr__(self):
@@ -226,15 +327,18 @@ class State(object):
     #        handled by modal gcodes.
     def __init__(self, axes=None):
         self._axes = axes
+        self._shared = False  # if set, coordinate systems & offset are copied before they're given out
+        self._offset_total = None  # cached total work offset values (see offset_values)
+
         # Coordinate Systems
-        self.coord_systems = {}
+        self._coord_systems = {}
         for i in range(1, 10): # G54-G59.3
-            self.coord_systems[i] = CoordinateSystem(axes)
+            self._coord_systems[i] = CoordinateSystem(axes)
 
         self.cur_coord_sys = 1 # default to coord system 1 (G54)
 
         # Temporary Offset
-        self.offset = Position(axes) # G92 offset (reset by G92.x)
+        self._offset = Position(axes) # G92 offset (reset by G92.x)
 
         # Missing from state (according to LinuxCNC's state variables):
         #   - G38.2 probe result (Position())
@@ -256,10 +360,92 @@ class State(object):
 
     def __copy__(self):
         obj = self.__class__(axes=self._axes)
-        obj.coord_systems = [copy(cs) for cs in self.coord_systems]
-        obj.offset = copy(self.offset)
+        obj._coord_systems = dict((i, copy(cs)) for (i, cs) in self._coord_systems.items())
+        obj.cur_coord_sys = self.cur_coord_sys
+        obj._offset = copy(self._offset)
         return obj
 
+    def snapshot(self):
+        """
+        Current state; coordinate systems & offset are shared, not copied.
+        The state copies them the next time they're given out (to be changed).
+        :return: dict of state attributes (treat as read-only)
+        """
+        self._shared = True
+        return dict(self.__dict__)
+
+    def restore(self, snapshot):
+        """
+        Restore state from a snapshot
+        :param snapshot: value returned by :meth:`snapshot`
+        """
+        self.__dict__.update(snapshot)
+        self._shared = True
+        self._offset_total = None
+
+    def _give_out(self):
+        # coordinate systems & offset are given out (to be changed): copied if they're
+        # shared with a snapshot, and the cached work offset is cleared
+        if self._shared:
+            self._coord_systems = dict((i, copy(cs)) for (i, cs) in self._coord_systems.items())
+            self._offset = copy(self._offset)
+            self._shared = False
+        self._offset_total = None
+
+    @property
+    def coord_systems(self):
+        """Coordinate systems, of the form: {<index>: CoordinateSystem, ...}"""
+        self._give_out()
+        return self._coord_systems
+
+    @coord_systems.setter
+    def coord_systems(self, value):
+        self._give_out()
+        self._coord_systems = value
+
+    @property
+    def offset(self):
+        """Temporary (G92) offset Position"""
+        self._give_out()
+        return self._offset
+
+    @offset.setter
+    def offset(self, value):
+        self._give_out()
+        self._offset = value
+
+    @property
+    def cur_coord_sys(self):
+        """Index of the current coordinate system (in coord_systems)"""
+        return self._cur_coord_sys
+
+    @cur_coord_sys.setter
+    def cur_coord_sys(self, value):
+        self._cur_coord_sys = value
+        self._offset_total = None
+
+    def offsets_changed(self):
+        """
+        Clear the cached work offset; it's cleared whenever the coordinate
+        systems, offset, or current coordinate system are set or given out,
+        so this is only needed if they're changed by a reference kept since
+        """
+        self._offset_total = None
+
+    def offset_values(self):
+        """
+        Values of the current coordinate system's offset, plus the temporary (G92) offset
+        :return: list of values, in POSITION_AXES order (cached, treat as read-only)
+        """
+        values = self._offset_total
+        if values is None:
+            coord_sys = self._coord_systems.get(self._cur_coord_sys)
+            values = list(self._offset._value)
+            if coord_sys is not None:
+                values = [c + t for (c, t) in zip(coord_sys.offset._value, values)]
+            self._offset_total = values
+        return values
+
     @property
     def coord_sys(self):
         """Current equivalent coordinate system, including all """
@@ -309,23 +495,62 @@ class Mode(object):
         T0      (tool: 0)
     '''
 
+    # Parsed default_mode, shared by all instances (and subclasses), of the form:
+    #   {(<default_mode text>, <dialect>): (<GCode>, <GCode>, ...), ...}
+    _default_gcodes = {}
+
     # Mode is defined by gcodes set by processed blocks:
     #   see modal_group in gcode.py module for details
     def __init__(self, set_default=True):
         self.modal_groups = defaultdict(lambda: None)
+        self._shared = False  # if set, modal_groups is copied before it's changed
 
         # Initialize (from multiline self.default_mode)
         if set_default:
+            self.set_mode(*self.default_gcodes())
+
+    def default_gcodes(self):
+        """
+        GCodes of default_mode; it's only parsed the first time it's used
+        :return: tuple of GCode instances (shared, do not change them)
+        """
+        key = (self.default_mode, get_default_dialect())
+        gcodes = self._default_gcodes.get(key)
+        if gcodes is None:
             gcodes = []
             for m in re.finditer(r'\s*(?P<line>.*)\s*\n?', self.default_mode):
                 gcodes += Line(m.group('line')).block.gcodes
-            self.set_mode(*gcodes)
+            gcodes = self._default_gcodes[key] = tuple(gcodes)
+        return gcodes
 
     def __copy__(self):
         obj = self.__class__(set_default=False)
-        obj.modal_groups = deepcopy(self.modal_groups)
+        obj.restore(self.snapshot())
         return obj
 
+    def snapshot(self):
+        """
+        Current mode; modal gcodes are shared, not copied.
+        The mode's modal_groups are copied the next time either is changed.
+        :return: modal_groups dict (treat as read-only)
+        """
+        self._shared = True
+        return self.modal_groups
+
+    def restore(self, snapshot):
+        """
+        Restore mode from a snapshot
+        :param snapshot: value returned by :meth:`snapshot`
+        """
+        self.modal_groups = snapshot
+        self._shared = True
+
+    def _set_modal_group(self, modal_group, gcode):
+        if self._shared:
+            self.modal_groups = copy(self.modal_groups)
+            self._shared = False
+        self.modal_groups[modal_group] = gcode
+
     def set_mode(self, *gcode_list):
         """
         Set machine mode from given gcodes (will not be processed)
@@ -333,9 +558,14 @@ class Mode(object):
         :return: dict of form: {<modal group>: <new mode GCode>, ...}
         """
         modal_gcodes = {}
-        for g in sorted(gcode_list): # sorted by execution order
+        if len(gcode_list) > 1:
+            gcode_list = sorted(gcode_list) # sorted by execution order
+        for g in gcode_list:
             if g.modal_group is not None:
-                self.modal_groups[g.modal_group] = g.modal_copy()
+                current = self.modal_groups[g.modal_group]
+                if (current is None) or (current.word != g.word) or g.modal_param_letters:
+                    self._set_modal_group(g.modal_group, g.modal_copy())
+                # else: mode is unchanged (its modal copy would be identical)
                 modal_gcodes[g.modal_group] = self.modal_groups[g.modal_group]
                 # assumption: no 2 gcodes are in the same modal_group
         return modal_gcodes
@@ -354,7 +584,7 @@ class Mode(object):
             # Set/Clear modal group gcode
             if value is None:
                 # clear mode group
-                self.modal_groups[MODAL_GROUP_MAP[key]] = None
+                self._set_modal_group(MODAL_GROUP_MAP[key], None)
             else:
                 # set mode group explicitly, not advisable
                 # (recommended to use self.set_mode(value) instead)
@@ -362,7 +592,7 @@ class Mode(object):
                     raise MachineInvalidState("invalid mode value: %r" % value)
                 if value.modal_group != MODAL_GROUP_MAP[key]:
                     raise MachineInvalidState("cannot set '%s' mode as %r, wrong group" % (key, value))
-                self.modal_groups[MODAL_GROUP_MAP[key]] = value.modal_copy()
+                self._set_modal_group(MODAL_GROUP_MAP[key], value.modal_copy())
         else:
             self.__dict__[key] = value
 
@@ -384,6 +614,20 @@ class Mode(object):
         )
 
 
+def _in_exec_order(gcodes):
+    """True if gcodes are (already) sorted by execution order"""
+    for i in range(1, len(gcodes)):
+        if gcodes[i - 1].exec_order > gcodes[i].exec_order:
+            return False
+    return True
+
+
+# Machine's mode, state & position at a point in time (see Machine.snapshot)
+MachineSnapshot = namedtuple('MachineSnapshot', [
+    'mode', 'state', 'abs_pos', 'abs_range_min', 'abs_range_max',
+])
+
+
 class Machine(object):
     """Machine to process gcodes, enforce axis limits, keep track of time, etc"""
 
@@ -394,6 +638,11 @@ class Machine(object):
     axes = set('XYZ')
     ignore_invalid_modal = False
 
+    # Called with the machine after each move, if set (eg: to record positions)
+    on_move = None
+
+    _positions_shared = False  # if set, positions are copied before they're changed (see snapshot)
+
     def __init__(self):
         self.mode = self.MODE_CLASS()
         self.state = self.STATE_CLASS(axes=self.axes)
@@ -401,32 +650,82 @@ class Machine(object):
         # Position type (with default axes the same as this machine)
         units_mode = getattr(self.mode, 'units', None)
         self.Position = type('Position', (Position,), {
+            '__slots__': (),
             'default_axes': self.axes,
             'default_unit': units_mode.unit_id if units_mode else Position.default_unit,
         })
 
-        # Absolute machine position
+        # Absolute machine position (changed in place by moves; copy it to keep it)
         self.abs_pos = self.Position()
         # Machine's motion range (min/max corners of a bounding box)
         self.abs_range_min = copy(self.abs_pos)
         self.abs_range_max = copy(self.abs_pos)
 
     def __copy__(self):
-        obj = self.__class__()
+        # independent copy: state & positions are copied (see snapshot to share them)
+        obj = self.__class__.__new__(self.__class__)
+        obj.__dict__.update(self.__dict__)
         obj.mode = copy(self.mode)
         obj.state = copy(self.state)
         obj.abs_pos = copy(self.abs_pos)
         obj.abs_range_min = copy(self.abs_range_min)
         obj.abs_range_max = copy(self.abs_range_max)
+        obj._positions_shared = False
+        return obj
+
+    def restored(self, snapshot):
+        """
+        New machine (of the same class, and settings) restored from a snapshot;
+        this machine is unchanged
+        :param snapshot: MachineSnapshot instance returned by :meth:`snapshot`
+        :return: Machine instance
+        """
+        obj = self.__class__.__new__(self.__class__)
+        obj.__dict__.update(self.__dict__)
+        obj.mode = self.mode.__class__(set_default=False)
+        obj.state = self.state.__class__.__new__(self.state.__class__)
+        obj.restore(snapshot)
         return obj
 
+    def snapshot(self):
+        """
+        Snapshot of the machine's mode, state and position, to :meth:`restore` later.
+
+        Taking a snapshot copies nothing: modal gcodes & positions are shared
+        with the machine (so they should not be changed in place). The machine
+        copies mode groups, and positions, the next time it changes them.
+
+        :return: MachineSnapshot instance
+        """
+        self._positions_shared = True
+        return MachineSnapshot(
+            mode=self.mode.snapshot(),
+            state=self.state.snapshot(),
+            abs_pos=self.abs_pos,
+            abs_range_min=self.abs_range_min,
+            abs_range_max=self.abs_range_max,
+        )
+
+    def restore(self, snapshot):
+        """
+        Restore the machine's mode, state and position
+        :param snapshot: MachineSnapshot instance returned by :meth:`snapshot`
+        """
+        self.mode.restore(snapshot.mode)
+        self.state.restore(snapshot.state)
+        self.abs_pos = snapshot.abs_pos
+        self.abs_range_min = snapshot.abs_range_min
+        self.abs_range_max = snapshot.abs_range_max
+        self._positions_shared = True
+
     def set_mode(self, *gcode_list):
         self.mode.set_mode(*gcode_list)  # passthrough
 
         # Act on mode changes
         coord_sys_mode = self.mode.coordinate_system
         if coord_sys_mode:
-            self.state.cur_coord_sys = coord_sys_mode.coord_system_id
+            if self.state.cur_coord_sys != coord_sys_mode.coord_system_id:
+                self.state.cur_coord_sys = coord_sys_mode.coord_system_id
 
         # TODO: convert coord systems between inches/mm, G20/G21 respectively
         # NOTE : on at least a Haas -- this cannot be changed when running a
@@ -495,6 +794,8 @@ class Machine(object):
         :param block: Block instance to clean
         """
         assert isinstance(block, Block), "invalid parameter"
+        if not block.modal_params:
+            return
         if self.mode.motion is None:
             # no modal motion, modal parameters are all invalid
             block.modal_params = []
@@ -507,6 +808,8 @@ class Machine(object):
             )
             for w in unasigned_words:
                 block.modal_params.remove(w)
+            if unasigned_words:
+                block.dirty = True
 
     def process_gcodes(self, *gcode_list, **kwargs):
         """
@@ -514,15 +817,17 @@ class Machine(object):
         :param gcode_list: list of GCode instances
         :param modal_params: list of Word instances to be applied to current movement mode
         """
-        gcode_list = list(gcode_list) # make appendable
         # Add modal gcode to list of given gcodes
-        modal_params = kwargs.get('modal_params', [])
+        modal_params = kwargs.get('modal_params', None)
         if modal_params:
             modal_gcode = self.modal_gcode(modal_params)
             if modal_gcode:
-                gcode_list.append(modal_gcode)
+                gcode_list += (modal_gcode,)
 
-        for gcode in sorted(gcode_list):
+        if not _in_exec_order(gcode_list):
+            gcode_list = sorted(gcode_list)
+
+        for gcode in gcode_list:
             gcode.process(self) # shifts ownership of what happens now to GCode class
 
             # TODO: gcode instance to change machine's state
@@ -544,17 +849,28 @@ class Machine(object):
         self.process_block(line.block)
 
     # Position conversions (considering offsets)
+    def offsets_changed(self):
+        """
+        Clear the cached work offset (see State.offsets_changed); call it
+        after changing offsets in place by a reference kept from the state
+        """
+        self.state.offsets_changed()
+
+    def _offset_values(self):
+        """Values of the coordinate system offset, plus the temporary (G92) offset (cached)"""
+        return self.state.offset_values()
+
     def abs2work(self, abs_pos):
         assert isinstance(abs_pos, Position), "bad abs_pos type"
-        coord_sys_offset = getattr(self.state.coord_sys, 'offset', Position(axes=self.axes))
-        temp_offset = self.state.offset
-        return (abs_pos - coord_sys_offset) - temp_offset
+        return abs_pos._from_values(abs_pos.axes, abs_pos.unit, [
+            a - o for (a, o) in zip(abs_pos._value, self._offset_values())
+        ])
 
     def work2abs(self, work_pos):
         assert isinstance(work_pos, Position), "bad work_pos type"
-        coord_sys_offset = getattr(self.state.coord_sys, 'offset', Position(axes=self.axes))
-        temp_offset = self.state.offset
-        return (work_pos + temp_offset + coord_sys_offset)
+        return work_pos._from_values(work_pos.axes, work_pos.unit, [
+            w + o for (w, o) in zip(work_pos._value, self._offset_values())
+        ])
 
     @property
     def pos(self):
@@ -567,20 +883,84 @@ class Machine(object):
         self.abs_pos = self.work2abs(value)
         self._update_abs_range(self.abs_pos)
 
+    def _own_positions(self):
+        # positions are shared with a snapshot; copy them before they're changed
+        self.abs_pos = copy(self.abs_pos)
+        self.abs_range_min = copy(self.abs_range_min)
+        self.abs_range_max = copy(self.abs_range_max)
+        self._positions_shared = False
+
     def _update_abs_range(self, pos):
-        self.abs_range_min = Position.min(pos, self.abs_range_min)
-        self.abs_range_max = Position.max(pos, self.abs_range_max)
+        if self._positions_shared:
+            self._own_positions()
+        self.abs_range_min.update_min(pos)
+        self.abs_range_max.update_max(pos)
+
+    def _moved(self, values, lowest, highest):
+        """
+        Set absolute position after moves calculated elsewhere (see Toolpath.flush)
+        :param values: dict of end position values, of the form {<axis>: <value>, ...}
+        :param lowest: dict of lowest values reached (same form), to widen motion range with
+        :param highest: dict of highest values reached (same form)
+        """
+        if self._positions_shared:
+            self._own_positions()
+        (abs_values, range_min, range_max) = (
+            self.abs_pos._value, self.abs_range_min._value, self.abs_range_max._value,
+        )
+        for (k, v) in values.items():
+            i = _AXIS_INDEX[k]
+            abs_values[i] = v
+            range_min[i] = min(range_min[i], lowest[k])
+            range_max[i] = max(range_max[i], highest[k])
 
     # =================== Machine Actions ===================
     def move_to(self, rapid=False, **coords):
         """Move machine to given position"""
-        if isinstance(self.mode.distance, GCodeIncrementalDistanceMode):
-            pos_delta = Position(axes=self.axes, **coords)
-            self.pos += pos_delta
-        else:  # assumed: GCodeAbsoluteDistanceMode
-            new_pos = self.pos
-            new_pos.update(**coords)  # only change given coordinates
-            self.pos = new_pos
+        axes = self.abs_pos.axes
+        for k in coords:
+            if k not in axes:
+                raise MachineInvalidAxis("'%s' axis is not defined to be set" % k)
+        self._move(coords.items())
+
+    def move_to_params(self, params, rapid=False):
+        """
+        Move machine to position given by gcode parameters
+        :param params: dict of the form {<letter>: <Word>, ...} (eg: GCode.params),
+                       parameters that aren't one of the machine's axes are ignored
+        """
+        axes = self.abs_pos.axes
+        self._move((l, w.value) for (l, w) in params.items() if l in axes)
+
+    def _move(self, coords):
+        # Change absolute position in place, and update motion range
+        if self._positions_shared:
+            self._own_positions()
+        abs_pos = self.abs_pos
+        values = abs_pos._value
+        (range_min, range_max) = (self.abs_range_min._value, self.abs_range_max._value)
+        same_unit = (self.abs_range_min.unit == abs_pos.unit == self.abs_range_max.unit)
+
+        incremental = isinstance(self.mode.distance, GCodeIncrementalDistanceMode)
+        if not incremental:  # assumed: GCodeAbsoluteDistanceMode
+            offset_values = self._offset_values()
+        for (k, v) in coords:  # only change given coordinates
+            i = _AXIS_INDEX[k]
+            if incremental:
+                v += values[i]
+            else:
+                v += offset_values[i]
+            values[i] = v
+            if same_unit:
+                if v < range_min[i]:
+                    range_min[i] = v
+                elif v > range_max[i]:
+                    range_max[i] = v
+
+        if not same_unit:
+            self._update_abs_range(abs_pos)
+        if self.on_move is not None:
+            self.on_move(self)
 
 
 # Null Machine
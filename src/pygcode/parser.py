@@ -0,0 +1,201 @@
+import io
+import os
+from collections import deque
+
+import six
+
+from .line import Line
+from . import dialects
+
+DEFAULT_CHUNK_SIZE = 64 * 1024  # bytes read from file at a time
+DEFAULT_CHUNK_LINES = 2000  # lines parsed by each worker at a time
+DEFAULT_ENCODING = 'utf-8'
+
+
+def iter_file_lines(fileobj, chunk_size=DEFAULT_CHUNK_SIZE, encoding=DEFAULT_ENCODING):
+    """
+    Iterate through lines of a file, reading it in chunks
+    :param fileobj: file object opened for reading (binary or text)
+    :param chunk_size: number of bytes (or characters) read at a time
+    :param encoding: encoding of chunks read as text (to count bytes)
+    :return: generator of (<byte offset>, <line bytes>) tuples, line bytes exclude the newline
+
+    Memory used is bounded by ``chunk_size`` and the longest line, irrespective
+    of file size.
+    """
+    offset = 0
+    partial = []  # pieces of the (incomplete) last line, completed by following chunks
+    while True:
+        chunk = fileobj.read(chunk_size)
+        if not chunk:
+            break
+        if not isinstance(chunk, bytes):
+            chunk = chunk.encode(encoding)
+        lines = chunk.split(b'\n')
+        last = lines.pop()
+        if lines:
+            if partial:
+                partial.append(lines[0])
+                lines[0] = b''.join(partial)
+                partial = []
+            for line in lines:
+                yield (offset, line)
+                offset += len(line) + 1
+        if last:
+            partial.append(last)
+    if partial:
+        yield (offset, b''.join(partial))  # last line has no newline
+
+
+def _binary_fileobj(fileobj):
+    """
+    Text file's underlying (binary) buffer, if nothing has been read from it
+    (so chunks needn't be decoded); otherwise the file object itself (its
+    buffered text would be lost)
+    """
+    buffer = getattr(fileobj, 'buffer', None)
+    if buffer is None:
+        return fileobj
+    try:
+        if fileobj.tell() == 0 and buffer.tell() == 0:
+            return buffer
+    except (OSError, ValueError):  # (not seekable, or closed)
+        pass
+    return fileobj
+
+
+def parse_file(path_or_fileobj, dialect=None, chunk_size=DEFAULT_CHUNK_SIZE, lazy=False, encoding=None,
+               cache=None, line_number=1, byte_offset=0):
+    """
+    Parse a gcode file, line by line
+    :param path_or_fileobj: filename, or file object opened for reading
+    :param dialect: dialect of file's gcode (default if None)
+    :param chunk_size: number of bytes read from file at a time
+    :param lazy: if True, each line's content is parsed when first accessed (see :class:`Line`)
+    :param encoding: file's encoding (default: file object's encoding, or utf-8)
+    :param cache: cache to get each block's parsed words & gcodes from
+    :type cache: :class:`ParseCache <pygcode.cache.ParseCache>`
+    :param line_number: number of the line at byte_offset
+    :param byte_offset: offset of the first line to parse (the file is seeked there, if it's not 0)
+    :return: generator of :class:`Line` instances
+
+    Each line's ``line_number`` (1-based), and ``byte_offset`` (of the
+    line's first byte in the file) are set.
+
+    .. code-block:: python
+
+        from pygcode import parse_file
+        for line in parse_file('part.gcode'):
+            print(line.line_number, line.byte_offset, line.block.gcodes)
+
+    """
+    if isinstance(path_or_fileobj, six.string_types + (bytes,)) or hasattr(path_or_fileobj, '__fspath__'):
+        with io.open(path_or_fileobj, 'rb') as fileobj:
+            for line in parse_file(fileobj, dialect=dialect, chunk_size=chunk_size, lazy=lazy,
+                                   encoding=encoding, cache=cache,
+                                   line_number=line_number, byte_offset=byte_offset):
+                yield line
+        return
+
+    fileobj = path_or_fileobj
+    if encoding is None:
+        encoding = getattr(fileobj, 'encoding', None) or DEFAULT_ENCODING
+    fileobj = _binary_fileobj(fileobj)
+    if byte_offset:
+        fileobj.seek(byte_offset)
+
+    for (i, (offset, line_bytes)) in enumerate(iter_file_lines(fileobj, chunk_size, encoding=encoding)):
+        yield _new_line(line_bytes, line_number + i, byte_offset + offset, dialect=dialect, lazy=lazy,
+                        encoding=encoding, cache=cache)
+
+
+def _new_line(line_bytes, line_number, byte_offset, dialect=None, lazy=False, encoding=DEFAULT_ENCODING,
+              cache=None):
+    if line_bytes.endswith(b'\r'):
+        line_bytes = line_bytes[:-1]
+    line = Line(line_bytes.decode(encoding), dialect=dialect, lazy=lazy, cache=cache)
+    line.line_number = line_number
+    line.byte_offset = byte_offset
+    return line
+
+
+def _parse_chunk(first_line_number, file_lines, dialect, encoding):
+    # (run by worker processes)
+    return [
+        _new_line(line_bytes, first_line_number + i, offset, dialect=dialect, encoding=encoding)
+        for (i, (offset, line_bytes)) in enumerate(file_lines)
+    ]
+
+
+def parse_file_parallel(path_or_fileobj, dialect=None, chunk_lines=DEFAULT_CHUNK_LINES,
+                        max_workers=None, executor=None, chunk_size=DEFAULT_CHUNK_SIZE,
+                        encoding=None):
+    """
+    Parse a gcode file, line by line, with a pool of worker processes
+    :param path_or_fileobj: filename, or file object opened for reading
+    :param dialect: dialect of file's gcode (default if None)
+    :param chunk_lines: number of lines parsed by a worker at a time
+    :param max_workers: number of worker processes (default: number of CPUs)
+    :param executor: :class:`concurrent.futures.Executor` to use (instead of creating a process pool)
+    :param chunk_size: number of bytes read from file at a time
+    :param encoding: file's encoding (default: file object's encoding, or utf-8)
+    :return: generator of :class:`Line` instances (identical to :meth:`parse_file`)
+
+    The file is read (by the calling process) and split at line boundaries
+    into chunks of ``chunk_lines`` lines; each chunk is parsed by a worker.
+    Parsed lines are yielded in file order, and only a few chunks per
+    worker are in progress at a time, so memory use is still bounded.
+
+    .. note::
+
+        Blocks are parsed without context, so how a file is split into chunks
+        has no effect on the result: modal parameters (eg: ``X1 Y2`` after a
+        ``G1``) are left in each ``Block.modal_params`` and are resolved when
+        processed by a :class:`Machine <pygcode.machine.Machine>`, in order.
+
+    """
+    if isinstance(path_or_fileobj, six.string_types + (bytes,)) or hasattr(path_or_fileobj, '__fspath__'):
+        with io.open(path_or_fileobj, 'rb') as fileobj:
+            for line in parse_file_parallel(
+                    fileobj, dialect=dialect, chunk_lines=chunk_lines, max_workers=max_workers,
+                    executor=executor, chunk_size=chunk_size, encoding=encoding):
+                yield line
+        return
+
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+
+    if executor is None:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            for line in parse_file_parallel(
+                    path_or_fileobj, dialect=dialect, chunk_lines=chunk_lines, max_workers=max_workers,
+                    executor=executor, chunk_size=chunk_size, encoding=encoding):
+                yield line
+        return
+
+    if dialect is None:
+        dialect = dialects.get_default()  # workers may not share this process' default
+    fileobj = path_or_fileobj
+    if encoding is None:
+        encoding = getattr(fileobj, 'encoding', None) or DEFAULT_ENCODING
+    fileobj = _binary_fileobj(fileobj)
+    max_pending = 2 * max_workers  # chunks in progress
+
+    pending = deque()  # futures, in file order
+    chunk = []
+    line_number = 1
+    for file_line in iter_file_lines(fileobj, chunk_size, encoding=encoding):
+        chunk.append(file_line)
+        if len(chunk) >= chunk_lines:
+            pending.append(executor.submit(_parse_chunk, line_number, chunk, dialect, encoding))
+            line_number += len(chunk)
+            chunk = []
+            while len(pending) > max_pending:
+                for line in pending.popleft().result():
+                    yield line
+    if chunk:
+        pending.append(executor.submit(_parse_chunk, line_number, chunk, dialect, encoding))
+    while pending:
+        for line in pending.popleft().result():
+            yield line
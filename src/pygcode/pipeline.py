@@ -0,0 +1,581 @@
+import io
+from collections import deque
+
+from .gcodes import MODAL_GROUP_MAP, GCodeLinearMove, split_gcodes
+from .gcodes_base import GCodeArcMove, GCodeCannedCycle
+from .machine import Machine, GCodeIncrementalDistanceMode
+from .toolpath import _numpy_installed
+from .block import Block
+from .line import Line
+from .comment import Comment
+from .writer import GCodeWriter
+from .utils import omit_redundant_modes
+
+
+# ==================== Line States ====================
+
+class LineState(object):
+    """
+    Machine's state before, and after a line of a :class:`Pipeline`.
+
+    States are machine snapshots (see :meth:`Machine.snapshot`), taken once
+    as lines are processed, and shared by every stage; a machine is only
+    restored from them (by :attr:`machine`) if a stage needs one.
+    """
+    __slots__ = ('start', 'end', '_template', '_machine', '_mode')
+
+    def __init__(self, machine, start, end):
+        """
+        :param machine: Machine the snapshots are of (its class & settings are used to restore them)
+        :param start: MachineSnapshot before the line
+        :param end: MachineSnapshot after the line
+        """
+        self.start = start
+        self.end = end
+        self._template = machine
+        self._machine = None
+        self._mode = None
+
+    @property
+    def mode(self):
+        """Machine's mode before the line (treat as read-only)"""
+        if self._mode is None:
+            self._mode = self._template.mode.__class__(set_default=False)
+            self._mode.restore(self.start.mode)
+        return self._mode
+
+    @property
+    def machine(self):
+        """Machine in the state before the line (treat as read-only, see :meth:`new_machine`)"""
+        if self._machine is None:
+            self._machine = self.new_machine()
+        return self._machine
+
+    @property
+    def pos(self):
+        """Machine's position before the line (in the current coordinate system)"""
+        return self.machine.pos
+
+    def new_machine(self, snapshot=None):
+        """
+        New machine restored from the state before the line (eg: to process lines made by a stage)
+        :param snapshot: MachineSnapshot to restore instead
+        :return: Machine instance
+        """
+        return self._template.restored(self.start if snapshot is None else snapshot)
+
+
+def made_line(gcodes=(), comment=None):
+    """
+    Line of gcodes (eg: made by a transform), and / or a comment
+    :param gcodes: list of GCode instances
+    :param comment: Comment instance
+    :return: Line instance (without text)
+    """
+    line = Line()
+    line.block = Block()
+    if gcodes:
+        line.block.gcodes = list(gcodes)
+        line.block.words = [w for g in gcodes for w in [g.word] + [g.params[k] for k in sorted(g.params)]]
+    if comment:
+        line.comment = comment
+    return line
+
+
+def line_states(machine, lines):
+    """
+    Process lines (eg: made by a stage) with a machine
+    :param machine: Machine instance (changed)
+    :param lines: iterable of Line instances
+    :return: list of (<line>, <LineState>) tuples
+    """
+    items = []
+    start = machine.snapshot()
+    for line in lines:
+        end = start
+        if line.block:
+            machine.process_block(line.block)
+            end = machine.snapshot()
+        items.append((line, LineState(machine, start, end)))
+        start = end
+    return items
+
+
+class LinearMoves(Line):
+    """
+    Line standing for a run of linear moves (eg: a linearized arc), kept as
+    coordinate columns instead of gcodes: its block is empty, and its
+    :class:`LineState` is that of all of its moves.
+
+    Moves are written by :meth:`write` (with :meth:`GCodeWriter.write_moves
+    <pygcode.writer.GCodeWriter.write_moves>`), or can be had as lines of
+    gcodes with :meth:`lines`.
+    """
+    __slots__ = ('columns', 'omit_redundant')
+
+    def __init__(self, columns=None, omit_redundant=False):
+        """
+        :param columns: list of (<letter>, <numpy array>) tuples (eg: [('X', xs), ('Y', ys)])
+        :param omit_redundant: if True, the motion word is only written on the first move
+        """
+        super(LinearMoves, self).__init__()
+        self.block = Block()
+        self.columns = columns
+        self.omit_redundant = omit_redundant
+
+    def write(self, writer):
+        """
+        Write moves, one per line
+        :param writer: GCodeWriter instance
+        """
+        word = writer.format_word(GCodeLinearMove().word)
+        if self.omit_redundant and self.columns and (len(self.columns[0][1]) > 1):
+            # (the word is replaced by whitespace, as omit_redundant_modes() does)
+            writer.write_moves(word, [(l, v[:1]) for (l, v) in self.columns])
+            writer.write_moves(' ' * len(word), [(l, v[1:]) for (l, v) in self.columns])
+        else:
+            writer.write_moves(word, self.columns or [])
+
+    def lines(self):
+        """
+        Moves as lines of gcodes (eg: to process them with a machine)
+        :return: list of Line instances
+        """
+        return [
+            made_line([GCodeLinearMove(**dict(zip([l for (l, v) in self.columns], row)))])
+            for row in zip(*[v.tolist() for (l, v) in self.columns or []])
+        ]
+
+    def __str__(self):
+        fileobj = io.StringIO()
+        with GCodeWriter(fileobj) as writer:
+            self.write(writer)
+        return fileobj.getvalue().rstrip('\n')
+
+
+# ==================== Line Processors ====================
+
+class LineProcessor(object):
+    """
+    Base of streaming line processors (eg: PolylineSimplifier, WordCompactor),
+    processing each line given to :meth:`process_line` with a ``machine``.
+
+    A line's :class:`LineState` may be given with it (eg: by a
+    :class:`ProcessorStage`): the machine is then restored to the states
+    before, and after the line, instead of processing it again; so it
+    should be of the same class (and settings) as the machine the states
+    are of. Subclasses process blocks with :meth:`_process_block`.
+    """
+    machine = None  # Machine instance (set by subclasses)
+    _state = None  # LineState of the line being processed (if given)
+    _restored = None  # snapshot the machine was last restored to (after a line)
+
+    def process_line(self, line, state=None):
+        """
+        Process a line
+        :param line: Line instance
+        :param state: LineState of line (the machine is restored to it, instead of processing line)
+        :return: list of Line instances that are ready (in order), or a Line instance
+        """
+        raise NotImplementedError("process_line must be overridden")
+
+    def _follow(self, state):
+        # to be called first by process_line: restore the machine to the state before the line
+        self._state = state
+        if (state is not None) and (state.start is not self._restored):
+            self.machine.restore(state.start)
+
+    def _process_block(self, block):
+        # process block with the machine, or restore it to the state after the line
+        state = self._state
+        if state is None:
+            self.machine.process_block(block)
+            self._restored = None
+        else:
+            self.machine.restore(state.end)
+            self._restored = state.end
+
+
+# ==================== Pipeline ====================
+
+class Pipeline(object):
+    """
+    Streaming transform of gcode lines, by a chain of stages.
+
+    Lines are processed by a single machine (once), and passed through each
+    stage with their state, as ``(<line>, <LineState>)`` tuples. A stage is
+    any callable given an iterable of those tuples, returning an iterable of
+    them (typically a generator: see :class:`Stage`); so lines are pulled
+    through every stage as they're read, and only those a stage holds back
+    are kept in memory.
+
+    .. code-block:: python
+
+        from pygcode import parse_file
+        from pygcode.pipeline import Pipeline, ProcessorStage, LinearizeArcs
+        from pygcode.simplify import PolylineSimplifier
+
+        pipeline = Pipeline([
+            ProcessorStage(PolylineSimplifier(tolerance=0.01)),
+            LinearizeArcs(max_error=0.005),
+        ])
+        for line in pipeline.process_lines(parse_file('part.gcode')):
+            print(line.text)
+
+    Stages (and the machine) keep their state; a pipeline processes one program.
+    """
+
+    def __init__(self, stages=None, machine=None, clean_blocks=False):
+        """
+        :param stages: list of stages (callables), in the order lines pass through them
+        :param machine: Machine instance to process gcode with (default: Machine())
+        :param clean_blocks: if True, invalid modal parameters are removed from
+                             blocks before they're processed (see Machine.clean_block)
+        """
+        if machine is None:
+            machine = Machine()
+        self.stages = list(stages or [])
+        self.machine = machine
+        self.clean_blocks = clean_blocks
+
+    def add(self, stage):
+        """
+        Add a stage (after those already added)
+        :param stage: callable: <iterable of (line, state) tuples> -> <iterable of (line, state) tuples>
+        :return: self (so calls can be chained)
+        """
+        self.stages.append(stage)
+        return self
+
+    def states(self, lines):
+        """
+        Process lines with the pipeline's machine
+        :param lines: iterable of Line instances
+        :return: generator of (<line>, <LineState>) tuples
+        """
+        machine = self.machine
+        start = machine.snapshot()
+        for line in lines:
+            end = start
+            block = line.block
+            if block:
+                if self.clean_blocks:
+                    machine.clean_block(block)
+                machine.process_block(block)
+                end = machine.snapshot()
+            yield (line, LineState(machine, start, end))
+            start = end
+
+    def process(self, lines):
+        """
+        Pass lines through every stage
+        :param lines: iterable of Line instances
+        :return: iterable of (<line>, <LineState>) tuples (from the last stage)
+        """
+        items = self.states(lines)
+        for stage in self.stages:
+            items = stage(items)
+        return items
+
+    def process_lines(self, lines):
+        """
+        Pass lines through every stage
+        :param lines: iterable of Line instances
+        :return: generator of Line instances
+        """
+        for (line, state) in self.process(lines):
+            yield line
+
+
+# ==================== Stages ====================
+
+class Stage(object):
+    """
+    Base of pipeline stages: each line (with its state) is passed to
+    :meth:`process`, returning those that are ready to pass on; lines held
+    back are returned by :meth:`flush` at the end of the program.
+    """
+
+    def __call__(self, items):
+        process = self.process
+        for (line, state) in items:
+            for item in process(line, state):
+                yield item
+        for item in self.flush():
+            yield item
+
+    def process(self, line, state):
+        """
+        Process a line
+        :param line: Line instance
+        :param state: LineState of line
+        :return: list of (<line>, <LineState>) tuples that are ready (in order)
+        """
+        return [(line, state)]
+
+    def flush(self):
+        """
+        Lines held back (at the end of the program)
+        :return: list of (<line>, <LineState>) tuples
+        """
+        return []
+
+
+class _SplitStage(Stage):
+    # Replaces a gcode (of SPLIT_CLASS) with the lines of _expanded(), lines are:
+    #   gcodes before it (in execution order), a comment noting it, its
+    #   replacement, gcodes after it, then the line's comment
+    SPLIT_CLASS = None
+    COMMENT_FORMAT = None
+
+    def __init__(self, comments=True, omit_redundant_modes=True):
+        self.comments = comments
+        self.omit_redundant_modes = omit_redundant_modes
+
+    def _matches(self, gcode):
+        return isinstance(gcode, self.SPLIT_CLASS)
+
+    def process(self, line, state):
+        block = line.block
+        if not block:
+            return [(line, state)]
+        if not any(self._matches(g) for g in block.gcodes):
+            motion = state.mode.modal_groups.get(MODAL_GROUP_MAP['motion'], None)
+            if not (block.modal_params and motion and self._matches(motion)):
+                return [(line, state)]
+
+        machine = state.new_machine()
+        gcodes = machine.block_modal_gcodes(block)
+        if not any(self._matches(g) for g in gcodes):
+            return [(line, state)]
+        (befores, (gcode,), afters) = split_gcodes(gcodes, self.SPLIT_CLASS)
+
+        items = []
+        if befores:
+            items += line_states(machine, [made_line(befores)])
+        if self.comments:
+            items += line_states(machine, [made_line(comment=Comment(self.COMMENT_FORMAT % gcode))])
+        items += self._replaced(gcode, machine)
+        if afters:
+            items += line_states(machine, [made_line(afters)])
+        if line.comment:
+            items += line_states(machine, [made_line(comment=line.comment)])
+        return items
+
+    def _replaced(self, gcode, machine):
+        # (line, state) items replacing gcode, with machine in the state before it (processed)
+        expanded = self._expanded(gcode, machine)
+        if self.omit_redundant_modes:
+            expanded = omit_redundant_modes(expanded)
+        return line_states(machine, [made_line([g]) for g in expanded])
+
+    def _expanded(self, gcode, machine):
+        # gcodes replacing gcode, with machine in the state before it
+        raise NotImplementedError("_expanded must be overridden")
+
+
+class LinearizeArcs(_SplitStage):
+    """
+    Replace arcs (G2, G3) with linear moves (G1) approximating them (see
+    :func:`linearize_arc <pygcode.transform.linearize_arc>`).
+
+    Lines with an arc are replaced by lines of: the codes before it (in
+    execution order), a comment noting the arc, the linear moves, codes
+    after it, then the line's comment. Requires a dialect with plane
+    selection, and distance modes (eg: ``linuxcnc``).
+
+    With numpy, arcs are linearized in batches (see :func:`arc_moves
+    <pygcode.transform.arc_moves>`), so lines are held back until
+    ``batch_size`` arcs are, and each arc's linear moves are a single
+    :class:`LinearMoves` line.
+    """
+    SPLIT_CLASS = GCodeArcMove
+    COMMENT_FORMAT = "linearized arc: %r"
+
+    def __init__(self, max_error=0.01, method_class=None, decimal_places=3, batch_size=1000, **kwargs):
+        """
+        :param max_error: maximum distance of linear moves from the arc
+        :param method_class: ArcLinearizeMethod class, or dict of the form
+                             {<arc Word>: <ArcLinearizeMethod class>, ...} (default: ArcLinearizeMid)
+        :param decimal_places: decimal places of linear moves' coordinates
+        :param batch_size: arcs linearized at once (with numpy), 0 to replace
+                           each arc with a line per linear move
+        :param comments: if True, a comment notes each arc that's replaced
+        :param omit_redundant_modes: if True, repeated motion words (G1) are omitted
+        """
+        super(LinearizeArcs, self).__init__(**kwargs)
+        self.max_error = max_error
+        self.method_class = method_class
+        self.decimal_places = decimal_places
+        self.batch_size = batch_size if _numpy_installed() else 0
+
+        self._held = []  # items held back until their arcs are linearized
+        self._arcs = []  # arcs to linearize: [(<LinearMoves>, <ArcLinearizeMethod>, <start xyz>, <incremental>), ...]
+
+    def process(self, line, state):
+        items = super(LinearizeArcs, self).process(line, state)
+        if not self._arcs:
+            return items
+        self._held += items
+        if len(self._arcs) < self.batch_size:
+            return []
+        return self.flush()
+
+    def flush(self):
+        from .transform import arc_moves
+        if self._arcs:
+            (lines, methods, starts, incremental) = zip(*self._arcs)
+            for (line, moves) in zip(lines, arc_moves(methods, starts, incremental, self.decimal_places)):
+                line.columns = [(letter, moves[:, i]) for (i, letter) in enumerate('XYZ')]
+        (items, self._held, self._arcs) = (self._held, [], [])
+        return items
+
+    def _replaced(self, gcode, machine):
+        if not self.batch_size:
+            return super(LinearizeArcs, self)._replaced(gcode, machine)
+        from .transform import linearize_arc_method
+        method = linearize_arc_method(
+            arc_gcode=gcode,
+            start_pos=machine.pos,
+            plane=machine.mode.plane_selection,
+            method_class=self._method_class(gcode),
+            dist_mode=machine.mode.distance,
+            arc_dist_mode=machine.mode.arc_ijk_distance,
+            max_error=self.max_error,
+        )
+        start = machine.pos.vector.xyz
+        end = (method.arc_p_end + method.helical_end).xyz
+        incremental = isinstance(machine.mode.distance, GCodeIncrementalDistanceMode)
+        if incremental:
+            # (the sum of the moves' rounded deltas)
+            end = [round(e - s, self.decimal_places) for (e, s) in zip(end, start)]
+
+        # the machine makes a single move to the end of the linear moves
+        ((_, state),) = line_states(machine, [made_line([GCodeLinearMove(**dict(zip('XYZ', end)))])])
+        line = LinearMoves(omit_redundant=self.omit_redundant_modes)
+        self._arcs.append((line, method, start, incremental))
+        return [(line, state)]
+
+    def _expanded(self, gcode, machine):
+        from .transform import linearize_arc
+        return linearize_arc(
+            arc_gcode=gcode,
+            start_pos=machine.pos,
+            plane=machine.mode.plane_selection,
+            method_class=self._method_class(gcode),
+            dist_mode=machine.mode.distance,
+            arc_dist_mode=machine.mode.arc_ijk_distance,
+            max_error=self.max_error,
+            decimal_places=self.decimal_places,
+        )
+
+    def _method_class(self, gcode):
+        method_class = self.method_class
+        if isinstance(method_class, dict):
+            method_class = method_class.get(gcode.word, None)
+        return method_class
+
+
+class ExpandCannedCycles(_SplitStage):
+    """
+    Replace canned cycles (eg: G81, G83) with the rapid & linear moves, and
+    dwells they're made of (see :func:`simplify_canned_cycle
+    <pygcode.transform.simplify_canned_cycle>`).
+
+    Lines are replaced as they are by :class:`LinearizeArcs`. Requires a
+    dialect with plane selection, and distance modes (eg: ``linuxcnc``).
+    """
+    SPLIT_CLASS = GCodeCannedCycle
+    COMMENT_FORMAT = "expanded: %r"
+
+    def __init__(self, codes=None, **kwargs):
+        """
+        :param codes: set of canned cycles' words to expand (eg: {Word('G81')}), None for all of them
+        :param comments: if True, a comment notes each canned cycle that's replaced
+        :param omit_redundant_modes: if True, repeated motion words are omitted
+        """
+        super(ExpandCannedCycles, self).__init__(**kwargs)
+        self.codes = codes
+
+    def _matches(self, gcode):
+        return isinstance(gcode, GCodeCannedCycle) and ((self.codes is None) or (gcode.word in self.codes))
+
+    def _expanded(self, gcode, machine):
+        from .transform import simplify_canned_cycle
+        return simplify_canned_cycle(
+            canned_gcode=gcode,
+            start_pos=machine.pos,
+            plane=machine.mode.plane_selection,
+            dist_mode=machine.mode.distance,
+            axes=machine.axes,
+        )
+
+
+class ProcessorStage(Stage):
+    """
+    Stage of a line processor (see :class:`LineProcessor`): eg:
+    PolylineSimplifier, ArcFitter, WordCompactor.
+
+    Each line is given to the processor with its state, so the processor's
+    machine is restored to the pipeline's states instead of processing the
+    line again. Lines it passes on keep their state; lines it makes are
+    processed (only them) to get theirs.
+    """
+
+    def __init__(self, processor, keeps_state=False):
+        """
+        :param processor: LineProcessor instance (or an object with its
+                          ``process_line(line, state)``, ``flush()`` & ``held``)
+        :param keeps_state: if True, lines made by the processor replace lines one for one, and
+                            leave the machine in the same state as the line they replace
+                            (eg: WordCompactor), so they're given that line's state
+        """
+        self.processor = processor
+        self.keeps_state = keeps_state
+
+        self._pending = deque()  # (line, state) tuples given to the processor, not yet passed on
+        self._pending_ids = set()
+        self._end = None  # snapshot after the last line passed on
+        self._state = None  # last state given (to restore machines with)
+
+    def _items(self, lines, held):
+        # lines given by the processor, with their states
+        pending = self._pending
+        items = []
+        for line in lines:
+            if id(line) in self._pending_ids:
+                while True:
+                    (pending_line, state) = pending.popleft()
+                    self._pending_ids.discard(id(pending_line))
+                    if pending_line is line:
+                        break
+                items.append((line, state))
+            elif self.keeps_state and pending:
+                (pending_line, state) = pending.popleft()
+                self._pending_ids.discard(id(pending_line))
+                items.append((line, state))
+            else:
+                start = self._end if (self._end is not None) else self._state.start
+                items += line_states(self._state.new_machine(start), [line])
+            self._end = items[-1][1].end
+
+        # lines replaced (no longer held back by the processor)
+        while len(pending) > held:
+            (pending_line, state) = pending.popleft()
+            self._pending_ids.discard(id(pending_line))
+        return items
+
+    def process(self, line, state):
+        self._state = state
+        self._pending.append((line, state))
+        self._pending_ids.add(id(line))
+        lines = self.processor.process_line(line, state)
+        if isinstance(lines, Line):
+            lines = [lines]
+        return self._items(lines, getattr(self.processor, 'held', 0))
+
+    def flush(self):
+        flush = getattr(self.processor, 'flush', None)
+        if flush is None or (self._state is None):
+            return []
+        return self._items(flush(), 0)
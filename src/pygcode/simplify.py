@@ -0,0 +1,364 @@
+from math import sqrt
+
+from .gcodes_base import GCodeMotion, GCodeUnit, GCodeFeedRateMode, GCodeCannedCycle
+from .gcodes_base import GCodeMachineRoutines, GCodeCalibrationRoutines
+from .machine import Machine, GCodeIncrementalDistanceMode, _AXIS_INDEX
+from .toolpath import Toolpath
+from .words import dialect_tokenizer
+from .arcfit import LinearMoveRuns, LINEAR_MOVE_WORD
+from .line import Line
+from .pipeline import LineProcessor
+
+
+# ==================== Linear Motion (G1) Runs --> Fewer Lines ====================
+
+def segment_distance(point, start, end):
+    """
+    Distance from a point to a line segment (of any number of dimensions)
+    :param point: point as tuple of coordinates
+    :param start: start of segment (as point)
+    :param end: end of segment (as point)
+    :return: float
+    """
+    direction = [b - a for (a, b) in zip(start, end)]
+    offset = [p - a for (a, p) in zip(start, point)]
+    length2 = sum(d * d for d in direction)
+    t = 0.
+    if length2:
+        t = min(max(sum(o * d for (o, d) in zip(offset, direction)) / length2, 0.), 1.)
+    return sqrt(sum((o - t * d) ** 2 for (o, d) in zip(offset, direction)))
+
+
+def simplified_vertices(points, tolerance):
+    """
+    Ramer-Douglas-Peucker polyline simplification
+    :param points: list of polyline's vertices (as tuples of coordinates)
+    :param tolerance: maximum distance a removed vertex may be from the simplified polyline
+    :return: sorted list of indexes of kept vertices (always includes the first & last)
+    """
+    if len(points) < 3:
+        return list(range(len(points)))
+    keep = set([0, len(points) - 1])
+    stack = [(0, len(points) - 1)]
+    while stack:
+        (first, last) = stack.pop()
+        (distance, index) = (0., None)
+        for i in range(first + 1, last):
+            d = segment_distance(points[i], points[first], points[last])
+            if d > distance:
+                (distance, index) = (d, i)
+        if (index is not None) and (distance > tolerance):
+            keep.add(index)
+            stack += [(first, index), (index, last)]
+    return sorted(keep)
+
+
+class PolylineSimplifier(LinearMoveRuns):
+    """
+    Streaming simplification of runs of linear moves (G1), merging lines
+    so the path doesn't deviate more than ``tolerance`` from the original
+    (Ramer-Douglas-Peucker).
+
+    Lines are processed by a machine; consecutive G1 moves (in absolute
+    distance mode) are held back until the run ends: on any other line
+    (eg: a comment, a non-motion gcode), a feed rate change, or a change
+    between extruding, not extruding, and retracting.
+
+    Each merged line is given the end point, the feed rate (if given with
+    the run's first line), and the extrusion of the lines it replaces
+    (``E``, in the extruder's distance mode: M82 / M83). Lines that aren't
+    merged are yielded as-is.
+
+    .. code-block:: python
+
+        from pygcode import parse_file
+        from pygcode.simplify import PolylineSimplifier
+        simplifier = PolylineSimplifier(tolerance=0.01)
+        for line in simplifier.process_lines(parse_file('part.gcode')):
+            print(line.text)
+        print("removed %i lines" % simplifier.removed)
+
+    """
+    AXES = ('X', 'Y', 'Z')
+
+    def __init__(self, machine=None, tolerance=0.01, e_tolerance=0.05,
+                 max_segments=1000, decimal_places=3, e_decimal_places=5):
+        """
+        :param machine: Machine instance to process gcode with (default: Machine())
+        :param tolerance: maximum distance a removed vertex may be from the simplified path
+        :param e_tolerance: maximum variation of extrusion per unit of length (proportion)
+        :param max_segments: maximum number of lines held back (simplified together)
+        :param decimal_places: decimal places of merged lines' coordinates
+        :param e_decimal_places: decimal places of merged lines' extrusion
+        """
+        super(PolylineSimplifier, self).__init__(machine=machine, max_segments=max_segments)
+        self.tolerance = tolerance
+        self.e_tolerance = e_tolerance
+        self.decimal_places = decimal_places
+        self.e_decimal_places = e_decimal_places
+        self.removed = 0  # number of lines removed (by merging)
+
+    def _run_axes(self):
+        axes = self.machine.axes
+        return tuple(a for a in self.AXES if a in axes)
+
+    def _fit(self, points, segments):
+        # Extrusion per length is the same (or there is none, or it's all retraction)
+        if len(segments) < 2:
+            return True
+        if any(segment[2] < 0 for segment in segments):
+            return all(segment[2] < 0 for segment in segments)
+        return self._uniform_extrusion(points, segments, self.e_tolerance)
+
+    def _run_lines(self, points, segments):
+        kept = simplified_vertices(points, self.tolerance)
+        output = []
+        for (first, last) in zip(kept[:-1], kept[1:]):
+            if last == first + 1:
+                output.append(segments[first][0])  # (not merged)
+            else:
+                output.append(self._merged_line(points, segments, first, last))
+                self.removed += last - first - 1
+        return output
+
+    def _merged_line(self, points, segments, first, last):
+        # Line replacing lines between points[first] & points[last]
+        merged = segments[first:last]
+        params = [
+            (axis, points[last][i], self.decimal_places)
+            for (i, axis) in enumerate(self._axes)
+            if any(axis in segment[1].params for segment in merged)
+        ]
+        extrusions = [segment[2] for segment in merged]
+        if any(extrusions):
+            e = sum(extrusions) if self.e_relative else merged[-1][3]
+            params.append(('E', e, self.e_decimal_places))
+        first_params = segments[0][1].params
+        if (first == 0) and ('F' in first_params):
+            params.append(('F', float(first_params['F'].value), self.decimal_places))
+        return Line(self._move_text(LINEAR_MOVE_WORD, params))
+
+
+def simplify_polylines(lines, **kwargs):
+    """
+    Merge runs of linear moves (G1) within a maximum deviation (see PolylineSimplifier)
+    :param lines: iterable of Line instances
+    :param kwargs: PolylineSimplifier parameters
+    :return: generator of Line instances
+    """
+    return PolylineSimplifier(**kwargs).process_lines(lines)
+
+
+# ==================== Redundant Words --> Removed ====================
+
+class WordCompactor(LineProcessor):
+    """
+    Streaming removal of words that don't change the machine's state.
+
+    Lines are processed by a machine (also tracking the extruder, and the
+    feed rate); the following words are removed (before the line is processed):
+
+    - rapid & linear move (G0, G1) coordinates the machine is already at
+      (in absolute distance mode; or ``0`` in incremental distance mode),
+      but only once the axis' position has been given (by a coordinate),
+      and hasn't since been changed by a routine (eg: homing, probing),
+      a canned cycle, or a change of units
+    - their extrusion, if there is none (``E`` in M83 mode is ``0``,
+      or in M82 mode, is the extruder's position)
+    - their feed rate (``F``), if it's the current feed rate
+    - ``F``, ``S`` and ``T`` codes repeating the current value (without parameters)
+
+    A move keeps at least one of its coordinates (so it's still a move,
+    even if it doesn't go anywhere). Lines with removed words are replaced
+    by a line of the remaining words (as they're written in the original),
+    separated by a single space, followed by the line's comment; other
+    lines are yielded as-is. Lines left without words (or only with a move
+    word repeating the motion mode, eg: ``G1 F1200``) are removed, unless
+    they have a comment.
+
+    .. code-block:: python
+
+        from pygcode import parse_file
+        from pygcode.simplify import compact_lines
+        for line in compact_lines(parse_file('part.gcode')):
+            print(line.text)
+
+    """
+    # (extruder positioning mode words: see Toolpath)
+    E_MODE_WORDS = Toolpath.E_MODE_WORDS
+    E_SET_POSITION_WORD = Toolpath.E_SET_POSITION_WORD
+
+    # Words that are codes of their own, setting a value (eg: F1200)
+    STATE_LETTERS = 'FST'
+    # Motions with coordinates that can be removed
+    MOVE_WORD_VALUES = (0, 1)
+
+    # Gcodes after which the machine's position is not known
+    #   (unless a routine's motion is simulated, it's not where the machine thinks it is)
+    POSITION_RESET_CLASSES = (GCodeMachineRoutines, GCodeCalibrationRoutines, GCodeCannedCycle, GCodeUnit)
+    FEED_RATE_RESET_CLASSES = (GCodeUnit, GCodeFeedRateMode)
+
+    def __init__(self, machine=None):
+        """
+        :param machine: Machine instance to process gcode with (default: Machine())
+        """
+        if machine is None:
+            machine = Machine()
+        self.machine = machine
+        self.removed = 0  # number of words removed
+
+        # Tracked state (not kept by the machine)
+        self.e = 0.0
+        self.e_relative = False
+        self.feed_rate = None  # (None: unknown)
+        self._values = {}  # {<state letter>: <value>, ...}
+        self._known_axes = set()  # axes with a known position
+        self._relative = False  # G91 given (not all dialects' machines apply it)
+
+    # --- Redundant words
+    def _redundant_move_letters(self, gcode):
+        # letters of move's parameters that don't change anything
+        machine = self.machine
+        incremental = isinstance(machine.mode.distance, GCodeIncrementalDistanceMode)
+        offsets = machine._offset_values()
+        values = machine.abs_pos._value
+        axes = machine.abs_pos.axes
+
+        letters = []
+        for (letter, word) in gcode.params.items():
+            value = word.value
+            if letter in axes:
+                if self._relative and not incremental:
+                    redundant = False  # (G91 not applied by machine: ambiguous)
+                elif incremental:
+                    redundant = (value == 0)
+                else:
+                    i = _AXIS_INDEX[letter]
+                    redundant = (letter in self._known_axes) and (value + offsets[i] == values[i])
+            elif letter == 'E':
+                redundant = (float(value) == (0. if self.e_relative else self.e))
+            elif letter == 'F':
+                redundant = (float(value) == self.feed_rate)
+            else:
+                redundant = False
+            if redundant:
+                letters.append(letter)
+
+        # keep a coordinate (or extrusion)
+        moving = [l for l in gcode.params if l not in 'FS']
+        if moving and all(l in letters for l in moving):
+            letters.remove(moving[0])
+        return letters
+
+    def _redundant_letters(self, gcodes):
+        # letters of words (of the given gcodes) that don't change anything
+        letters = []
+        for gcode in gcodes:
+            word = gcode.word
+            if (word.letter in self.STATE_LETTERS) and not gcode.params:
+                value = float(word.value) if (word.letter == 'F') else word.value
+                if (word.letter == 'F') and (value == self.feed_rate):
+                    letters.append(word.letter)
+                elif self._values.get(word.letter, None) == value:
+                    letters.append(word.letter)
+
+        moves = [g for g in gcodes if isinstance(g, GCodeMotion)]
+        if (len(moves) == 1) and self._is_move(moves[0]) and \
+                all((g is moves[0]) or (g.word.letter in self.STATE_LETTERS and not g.params) for g in gcodes):
+            # (no other gcode could change how the move's parameters are interpreted)
+            letters += self._redundant_move_letters(moves[0])
+        return letters
+
+    def _is_move(self, gcode):
+        return (gcode.word.letter == 'G') and (gcode.word.value in self.MOVE_WORD_VALUES) and \
+            (type(gcode)._process is GCodeMotion._process)
+
+    # --- Processing
+    def _process(self, gcodes, block):
+        # process block with the machine (also tracking the extruder, feed rate, and known positions)
+        machine = self.machine
+        for gcode in gcodes:
+            word = gcode.word
+            params = gcode.params
+            key = (word.letter, word.value)
+            if word.letter in self.STATE_LETTERS and not params:
+                self._values[word.letter] = word.value
+                if word.letter == 'F':
+                    self.feed_rate = float(word.value)
+            elif 'F' in params:
+                self.feed_rate = float(params['F'].value) if isinstance(gcode, GCodeMotion) else None
+            if key in self.E_MODE_WORDS:
+                self.e_relative = self.E_MODE_WORDS[key]
+                if word.letter == 'G':
+                    self._relative = self.e_relative
+            elif 'E' in params:
+                e = float(params['E'].value)
+                if key == self.E_SET_POSITION_WORD:
+                    self.e = e
+                elif isinstance(gcode, GCodeMotion):
+                    self.e = (self.e + e) if self.e_relative else e
+
+            incremental = isinstance(machine.mode.distance, GCodeIncrementalDistanceMode)
+            if isinstance(gcode, self.POSITION_RESET_CLASSES) or \
+                    (isinstance(gcode, GCodeMotion) and not self._is_move(gcode)) or \
+                    (isinstance(gcode, GCodeMotion) and self._relative and not incremental):
+                self._known_axes.clear()
+            elif self._is_move(gcode) and not incremental:
+                self._known_axes.update(l for l in params if l in machine.abs_pos.axes)
+            if isinstance(gcode, self.FEED_RATE_RESET_CLASSES):
+                self.feed_rate = None
+        self._process_block(block)
+
+    def process_line(self, line, state=None):
+        """
+        Process a line
+        :param line: Line instance
+        :param state: LineState of line (see LineProcessor)
+        :return: Line instance (the given line if nothing's removed), or an
+                 empty list if the line is removed
+        """
+        self._follow(state)
+        block = line.block
+        if not block:
+            return line
+        motion = self.machine.mode.motion  # (before the line)
+        gcodes = self.machine.block_modal_gcodes(block)
+        letters = self._redundant_letters(gcodes)
+        self._process(gcodes, block)
+        if not letters:
+            return line
+
+        tokens = list(dialect_tokenizer(block.dialect).iter_tokens(block.text))
+        letters = [l for l in letters if sum(1 for (letter, v) in tokens if letter == l) == 1]
+        if not letters:
+            return line
+        words = [letter + value for (letter, value) in tokens if letter not in letters]
+        if (len(words) == 1) and (len(gcodes) == 1) and (motion is not None) and \
+                (gcodes[0].word == motion.word) and all(l in letters for l in gcodes[0].params):
+            words = []  # (motion mode repeated, without parameters)
+        self.removed += len(tokens) - len(words)
+        comments = [str(x) for x in (line.comment, line.macro) if x]
+        if not (words or comments):
+            return []
+        return Line(' '.join(words + comments), dialect=line.dialect)
+
+    def process_lines(self, lines):
+        """
+        Process lines
+        :param lines: iterable of Line instances
+        :return: generator of Line instances
+        """
+        for line in lines:
+            processed = self.process_line(line)
+            if isinstance(processed, Line):
+                yield processed
+
+
+def compact_lines(lines, **kwargs):
+    """
+    Remove words that don't change the machine's state (see WordCompactor)
+    :param lines: iterable of Line instances
+    :param kwargs: WordCompactor parameters
+    :return: generator of Line instances
+    """
+    return WordCompactor(**kwargs).process_lines(lines)
@@ -0,0 +1,120 @@
+from .toolpath import Toolpath
+from .machine import _AXIS_INDEX
+from .line import Line
+from .block import Block
+
+
+class Simulation(object):
+    """
+    Whole program simulation: absolute end positions of every motion,
+    analysed with array operations (requires numpy).
+
+    Blocks are recorded by a :class:`Toolpath <pygcode.toolpath.Toolpath>`,
+    so plain linear moves are batched: their positions are calculated for
+    all of them at once, with array operations (see ``Toolpath.flush``);
+    other blocks are processed by the :class:`Machine <pygcode.machine.Machine>`
+    (so modes, and work offsets have the same effect).
+
+    .. code-block:: python
+
+        from pygcode import Simulation, parse_file
+        sim = Simulation()
+        sim.process_lines(parse_file('part.gcode', lazy=True))
+        (low, high) = sim.bounds()
+        print(low, high, sim.travel())
+
+    """
+
+    def __init__(self, machine=None):
+        """
+        :param machine: Machine instance to process gcode with (default: Machine())
+        """
+        self.toolpath = Toolpath(machine=machine)
+        self.machine = self.toolpath.machine
+        self.start = list(self.machine.abs_pos._value)  # absolute position before the first motion
+
+        self._positions = None  # (numpy array) cleared when motions are added
+
+    def __len__(self):
+        return len(self.toolpath)
+
+    # --- Recording
+    def process_blocks(self, blocks):
+        """
+        Process Blocks, recording motions
+        :param blocks: iterable of Block instances
+        """
+        self.process_lines(blocks)
+
+    def process_lines(self, lines):
+        """
+        Process Lines (eg: from :meth:`parse_file <pygcode.parser.parse_file>`), recording motions
+        :param lines: iterable of Line (or Block) instances
+        """
+        toolpath = self.toolpath
+        try:
+            for line in lines:
+                if isinstance(line, Line):
+                    toolpath.process_block(line.block, line_number=line.line_number)
+                else:
+                    assert isinstance(line, Block), "invalid parameter"
+                    toolpath.process_block(line)
+        finally:
+            toolpath.flush()
+            self._positions = None
+
+    # --- Results
+    @property
+    def positions(self):
+        """
+        Absolute end position of each motion (requires numpy)
+        :return: numpy.ndarray of shape (<motions>, 9), columns in POSITION_AXES order
+        """
+        if self._positions is None:
+            import numpy
+            # (axes the machine doesn't have are never moved)
+            positions = numpy.tile(numpy.array(self.start, dtype=float), (len(self), 1))
+            for axis in self.toolpath.axes:
+                positions[:, _AXIS_INDEX[axis.upper()]] = self.toolpath['end_' + axis]
+            self._positions = positions
+        return self._positions
+
+    @property
+    def line_numbers(self):
+        """Source line number of each motion (-1 if unknown) (requires numpy)"""
+        import numpy
+        return numpy.array(self.toolpath['line_number'], dtype=int)
+
+    def block_positions(self):
+        """
+        Absolute end position of each motion, and the line number it's from (requires numpy)
+        :return: tuple of numpy arrays: (<line numbers>, <positions>)
+        """
+        return (self.line_numbers, self.positions)
+
+    def bounds(self, axes=None):
+        """
+        Bounding box of all positions (including the starting position)
+        :param axes: axes of returned positions (default: machine's axes)
+        :return: tuple of Position instances: (<minimum>, <maximum>)
+        """
+        import numpy
+        abs_pos = self.machine.abs_pos
+        if axes is None:
+            axes = abs_pos.axes
+        positions = numpy.vstack([numpy.array(self.start, dtype=float)[None, :], self.positions])
+        return (
+            abs_pos.from_numpy(positions.min(axis=0), axes=axes, unit=abs_pos._unit),
+            abs_pos.from_numpy(positions.max(axis=0), axes=axes, unit=abs_pos._unit),
+        )
+
+    def travel(self, axes='XYZ'):
+        """
+        Total distance travelled (in straight lines between positions)
+        :param axes: axes included in distance
+        :return: float
+        """
+        import numpy
+        columns = [_AXIS_INDEX[a] for a in axes]
+        positions = numpy.vstack([numpy.array(self.start, dtype=float)[None, :], self.positions])[:, columns]
+        return float(numpy.sqrt((numpy.diff(positions, axis=0) ** 2).sum(axis=1)).sum())
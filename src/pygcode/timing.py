@@ -0,0 +1,373 @@
+from array import array
+
+from .toolpath import Toolpath
+from .line import Line
+from .words import text2words
+from pygcode.dialects import get_default as get_default_dialect
+
+
+def _param_values(gcode):
+    """
+    Numeric parameter values of a gcode
+    :param gcode: GCode instance
+    :return: dict of the form: {<letter>: <float>, ...} (non-numeric values are ignored)
+
+    Some words consume the rest of the line as their value (eg: marlin's ``P``),
+    so ``M204 P1000 T2000`` has a ``P`` value of ``'1000 T2000'``; the words
+    that follow are recovered from it.
+    """
+    values = {}
+    words = list(gcode.params.values())
+    while words:
+        word = words.pop(0)
+        value = word.value
+        if isinstance(value, str):
+            (value, _, rest) = value.strip().partition(' ')
+            if rest:
+                words += text2words(rest, intern_words=False)
+        try:
+            values[word.letter] = float(value)
+        except (TypeError, ValueError):
+            pass
+    return values
+
+
+class MotionLimits(object):
+    """
+    Motion planner settings of a (Marlin) printer.
+
+    Defaults are those of Marlin's example configuration; they're changed
+    by the ``M201``, ``M203``, ``M204`` and ``M205`` gcodes (see :meth:`update`).
+
+    Units are millimeters and seconds (eg: feed rates in mm/s, not mm/min).
+    """
+    AXES = 'XYZE'
+
+    def __init__(self, **kwargs):
+        self.max_feed_rate = {'X': 300., 'Y': 300., 'Z': 5., 'E': 25.}  # M203
+        self.max_acceleration = {'X': 3000., 'Y': 3000., 'Z': 100., 'E': 10000.}  # M201
+        self.acceleration = 3000.  # M204 P: printing moves
+        self.retract_acceleration = 3000.  # M204 R: extruder only moves
+        self.travel_acceleration = 3000.  # M204 T: non-extruding moves
+        self.jerk = {'X': 10., 'Y': 10., 'Z': 0.3, 'E': 5.}  # M205 X Y Z E (classic jerk)
+        self.junction_deviation = 0.013  # M205 J (None to use classic jerk)
+        self.min_feed_rate = 0.  # M205 S
+        self.min_travel_feed_rate = 0.  # M205 T
+        self.default_feed_rate = 25.  # until one is given (Marlin's 1500 mm/min)
+        for (key, value) in kwargs.items():
+            if not hasattr(self, key):
+                raise AttributeError("unknown motion limit: %r" % key)
+            setattr(self, key, value)
+
+    # Limit changing gcodes, of the form: {(<letter>, <value>): <method name>, ...}
+    GCODE_WORDS = {
+        ('M', 201): '_set_max_acceleration',
+        ('M', 203): '_set_max_feed_rate',
+        ('M', 204): '_set_acceleration',
+        ('M', 205): '_set_advanced',
+    }
+
+    def update(self, gcode):
+        """
+        Change limits set by the given gcode (if it sets any)
+        :param gcode: GCode instance
+        :return: True if gcode sets limits
+        """
+        method_name = self.GCODE_WORDS.get((gcode.word.letter, gcode.word.value), None)
+        if method_name is None:
+            return False
+        getattr(self, method_name)(_param_values(gcode))
+        return True
+
+    def _set_max_acceleration(self, values):
+        for axis in self.AXES:
+            if axis in values:
+                self.max_acceleration[axis] = values[axis]
+
+    def _set_max_feed_rate(self, values):
+        for axis in self.AXES:
+            if axis in values:
+                self.max_feed_rate[axis] = values[axis]
+
+    def _set_acceleration(self, values):
+        if 'S' in values:  # (legacy: printing & travel)
+            self.acceleration = self.travel_acceleration = values['S']
+        if 'P' in values:
+            self.acceleration = values['P']
+        if 'R' in values:
+            self.retract_acceleration = values['R']
+        if 'T' in values:
+            self.travel_acceleration = values['T']
+
+    def _set_advanced(self, values):
+        for axis in self.AXES:
+            if axis in values:
+                self.jerk[axis] = values[axis]
+        if 'J' in values:
+            self.junction_deviation = values['J'] or None  # (J0: classic jerk)
+        if 'S' in values:
+            self.min_feed_rate = values['S']
+        if 'T' in values:
+            self.min_travel_feed_rate = values['T']
+
+    @property
+    def values(self):
+        """Limits as a flat list of floats (in the order of :attr:`COLUMNS`)"""
+        jd = self.junction_deviation
+        return (
+            [self.max_feed_rate[a] for a in self.AXES] +
+            [self.max_acceleration[a] for a in self.AXES] +
+            [self.acceleration, self.retract_acceleration, self.travel_acceleration] +
+            [self.jerk[a] for a in self.AXES] +
+            [jd if jd else 0., self.min_feed_rate, self.min_travel_feed_rate]
+        )
+
+    COLUMNS = (
+        ['max_feed_rate_' + a for a in 'xyze'] +
+        ['max_acceleration_' + a for a in 'xyze'] +
+        ['acceleration', 'retract_acceleration', 'travel_acceleration'] +
+        ['jerk_' + a for a in 'xyze'] +
+        ['junction_deviation', 'min_feed_rate', 'min_travel_feed_rate']
+    )
+
+
+class TimeEstimator(object):
+    """
+    Job duration estimate, emulating a (Marlin) motion planner.
+
+    Gcode is processed into a :class:`Toolpath <pygcode.toolpath.Toolpath>`,
+    noting motion limit changes, dwells & heater waits along the way
+    (plain linear moves are batched by the toolpath, so lines that are
+    parsed lazily are only parsed if they aren't).
+    Segment durations are then calculated with numpy, for all segments at once:
+
+    - feed rate & acceleration of each segment, capped by each axis' limits
+    - maximum junction speed between segments: junction deviation,
+      or classic jerk (if ``M205 J0`` is given)
+    - lookahead: entry & exit speeds so the machine can always stop (and
+      accelerate) in time (over the whole program, not a finite buffer)
+    - trapezoidal (or triangular) velocity profile of each segment
+
+    .. code-block:: python
+
+        from pygcode import TimeEstimator, parse_file
+        estimator = TimeEstimator()
+        estimator.process_lines(parse_file('part.gcode', lazy=True))
+        print("%.0f seconds" % estimator.total_time())
+
+    """
+    # Waiting gcodes, of the form: {(<letter>, <value>): <heater>, ...}
+    HEATER_SET_WORDS = {('M', 104): 'hotend', ('M', 140): 'bed'}
+    HEATER_WAIT_WORDS = {('M', 109): 'hotend', ('M', 190): 'bed'}
+    DWELL_WORD = ('G', 4)
+
+    def __init__(self, limits=None, machine=None, heating_rates=None, ambient=25.0):
+        """
+        :param limits: MotionLimits instance (default: MotionLimits())
+        :param machine: Machine instance to process gcode with (default: Machine())
+        :param heating_rates: heating (& cooling) rate of heaters, in degrees/s:
+                              dict of the form: {'hotend': <rate>, 'bed': <rate>}
+        :param ambient: temperature of heaters at the start of the job
+        """
+        if limits is None:
+            limits = MotionLimits()
+        self.limits = limits
+        self.toolpath = Toolpath(machine=machine)
+        self.heating_rates = {'hotend': 2.0, 'bed': 0.5}
+        if heating_rates:
+            self.heating_rates.update(heating_rates)
+        self.ambient = ambient
+
+        # Limits: a row of values (MotionLimits.values) per change
+        self._limits = array('d', limits.values)
+        self._limits_rows = array('l', [0])  # toolpath row from which they apply
+        # Waits: machine stops before the toolpath row, for the given time
+        self._wait_rows = array('l')
+        self._wait_times = array('d')
+
+        # Heaters, of the form: {(<heater>, <tool>): (<target>, <temperature>, <wait clock>), ...}
+        # (temperature when target was set; heating progresses during waits)
+        self._heaters = {}
+        self._wait_clock = 0.0
+
+    # --- Processing
+    def _heater_temperature(self, key):
+        (target, temperature, clock) = self._heaters.get(key, (self.ambient, self.ambient, 0.))
+        change = self.heating_rates[key[0]] * (self._wait_clock - clock)
+        if temperature < target:
+            return min(target, temperature + change)
+        return max(target, temperature - change)
+
+    def _set_heater(self, key, target):
+        self._heaters[key] = (target, self._heater_temperature(key), self._wait_clock)
+
+    def _wait(self, seconds):
+        self._wait_rows.append(len(self.toolpath))
+        self._wait_times.append(seconds)
+        self._wait_clock += seconds
+
+    def process_gcode(self, gcode):
+        """
+        Note limits, dwells & waits set by a (non motion) gcode
+        :param gcode: GCode instance
+        """
+        key = (gcode.word.letter, gcode.word.value)
+        if self.limits.update(gcode):
+            if self._limits_rows[-1] == len(self.toolpath):  # (replace)
+                del self._limits[-len(MotionLimits.COLUMNS):]
+                del self._limits_rows[-1]
+            self._limits.extend(self.limits.values)
+            self._limits_rows.append(len(self.toolpath))
+        elif key == self.DWELL_WORD:
+            values = _param_values(gcode)
+            if get_default_dialect() == 'linuxcnc':
+                self._wait(values.get('P', 0.))  # seconds
+            else:
+                self._wait(values.get('S', values.get('P', 0.) / 1000.))  # P: milliseconds
+        elif (key in self.HEATER_SET_WORDS) or (key in self.HEATER_WAIT_WORDS):
+            values = _param_values(gcode)
+            heater = (self.HEATER_SET_WORDS.get(key) or self.HEATER_WAIT_WORDS[key], int(values.get('T', 0)))
+            target = values.get('S', values.get('R', None))
+            if target is not None:
+                self._set_heater(heater, target)
+            if key in self.HEATER_WAIT_WORDS:
+                target = self._heaters.get(heater, (self.ambient,))[0]
+                self._wait(abs(target - self._heater_temperature(heater)) / self.heating_rates[heater[0]])
+
+    def process_lines(self, lines):
+        """
+        Process Lines (eg: from :meth:`parse_file <pygcode.parser.parse_file>`)
+        :param lines: iterable of Line instances
+        """
+        toolpath = self.toolpath
+        for line in lines:
+            assert isinstance(line, Line), "invalid parameter"
+            block = line.block
+            if toolpath.batch_block(block, line_number=line.line_number):
+                continue  # (plain linear move: no limits, or waits)
+            for gcode in block.gcodes:
+                if gcode.word.letter != 'G' or (gcode.word.value == self.DWELL_WORD[1]):
+                    self.process_gcode(gcode)
+            toolpath.process_block(block, line_number=line.line_number)
+        toolpath.flush()
+
+    # --- Estimate
+    def segment_times(self):
+        """
+        Duration of each toolpath row (requires numpy)
+        :return: numpy.ndarray of durations (in seconds), one per toolpath row
+        """
+        import numpy
+        a = self.toolpath.arrays()
+        count = len(self.toolpath)
+        times = numpy.zeros(count)
+        if not count:
+            return times
+
+        # Limits of each row
+        limits = numpy.frombuffer(self._limits, dtype=float).reshape(-1, len(MotionLimits.COLUMNS))
+        rows = numpy.frombuffer(self._limits_rows, dtype=self._limits_rows.typecode)
+        limits = limits[numpy.searchsorted(rows, numpy.arange(count), side='right') - 1]
+        lim = dict((name, limits[:, i]) for (i, name) in enumerate(MotionLimits.COLUMNS))
+
+        # Displacement
+        delta = numpy.column_stack([
+            (a['end_' + axis] - a['start_' + axis]) if ('end_' + axis) in a else numpy.zeros(count)
+            for axis in 'xyz'
+        ] + [a['end_e'] - a['start_e']])
+        distance = numpy.sqrt((delta[:, :3] ** 2).sum(axis=1))
+        extruding = delta[:, 3] != 0
+        extruder_only = (distance == 0) & extruding
+        length = numpy.where(extruder_only, numpy.abs(delta[:, 3]), distance)
+        moving = length > 0
+
+        # Segments (rows that move): feed rate & acceleration
+        index = numpy.flatnonzero(moving)
+        (delta, length, extruding, extruder_only) = (
+            delta[index], length[index], extruding[index], extruder_only[index],
+        )
+        lim = dict((k, v[index]) for (k, v) in lim.items())
+        ratio = numpy.abs(delta) / length[:, None]  # axis speed per unit of feed rate
+
+        feed_rate = a['feed_rate'][index] / 60.
+        feed_rate[feed_rate <= 0] = self.limits.default_feed_rate  # (unset feed rate)
+        feed_rate = numpy.maximum(feed_rate, numpy.where(extruding, lim['min_feed_rate'], lim['min_travel_feed_rate']))
+        acceleration = numpy.where(
+            extruder_only, lim['retract_acceleration'],
+            numpy.where(extruding, lim['acceleration'], lim['travel_acceleration']),
+        )
+        with numpy.errstate(divide='ignore'):
+            for (i, axis) in enumerate('xyze'):
+                feed_rate = numpy.minimum(feed_rate, lim['max_feed_rate_' + axis] / ratio[:, i])
+                acceleration = numpy.minimum(acceleration, lim['max_acceleration_' + axis] / ratio[:, i])
+
+        # Junction speeds (squared), from the previous segment
+        direction = numpy.zeros((len(index), 3))
+        numpy.divide(delta[:, :3], length[:, None], out=direction, where=~extruder_only[:, None])
+        junction = self._junction_speeds(numpy, direction, feed_rate, acceleration, lim) ** 2
+        junction[0] = 0.
+        junction[extruder_only | numpy.roll(extruder_only, 1)] = 0.
+        if len(self._wait_rows):  # machine stops before waits
+            stops = numpy.searchsorted(index, numpy.frombuffer(self._wait_rows, dtype=self._wait_rows.typecode))
+            junction[stops[stops < len(index)]] = 0.
+
+        # Lookahead: entry speeds (squared) reachable from the previous junction, and able to stop in time
+        gain = 2. * acceleration * length  # change of speed (squared) over a segment
+        entry = self._lookahead(numpy, junction, gain)
+
+        # Trapezoidal velocity profile
+        v0 = numpy.sqrt(entry[:-1])
+        v1 = numpy.sqrt(entry[1:])
+        cruise = numpy.minimum(feed_rate, numpy.sqrt((gain + entry[:-1] + entry[1:]) / 2.))  # (peak if triangular)
+        accelerate = (cruise ** 2 - entry[:-1]) / (2. * acceleration)
+        decelerate = (cruise ** 2 - entry[1:]) / (2. * acceleration)
+        cruising = numpy.maximum(length - accelerate - decelerate, 0.)
+        times[index] = ((cruise - v0) + (cruise - v1)) / acceleration + cruising / cruise
+        return times
+
+    @staticmethod
+    def _junction_speeds(numpy, direction, feed_rate, acceleration, lim):
+        # maximum speed at each segment's start, given the previous segment
+        previous = numpy.roll(direction, 1, axis=0)
+        limit = numpy.minimum(feed_rate, numpy.roll(feed_rate, 1))
+
+        # Junction deviation
+        cos_theta = -(direction * previous).sum(axis=1)  # (of the angle between segments)
+        sin_theta_d2 = numpy.sqrt(numpy.clip(0.5 * (1. - cos_theta), 0., 1.))
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            jd_speed = numpy.sqrt(acceleration * lim['junction_deviation'] * sin_theta_d2 / (1. - sin_theta_d2))
+        jd_speed = numpy.where(sin_theta_d2 >= 1. - 1e-9, limit, jd_speed)  # (straight)
+
+        # Classic jerk: scale speed so no axis' speed changes more than its jerk
+        change = numpy.abs(direction - previous) * limit[:, None]
+        jerk = numpy.column_stack([lim['jerk_' + axis] for axis in 'xyz'])
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            scale = numpy.where(change > 0, jerk / change, numpy.inf).min(axis=1)
+        jerk_speed = limit * numpy.minimum(scale, 1.)
+
+        return numpy.minimum(limit, numpy.where(lim['junction_deviation'] > 0, jd_speed, jerk_speed))
+
+    @staticmethod
+    def _lookahead(numpy, junction, gain):
+        """
+        Entry speeds (squared) of each segment, plus the final (stopped) exit
+        speed; limited to junction speeds, and by how much speed can change over
+        segments: ``entry[i] <= entry[i + 1] + gain[i]`` (to decelerate), and
+        ``entry[i + 1] <= entry[i] + gain[i]`` (to accelerate).
+
+        Each pass is a (min, +) scan: for sums ``S`` of gain before each junction,
+        ``entry[i] = min(junction[j] + S[j], for j >= i) - S[i]`` (decelerate),
+        calculated with ``minimum.accumulate``.
+        """
+        entry = numpy.append(junction, 0.)
+        total = numpy.append(0., numpy.cumsum(gain))
+        entry = numpy.minimum.accumulate((entry + total)[::-1])[::-1] - total  # decelerate
+        entry = numpy.minimum.accumulate(entry - total) + total  # accelerate
+        return numpy.maximum(entry, 0.)
+
+    def total_time(self):
+        """
+        Estimated job duration (requires numpy)
+        :return: seconds (float), including dwells & heater waits
+        """
+        return float(self.segment_times().sum()) + sum(self._wait_times)
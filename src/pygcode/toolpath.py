@@ -0,0 +1,398 @@
+from array import array
+
+from .gcodes_base import GCodeMotion
+from .gcodes import word_gcode_class
+from .machine import Machine, GCodeIncrementalDistanceMode
+from .words import Word, dialect_tokenizer
+from .line import Line
+from .block import Block
+from .exceptions import GCodeWordStrError
+from . import dialects
+
+NAN = float('nan')
+
+
+def _fill_forward(numpy, values):
+    """Replace NaN values with the last value above them (in each column; the first row has none)"""
+    index = numpy.where(numpy.isnan(values), 0, numpy.arange(len(values))[:, None])
+    index = numpy.maximum.accumulate(index, axis=0)
+    return values[index, numpy.arange(values.shape[1])]
+
+
+def _accumulate(numpy, values):
+    """Sum of values down each column (NaN values are zero)"""
+    return numpy.cumsum(numpy.where(numpy.isnan(values), 0., values), axis=0)
+
+
+def _extend(numpy, column, values):
+    column.frombytes(numpy.ascontiguousarray(values, dtype=column.typecode).tobytes())
+
+
+def _numpy_installed():
+    try:
+        import numpy
+    except ImportError:
+        return False
+    return True
+
+
+class Toolpath(object):
+    """
+    Columnar record of the motions processed by a machine.
+
+    Every motion gcode is recorded as a row of the following columns
+    (each column is an :class:`array.array`, appended to as gcode is processed):
+
+    - ``start_<axis>``, ``end_<axis>``: machine's absolute position before &
+      after the motion, for each of the machine's axes (eg: ``start_x``)
+    - ``start_e``, ``end_e``: extruder position before & after the motion
+    - ``feed_rate``: feed rate at the time of the motion
+    - ``motion``: motion gcode's word value (eg: ``1`` for ``G1``)
+    - ``line_number``: source line number (``-1`` if unknown)
+
+    .. code-block:: python
+
+        from pygcode import Toolpath, parse_file
+        toolpath = Toolpath()
+        toolpath.process_lines(parse_file('part.gcode'))
+        a = toolpath.arrays()  # numpy arrays
+        extruding = (a['end_e'] - a['start_e']) > 0
+
+    **Batching**: blocks that are plain linear moves (``G0`` or ``G1``, or
+    modal parameters in either mode, with axis, ``E`` and ``F`` words only)
+    aren't processed by the machine; their raw values are collected, and
+    turned into positions for all of them at once (with numpy) by
+    :meth:`flush`: a cumulative sum in incremental distance mode, the last
+    given value (plus the work offset) in absolute mode. Any other block that
+    could change or use the machine's mode, or position, is processed after
+    a flush.
+
+    Batching is used if numpy is installed, and the machine processes moves
+    like :class:`Machine <pygcode.machine.Machine>` (no ``on_move``, and no
+    overridden movement methods).
+    """
+    # Extruder positioning mode changes, of the form: {(<letter>, <value>): <relative>, ... }
+    # (G90 & G91 set the mode of all axes, M82 & M83 only the extruder's)
+    E_MODE_WORDS = {
+        ('G', 90): False, ('G', 91): True,
+        ('M', 82): False, ('M', 83): True,
+    }
+    E_SET_POSITION_WORD = ('G', 92)  # sets E without moving
+
+    # Machine methods skipped by batched moves (batching is off if they're overridden)
+    BATCH_SKIPPED_METHODS = ('process_gcodes', 'move_to_params', '_move')
+
+    def __init__(self, machine=None, batch=True):
+        """
+        :param machine: Machine instance to process gcode with (default: Machine())
+        :param batch: if True, plain linear moves are batched (if possible, see class notes)
+        """
+        if machine is None:
+            machine = Machine()
+        self.machine = machine
+        self.axes = sorted(a.lower() for a in machine.axes)
+
+        # Columns
+        self._columns = {}
+        for axis in self.axes:
+            self._columns['start_' + axis] = array('d')
+            self._columns['end_' + axis] = array('d')
+        for name in ('start_e', 'end_e', 'feed_rate', 'motion'):
+            self._columns[name] = array('d')
+        self._columns['line_number'] = array('l')
+
+        # Tracked state (not kept by the machine)
+        self.e = 0.0
+        self.e_relative = False
+        self.feed_rate = 0.0
+
+        # Column appenders, in the order a row's values are given
+        self._appenders = [self._columns['start_' + a].append for a in self.axes]
+        self._appenders += [self._columns['end_' + a].append for a in self.axes]
+        self._appenders += [self._columns[name].append for name in (
+            'start_e', 'end_e', 'feed_rate', 'motion', 'line_number',
+        )]
+
+        # Batching
+        self.batch = batch and _numpy_installed() and all(
+            getattr(type(machine), name) == getattr(Machine, name)
+            for name in self.BATCH_SKIPPED_METHODS
+        )
+        self._pending = []  # batched rows: [<axis values>..., <e>, <feed rate>, <motion>, <line number>]
+        self._pending_modes = {}  # batched gcodes setting modes, of the form: {<modal group>: <gcode>, ...}
+        self._row_letters = [a.upper() for a in self.axes] + ['E']  # of a batched row's first values
+
+        self._dialect = dialects.get_default()
+        self._motion_gcodes = {}  # of the form: {<G word value>: <GCode>, ...}
+        for value in (0, 1):
+            word = Word('G', value)
+            gcode_class = word_gcode_class(word)
+            if gcode_class is not None:
+                self._motion_gcodes[value] = gcode_class(word)
+        self._motion_classes = set(type(g) for g in self._motion_gcodes.values())
+        param_letters = set(self._row_letters) | set('FS')  # (F & S: feed rate, and laser power)
+        for gcode in self._motion_gcodes.values():
+            param_letters &= set(gcode.param_letters)
+        self._param_letters = param_letters  # of batched motion gcodes
+        self._modal_letters = param_letters & set(self._row_letters)  # of unparsed blocks (F & S may be gcodes)
+
+    def __len__(self):
+        return len(self._columns['motion']) + len(self._pending)
+
+    @property
+    def columns(self):
+        """Columns, of the form: {<column name>: array.array, ...}"""
+        self.flush()
+        return self._columns
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def _machine_position(self):
+        abs_pos = self.machine.abs_pos
+        return [getattr(abs_pos, a.upper()) for a in self.axes]
+
+    # --- Batching
+    def _batch(self, gcode, values, line_number):
+        # Record a motion gcode (None for the current motion mode), given its parameter values
+        if gcode is None:
+            gcode = self._pending_modes.get(GCodeMotion.modal_group) or self.machine.mode.motion
+            if type(gcode) not in self._motion_classes:
+                return False
+        if not self._pending_modes:
+            # start of a batch
+            machine = self.machine
+            if (machine.on_move is not None) or not (
+                    machine.abs_range_min.unit == machine.abs_pos.unit == machine.abs_range_max.unit):
+                return False
+
+        if 'F' in values:
+            self.feed_rate = values.pop('F')
+        values.pop('S', None)
+        if values:
+            get = values.get
+            row = [get(letter, NAN) for letter in self._row_letters]
+            row += [self.feed_rate, float(gcode.word.value), -1 if (line_number is None) else line_number]
+            self._pending.append(row)
+        self._pending_modes[gcode.modal_group] = gcode
+        return True
+
+    def _batch_text(self, text, line_number):
+        # Unparsed block text (parsed only if it's not batched)
+        try:
+            tokens = dialect_tokenizer(self._dialect)._tokens(text)
+            values = dict((letter, float(value)) for (letter, value) in tokens)
+        except (GCodeWordStrError, ValueError):
+            return False
+        if len(values) != len(tokens):
+            return False  # (repeated letter)
+        gcode = None
+        if 'G' in values:
+            gcode = self._motion_gcodes.get(values.pop('G'), None)
+            if (gcode is None) or not self._param_letters.issuperset(values):
+                return False
+        elif not (values and self._modal_letters.issuperset(values)):
+            return False
+        return self._batch(gcode, values, line_number)
+
+    def _batch_gcodes(self, block, line_number):
+        motion = None
+        feed_rate = None
+        for gcode in block.gcodes:
+            if (type(gcode) in self._motion_classes) and (motion is None):
+                motion = gcode
+            elif (gcode.word.letter == 'F') and not gcode.params:
+                feed_rate = gcode
+            elif gcode.word.letter != 'N':
+                return False
+
+        if motion is None:
+            words = block.modal_params
+        elif block.modal_params:
+            return False
+        else:
+            words = motion.params.values()
+        values = {}
+        param_letters = self._param_letters
+        try:
+            for word in words:
+                letter = word.letter
+                if (letter not in param_letters) or (letter in values):
+                    return False
+                values[letter] = float(word.value)
+        except (TypeError, ValueError):
+            return False
+        if not values:
+            return False
+        if feed_rate is not None:
+            if 'F' in values:
+                return False
+            values['F'] = float(feed_rate.word.value)
+
+        if not self._batch(motion, values, line_number):
+            return False
+        if (feed_rate is not None) and (feed_rate.modal_group is not None):
+            self._pending_modes[feed_rate.modal_group] = feed_rate
+        return True
+
+    def batch_block(self, block, line_number=None):
+        """
+        Record a block without processing it, if it's a plain linear move
+        (see class notes); the machine is brought up to date by :meth:`flush`
+        :param block: Block instance
+        :param line_number: source line number recorded with motions
+        :return: True if block was batched
+        """
+        if not self.batch:
+            return False
+        if (block._gcodes is None) and (block.dialect == self._dialect) and self._batch_text(block._raw_text, line_number):
+            return True
+        return self._batch_gcodes(block, line_number)
+
+    def _inert(self, gcode):
+        # True if gcode neither uses, nor changes, any state of batched moves
+        word = gcode.word
+        return (word.letter in 'MT') and ((word.letter, word.value) not in self.E_MODE_WORDS)
+
+    def flush(self):
+        """
+        Record batched moves, and bring the machine up to date with them
+
+        Done by :meth:`process_lines`, and when columns are read (call it
+        after :meth:`process_block` to use the machine, or :attr:`e`).
+        """
+        if self._pending:
+            self._flush_rows()
+        if self._pending_modes:
+            self.machine.set_mode(*self._pending_modes.values())
+            self._pending_modes = {}
+
+    def _flush_rows(self):
+        import numpy
+        machine = self.machine
+        rows = numpy.array(self._pending, dtype=float)
+        self._pending = []
+        count = len(self.axes)
+        axes = [a.upper() for a in self.axes]
+
+        # Axes (distance mode & work offset are the same for all batched moves)
+        start = machine.abs_pos
+        path = numpy.vstack([[getattr(start, a) for a in axes], rows[:, :count]])
+        if isinstance(machine.mode.distance, GCodeIncrementalDistanceMode):
+            path = _accumulate(numpy, path)
+        else:  # assumed: GCodeAbsoluteDistanceMode
+            offset = machine.work2abs(machine.Position())
+            path[1:] += [getattr(offset, a) for a in axes]
+            path = _fill_forward(numpy, path)
+        (lowest, highest) = (path.min(axis=0), path.max(axis=0))
+        machine._moved(*[
+            dict((a, float(v[i])) for (i, a) in enumerate(axes))
+            for v in (path[-1], lowest, highest)
+        ])
+
+        # Extruder
+        e = numpy.append(self.e, rows[:, count])[:, None]
+        e = (_accumulate if self.e_relative else _fill_forward)(numpy, e)[:, 0]
+        self.e = float(e[-1])
+
+        columns = self._columns
+        for (i, axis) in enumerate(self.axes):
+            _extend(numpy, columns['start_' + axis], path[:-1, i])
+            _extend(numpy, columns['end_' + axis], path[1:, i])
+        _extend(numpy, columns['start_e'], e[:-1])
+        _extend(numpy, columns['end_e'], e[1:])
+        for (i, name) in enumerate(('feed_rate', 'motion', 'line_number'), count + 1):
+            _extend(numpy, columns[name], rows[:, i])
+
+    # --- Processing
+    def process_gcodes(self, *gcode_list, **kwargs):
+        """
+        Process gcodes (in execution order) with the machine, recording motions
+        :param gcode_list: list of GCode instances
+        :param line_number: source line number recorded with motions
+        """
+        line_number = kwargs.get('line_number', None)
+        if line_number is None:
+            line_number = -1
+
+        if self._pending_modes and not all(self._inert(g) for g in gcode_list):
+            self.flush()
+
+        for gcode in sorted(gcode_list):
+            word = gcode.word
+            params = gcode.params
+
+            # Feed Rate
+            if word.letter == 'F':
+                self.feed_rate = float(word.value)
+            elif 'F' in params:
+                self.feed_rate = float(params['F'].value)
+
+            if isinstance(gcode, GCodeMotion) and any(l not in 'FS' for l in params):
+                start = self._machine_position()
+                start_e = self.e
+                if 'E' in params:
+                    e = float(params['E'].value)
+                    self.e = (start_e + e) if self.e_relative else e
+                self.machine.process_gcodes(gcode)
+                row = start + self._machine_position() + [
+                    start_e, self.e, self.feed_rate, float(word.value), line_number,
+                ]
+                for (append, value) in zip(self._appenders, row):
+                    append(value)
+                continue
+
+            # Extruder State
+            key = (word.letter, word.value)
+            if key in self.E_MODE_WORDS:
+                self.e_relative = self.E_MODE_WORDS[key]
+            elif (key == self.E_SET_POSITION_WORD) and ('E' in params):
+                self.e = float(params['E'].value)
+
+            self.machine.process_gcodes(gcode)
+
+    def process_block(self, block, line_number=None):
+        """
+        Process a Block, recording motions (batched, if possible: see :meth:`flush`)
+        :param block: Block instance
+        :param line_number: source line number recorded with motions
+        """
+        assert isinstance(block, Block), "invalid parameter"
+        if self.batch_block(block, line_number=line_number):
+            return
+        if block.modal_params:
+            self.flush()  # (modal parameters are of the machine's motion mode)
+        self.process_gcodes(*self.machine.block_modal_gcodes(block), line_number=line_number)
+
+    def process_lines(self, lines):
+        """
+        Process Lines (eg: from :meth:`parse_file <pygcode.parser.parse_file>`)
+        :param lines: iterable of Line instances
+        """
+        for line in lines:
+            assert isinstance(line, Line), "invalid parameter"
+            self.process_block(line.block, line_number=line.line_number)
+        self.flush()
+
+    def arrays(self, copy=False):
+        """
+        Columns as numpy arrays (requires numpy)
+        :param copy: if True, arrays are copies of the columns
+        :return: dict of the form: {<column name>: numpy.ndarray, ... }
+
+        .. note::
+
+            Unless copied, arrays share memory with their column; columns
+            cannot grow (so no more gcode can be processed) while they exist.
+
+        """
+        import numpy
+        arrays = {}
+        for (name, column) in self.columns.items():
+            if len(column):
+                arrays[name] = numpy.frombuffer(column, dtype=column.typecode)
+            else:
+                arrays[name] = numpy.zeros(0, dtype=column.typecode)
+            if copy:
+                arrays[name] = arrays[name].copy()
+        return arrays
@@ -318,6 +318,7 @@ def extract_data(filename):
     def word_matches(cls, w):
         return (w.letter == '{letter}') and (w.value in {[code_val(v) for v in codes]})
     default_word = Word('{letter}', {code})
+    word_keys = [Word('{letter}', v) for v in {[code_val(v) for v in codes]}]
 '''
     else:
         out += f"    word_key = Word('{letter}', {code})\n"
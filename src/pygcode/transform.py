@@ -1,14 +1,9 @@
 from math import sin, cos, tan, asin, acos, atan2, pi, sqrt, ceil
 
-from .gcodes import GCodeLinearMove, GCodeRapidMove
-from .gcodes import GCodeArcMove, GCodeArcMoveCW, GCodeArcMoveCCW
-from .gcodes import GCodePlaneSelect, GCodeSelectXYPlane, GCodeSelectYZPlane, GCodeSelectZXPlane
-from .gcodes import GCodeAbsoluteDistanceMode, GCodeIncrementalDistanceMode
-from .gcodes import GCodeAbsoluteArcDistanceMode, GCodeIncrementalArcDistanceMode
-from .gcodes import GCodeCannedCycle
-from .gcodes import GCodeDrillingCyclePeck, GCodeDrillingCycleDwell, GCodeDrillingCycleChipBreaking
-from .gcodes import GCodeCannedReturnMode, GCodeCannedCycleReturnPrevLevel, GCodeCannedCycleReturnToR
+from .gcodes import GCodeLinearMove, GCodeArcMove, GCodePlaneSelect
+from .gcodes import GCodeCannedCycle, GCodeCannedReturnMode
 from .gcodes import _gcodes_abs2rel
+# (gcodes that aren't in every dialect, eg: planes, are imported where they're used)
 
 from .machine import Position
 from .exceptions import GCodeParameterError
@@ -137,6 +132,14 @@ class ArcLinearizeMethod(object):
         # Last line always ends at the circle's end
         yield (l_start, self.arc_p_end + self.helical_end)
 
+    def vertices(self):
+        """
+        End vertex of each line for the arc, as iter_vertices(), calculated
+        with numpy (see arc_vertices())
+        :return: numpy.ndarray of shape (<line count>, 3) (absolute xyz)
+        """
+        return arc_vertices([self])[0]
+
 
 class ArcLinearizeInside(ArcLinearizeMethod):
     """Start and end points of each line are on the original arc"""
@@ -210,10 +213,97 @@ class ArcLinearizeMid(ArcLinearizeMethod):
         return self.arc_radius + d_radius
 
 
+def arc_vertices(methods):
+    """
+    End vertices of each line, for many arcs at once (requires numpy)
+    :param methods: list of ArcLinearizeMethod instances (one per arc)
+    :return: list of numpy.ndarray, for each arc: shape (<line count>, 3) (absolute xyz)
+
+    Vertices are those yielded by ArcLinearizeMethod.iter_vertices(); rotations
+    are calculated for all wedges of all arcs in a single pass (rotating each
+    arc's start vertex about its plane's normal: the start vertex is on the
+    plane, so it's ``v.cos(a) + (k x v).sin(a)``, for unit normal ``k``).
+    """
+    if not methods:
+        return []
+    import numpy
+    (vertices, counts) = _arc_vertices(methods)
+    return numpy.split(vertices, numpy.cumsum(counts)[:-1])
+
+
+def _arc_vertices(methods):
+    # End vertices of each line of all arcs: (<array of shape (<line count>, 3)>, <line count of each arc>)
+    import numpy
+
+    def vectors(values):
+        return numpy.array([v.xyz for v in values], dtype=float).reshape(len(values), 3)
+
+    # Per arc
+    center = vectors([m.arc_p_center for m in methods])
+    start = vectors([m.arc_p_start for m in methods]) - center
+    start *= (numpy.array([m.outer_radius for m in methods]) / numpy.sqrt((start ** 2).sum(axis=1)))[:, None]
+    axis = -vectors([m.plane_normal.normalized() for m in methods])
+    helical_start = vectors([m.helical_start for m in methods])
+    d_helical = vectors([m.helical_end for m in methods]) - helical_start
+    end = vectors([m.arc_p_end + m.helical_end for m in methods])
+    arc_angle = numpy.array([m.arc_angle for m in methods], dtype=float)
+    wedge_angle = numpy.array([m.wedge_angle for m in methods], dtype=float)
+    phase_offset = numpy.array([m.chord_phase_offset for m in methods], dtype=bool)
+    # lines before the last (which always ends at the arc's end)
+    counts = numpy.array([m.wedge_count for m in methods], dtype=int) - numpy.where(phase_offset, 0, 1)
+
+    # Per line (before the last of each arc)
+    arc = numpy.repeat(numpy.arange(len(methods)), counts)
+    wedge_number = numpy.arange(len(arc)) - numpy.repeat(numpy.cumsum(counts) - counts, counts) + 1
+    angle = wedge_angle[arc] * (wedge_number - numpy.where(phase_offset[arc], 0.5, 0.))
+    (v, k) = (start[arc], axis[arc])
+    rotated = v * numpy.cos(angle)[:, None] + numpy.cross(k, v) * numpy.sin(angle)[:, None]
+    lines = rotated + center[arc] + helical_start[arc] + d_helical[arc] * (angle / arc_angle[arc])[:, None]
+
+    # Each arc's lines, then its last vertex
+    counts += 1
+    vertices = numpy.empty((counts.sum(), 3))
+    last = numpy.cumsum(counts) - 1
+    is_line = numpy.ones(len(vertices), dtype=bool)
+    is_line[last] = False
+    vertices[is_line] = lines
+    vertices[last] = end
+    return (vertices, counts)
+
+
+def arc_moves(methods, starts, incremental, decimal_places=3):
+    """
+    Linear moves' coordinates, for many arcs at once, as yielded by
+    linearize_arc() (requires numpy)
+    :param methods: list of ArcLinearizeMethod instances (one per arc)
+    :param starts: list of each arc's start (xyz tuples)
+    :param incremental: list of each arc's distance mode (True if incremental)
+    :param decimal_places: decimal places incremental coordinates are rounded to
+    :return: list of numpy.ndarray, for each arc: shape (<line count>, 3) (xyz of each move)
+    """
+    import numpy
+    if not methods:
+        return []
+    (vertices, counts) = _arc_vertices(methods)
+    incremental = numpy.array(incremental, dtype=bool)
+    if incremental.any():
+        # rounded deltas, accumulated: each move's delta is the difference of
+        # its vertex and the arc's start, rounded, less those before it
+        arc = numpy.repeat(numpy.arange(len(methods)), counts)
+        starts = numpy.array(starts, dtype=float).reshape(len(methods), 3)
+        rounded = numpy.round(vertices - starts[arc], decimal_places)
+        deltas = numpy.empty_like(rounded)
+        deltas[1:] = numpy.round(numpy.diff(rounded, axis=0), decimal_places)
+        first = numpy.cumsum(counts) - counts
+        deltas[first] = rounded[first]
+        vertices = numpy.where(incremental[arc][:, None], deltas, vertices)
+    return numpy.split(vertices, numpy.cumsum(counts)[:-1])
+
+
 DEFAULT_LA_METHOD = ArcLinearizeMid
-DEFAULT_LA_PLANE = GCodeSelectXYPlane
-DEFAULT_LA_DISTMODE = GCodeAbsoluteDistanceMode
-DEFAULT_LA_ARCDISTMODE = GCodeIncrementalArcDistanceMode
+DEFAULT_LA_PLANE = None  # GCodeSelectXYPlane if None
+DEFAULT_LA_DISTMODE = None  # GCodeAbsoluteDistanceMode if None
+DEFAULT_LA_ARCDISTMODE = None  # GCodeIncrementalArcDistanceMode if None
 
 def linearize_arc(arc_gcode, start_pos, plane=None, method_class=None,
                   dist_mode=None, arc_dist_mode=None,
@@ -228,16 +318,60 @@ def linearize_arc(arc_gcode, start_pos, plane=None, method_class=None,
     :param arc_dist_mode: machine's arc distance mode (GCodeAbsoluteArcDistanceMode or GCodeIncrementalArcDistanceMode)
     :param max_error: maximum distance approximation arcs can stray from original arc (float)
     :param decimal_places: number of decimal places gocde will be rounded to, used to mitigate risks of accumulated eror when in incremental distance mode (int)
+
+    (to linearize many arcs, see arc_moves())
+    """
+    from .gcodes import GCodeAbsoluteDistanceMode
+
+    if dist_mode is None:
+        dist_mode = (DEFAULT_LA_DISTMODE or GCodeAbsoluteDistanceMode)()
+    method = linearize_arc_method(
+        arc_gcode, start_pos, plane=plane, method_class=method_class,
+        dist_mode=dist_mode, arc_dist_mode=arc_dist_mode, max_error=max_error,
+    )
+    arc_start = start_pos.vector
+
+    # Linear line end vertices
+    try:
+        vertices = method.vertices().tolist()  # (numpy)
+    except ImportError:
+        vertices = [l_end.xyz for (l_start, l_end) in method.iter_vertices()]
+
+    # Yield a linear move to each line's end
+    if isinstance(dist_mode, GCodeAbsoluteDistanceMode):
+        # Absolute coordinates
+        for l_end in vertices:
+            yield GCodeLinearMove(**dict(zip('XYZ', l_end)))
+    else:
+        # Incremental coordinates (beware cumulative errors)
+        cur_pos = list(arc_start.xyz)
+        for l_end in vertices:
+            # round delta coordinates (introduces errors)
+            l_delta = [round(e - c, decimal_places) for (e, c) in zip(l_end, cur_pos)]
+            yield GCodeLinearMove(**dict(zip('XYZ', l_delta)))
+            cur_pos = [c + d for (c, d) in zip(cur_pos, l_delta)]  # mitigate errors by also adding them the accumulated cur_pos
+
+
+def linearize_arc_method(arc_gcode, start_pos, plane=None, method_class=None,
+                         dist_mode=None, arc_dist_mode=None, max_error=0.01):
+    """
+    Linear approximation of a G2,G3 arc, as linearize_arc() makes it
+    (parameters are those of linearize_arc())
+    :return: ArcLinearizeMethod instance (of method_class)
     """
+    from .gcodes import GCodeArcMoveCW, GCodeSelectXYPlane
+    from .gcodes import GCodeAbsoluteDistanceMode, GCodeIncrementalDistanceMode
+    from .gcodes import GCodeAbsoluteArcDistanceMode, GCodeIncrementalArcDistanceMode
+
     # set defaults
     if method_class is None:
-        method_class = DEFAULT_LA_method_class
+        method_class = DEFAULT_LA_METHOD
     if plane is None:
-        plane = DEFAULT_LA_PLANE()
+        plane = (DEFAULT_LA_PLANE or GCodeSelectXYPlane)()
     if dist_mode is None:
-        dist_mode = DEFAULT_LA_DISTMODE()
+        dist_mode = (DEFAULT_LA_DISTMODE or GCodeAbsoluteDistanceMode)()
     if arc_dist_mode is None:
-        arc_dist_mode = DEFAULT_LA_ARCDISTMODE()
+        arc_dist_mode = (DEFAULT_LA_ARCDISTMODE or GCodeIncrementalArcDistanceMode)()
 
     # Parameter Type Assertions
     assert isinstance(arc_gcode, GCodeArcMove), "bad arc_gcode type: %r" % arc_gcode
@@ -355,33 +489,14 @@ def linearize_arc(arc_gcode, start_pos, plane=None, method_class=None,
         'helical_start': helical_start,
         'helical_end': helical_end,
     }
-    method = method_class(**method_class_params)
-
-    # Iterate & yield each linear line (start, end) vertices
-    if isinstance(dist_mode, GCodeAbsoluteDistanceMode):
-        # Absolute coordinates
-        for line_vertices in method.iter_vertices():
-            (l_start, l_end) = line_vertices
-            yield GCodeLinearMove(**dict(zip('XYZ', l_end.xyz)))
-    else:
-        # Incremental coordinates (beware cumulative errors)
-        cur_pos = arc_start
-        for line_vertices in method.iter_vertices():
-            (l_start, l_end) = line_vertices
-            l_delta = l_end - cur_pos
-
-            # round delta coordinates (introduces errors)
-            for axis in 'xyz':
-                setattr(l_delta, axis, round(getattr(l_delta, axis), decimal_places))
-            yield GCodeLinearMove(**dict(zip('XYZ', l_delta.xyz)))
-            cur_pos += l_delta # mitigate errors by also adding them the accumulated cur_pos
+    return method_class(**method_class_params)
 
 
 # ==================== Un-Canning ====================
 
-DEFAULT_SCC_PLANE = GCodeSelectXYPlane
-DEFAULT_SCC_DISTMODE = GCodeAbsoluteDistanceMode
-DEFAULT_SCC_RETRACTMODE = GCodeCannedCycleReturnPrevLevel
+DEFAULT_SCC_PLANE = None  # GCodeSelectXYPlane if None
+DEFAULT_SCC_DISTMODE = None  # GCodeAbsoluteDistanceMode if None
+DEFAULT_SCC_RETRACTMODE = None  # GCodeCannedCycleReturnPrevLevel if None
 
 def simplify_canned_cycle(canned_gcode, start_pos,
                           plane=None, dist_mode=None, retract_mode=None,
@@ -394,14 +509,18 @@ def simplify_canned_cycle(canned_gcode, start_pos,
     :param dist_mode: machine's distance mode (GCodeAbsoluteDistanceMode or GCodeIncrementalDistanceMode)
     :param axes: axes machine accepts (set)
     """
+    from .gcodes import GCodeRapidMove, GCodeDwell, GCodeSelectXYPlane
+    from .gcodes import GCodeAbsoluteDistanceMode, GCodeIncrementalDistanceMode
+    from .gcodes import GCodeDrillingCyclePeck, GCodeDrillingCycleDwell, GCodeDrillingCycleChipBreaking
+    from .gcodes import GCodeCannedCycleReturnPrevLevel, GCodeCannedCycleReturnToR
 
     # set defaults
     if plane is None:
-        plane = DEFAULT_SCC_PLANE()
+        plane = (DEFAULT_SCC_PLANE or GCodeSelectXYPlane)()
     if dist_mode is None:
-        dist_mode = DEFAULT_SCC_DISTMODE()
+        dist_mode = (DEFAULT_SCC_DISTMODE or GCodeAbsoluteDistanceMode)()
     if retract_mode is None:
-        retract_mode = DEFAULT_SCC_RETRACTMODE()
+        retract_mode = (DEFAULT_SCC_RETRACTMODE or GCodeCannedCycleReturnPrevLevel)()
 
     # Parameter Type Assertions
     assert isinstance(canned_gcode, GCodeCannedCycle), "bad canned_gcode type: %r" % canned_gcode
@@ -6,6 +6,10 @@ from . import dialects
 from .exceptions import GCodeBlockFormatError, GCodeWordStrError
 
 class Word(object):
+    __slots__ = ('_word_type', 'letter', '_value')
+
+    frozen = False  # if True, instance may be shared (see FrozenWord)
+
     def __init__(self, *args, **kwargs):
         # Parameters (listed)
         args_count = len(args)
@@ -20,13 +24,12 @@ class Word(object):
             raise AssertionError("input arguments either: (letter, value) or (word_str)")
 
         # Parameters (keyword)
-        dialect = kwargs.pop('dialect', dialects.get_default())
+        dialect = kwargs.pop('dialect', None)
 
-        letter = letter.upper()
+        if not letter.isupper():
+            letter = letter.upper()  # (upper() always allocates a new str)
 
-        self._word_map = getattr(getattr(dialects, dialect), 'WORD_MAP')
-        self._value_class = self._word_map[letter].cls
-        self._value_clean = self._word_map[letter].clean_value
+        self._word_type = dialect_word_map(dialect)[letter]  # shared per dialect
 
         self.letter = letter
         self.value = value
@@ -69,10 +72,14 @@ class Word(object):
     def __hash__(self):
         return hash((self.letter, self.value))
 
+    def __reduce__(self):
+        # (the word type can't be pickled, so it's resolved again by dialect)
+        return (_unpickle_word, (self.letter, self._value, _word_dialect(self)))
+
     @property
     def value_str(self):
         """Clean string representation, for consistent file output"""
-        return self._value_clean(self.value)
+        return self._word_type.clean_value(self.value)
 
     # Value Properties
     @property
@@ -81,52 +88,240 @@ class Word(object):
 
     @value.setter
     def value(self, new_value):
-        self._value = self._value_class(new_value)
+        self._value = self._word_type.cls(new_value)
 
     @property
     def description(self):
-        return "%s: %s" % (self.letter, self._word_map[self.letter].description)
+        return "%s: %s" % (self.letter, self._word_type.description)
 
 
-def text2words(block_text, dialect=None):
+class FrozenWord(Word):
     """
-    Iterate through block text yielding Word instances
-    :param block_text: text for given block with comments removed
+    Immutable Word, safe to share between blocks & gcodes.
+
+    Copying a FrozenWord returns a (mutable) Word; copy it before changing it.
+    """
+    __slots__ = ('_dialect', '_hash')
+
+    frozen = True
+
+    def __init__(self, *args, **kwargs):
+        dialect = kwargs.pop('dialect', None)
+        if dialect is None:
+            dialect = dialects.get_default()
+        word = Word(*args, dialect=dialect)  # (validated & cast)
+        set_attr = object.__setattr__  # (bypassing self.__setattr__)
+        set_attr(self, '_word_type', word._word_type)
+        set_attr(self, 'letter', word.letter)
+        set_attr(self, '_value', word._value)
+        set_attr(self, '_dialect', dialect)
+        set_attr(self, '_hash', hash((word.letter, word._value)))
+
+    def __setattr__(self, key, value):
+        raise AttributeError("'%s' cannot be changed, copy it first" % self)
+
+    def __hash__(self):
+        return self._hash
+
+    def __copy__(self):
+        word = Word.__new__(Word)
+        word._word_type = self._word_type
+        word.letter = self.letter
+        word._value = self._value
+        return word
+
+    def __deepcopy__(self, memo):
+        return self  # immutable
+
+    def __reduce__(self):
+        # re-interned when unpickled (hash is not stable between processes)
+        return (intern_word, (self.letter, self.value, self._dialect))
+
+
+
+class WordTokenizer(object):
+    """
+    Single-pass tokenizer for a dialect's word map.
+
+    Every word letter (and its value regex) is compiled into a single pattern
+    when the tokenizer is created, block text is then scanned from one match
+    to the next without creating any substrings.
+    """
+    # Name of the regex group matching a letter with an invalid value
+    INVALID_GROUP = '_invalid'
+
+    def __init__(self, word_map):
+        self.word_map = word_map
+
+        alternatives = []
+        for (letter, word_type) in sorted(word_map.items()):
+            value_pattern = word_type.value_regex.pattern
+            skip_pattern = r'.*?'  # value regex is searched for
+            if value_pattern.startswith('^'):
+                (skip_pattern, value_pattern) = ('', value_pattern[1:])  # anchored to the letter
+            alternatives.append(r'(?i:{letter}){skip}(?P<{letter}>{value})'.format(
+                letter=re.escape(letter),
+                skip=skip_pattern,
+                value=value_pattern,
+            ))
+        # any word letter not followed by a valid value (tested last)
+        alternatives.append(r'(?P<{name}>(?i:[{letters}]))'.format(
+            name=self.INVALID_GROUP,
+            letters=''.join(sorted(word_map.keys())),
+        ))
+
+        # Like the (per-word) regexes it replaces, non-word characters
+        # before each word are skipped, but not across new lines.
+        self.regex = re.compile(r'(?i:[^{letters}\n])*(?:{alternatives})'.format(
+            letters=''.join(sorted(word_map.keys())),
+            alternatives='|'.join(alternatives),
+        ))
+
+    def _tokens(self, block_text):
+        """
+        Scan block text into (<letter>, <value str>) tuples; the whole block
+        is scanned first, so an invalid word is raised before any are given
+        :param block_text: text for given block with comments removed
+        :return: list of (<letter>, <value str>) tuples
+        """
+        tokens = []
+        regex_match = self.regex.match
+        index = 0
+        match = regex_match(block_text, index)
+        while match:
+            letter = match.lastgroup
+            if letter == self.INVALID_GROUP:
+                raise GCodeWordStrError("word '%s' value invalid" % match.group(letter).upper())
+            tokens.append((letter, match.group(letter)))
+            index = match.end()  # propogate index to end of value
+            match = regex_match(block_text, index)
+
+        if _REGEX_NONWHITESPACE.search(block_text, index):
+            raise GCodeWordStrError("block code remaining '%s'" % block_text[index:])
+        return tokens
+
+    def iter_tokens(self, block_text):
+        """
+        Iterate through block text yielding (<letter>, <value str>) tuples
+        :param block_text: text for given block with comments removed
+        """
+        for token in self._tokens(block_text):
+            yield token
+
+    def iter_words(self, block_text, dialect=None, intern_words=True, word_class=None):
+        """
+        Iterate through block text yielding Word instances
+        :param block_text: text for given block with comments removed
+        :param dialect: dialect given to each Word
+        :param intern_words: if True, words with a letter in INTERN_LETTERS are shared FrozenWord instances
+        :param word_class: class of words that aren't interned (default: Word)
+        """
+        if dialect is None:
+            dialect = dialects.get_default()
+        intern_letters = INTERN_LETTERS if intern_words else ''
+        if word_class is None:
+            word_class = Word
+        for (letter, value) in self._tokens(block_text):
+            if letter in intern_letters:
+                yield intern_word(letter, value, dialect=dialect)
+            else:
+                yield word_class(letter, value, dialect=dialect)
+
+_REGEX_NONWHITESPACE = re.compile(r'\S')
+_word_maps = {}  # of the form: {'marlin2': {'G': WordType(...), ... }, ... }
+_tokenizers = {}  # of the form: {'marlin2': WordTokenizer(...), ... }
+
+# Interned (command) words
+INTERN_LETTERS = 'GMT'
+INTERN_MAX_SIZE = 4096
+_interned_words = {}  # of the form: {('marlin2', 'G', '1'): FrozenWord('G', 1), ... }
+
+
+def dialect_word_map(dialect=None):
+    """
+    Get the (cached) word map for the given dialect
+    :param dialect: dialect name (default if None)
+    :return: dict of the form: {<letter>: WordType(...), ... }
     """
     if dialect is None:
         dialect = dialects.get_default()
-    word_map = getattr(getattr(dialects, dialect), 'WORD_MAP')
+    try:
+        return _word_maps[dialect]
+    except KeyError:
+        word_map = getattr(getattr(dialects, dialect), 'WORD_MAP')
+        _word_maps[dialect] = word_map
+        return word_map
 
-    next_word = re.compile(r'^.*?(?P<letter>[%s])' % ''.join(word_map.keys()), re.IGNORECASE)
 
-    index = 0
-    while True:
-        letter_match = next_word.search(block_text[index:])
-        if letter_match:
-            # Letter
-            letter = letter_match.group('letter').upper()
-            index += letter_match.end() # propogate index to start of value
+def _word_dialect(word):
+    """Name of the dialect a word was created with"""
+    for (dialect, word_map) in _word_maps.items():
+        if word_map.get(word.letter) is word._word_type:
+            return dialect
+    raise AssertionError("no dialect found for %r" % word)
 
-            # Value
-            value_regex = word_map[letter].value_regex
-            value_match = value_regex.search(block_text[index:])
-            if value_match is None:
-                raise GCodeWordStrError("word '%s' value invalid" % letter)
-            value = value_match.group() # matched text
 
-            yield Word(letter, value)
+def _unpickle_word(letter, value, dialect):
+    # (value is already cast; faster than Word(letter, value, dialect=dialect))
+    word = Word.__new__(Word)
+    word._word_type = dialect_word_map(dialect)[letter]
+    word.letter = letter
+    word._value = value
+    return word
 
-            index += value_match.end() # propogate index to end of value
-        else:
-            break
 
-    remainder = block_text[index:]
-    if remainder and re.search(r'\S', remainder):
-        raise GCodeWordStrError("block code remaining '%s'" % remainder)
+def dialect_tokenizer(dialect=None):
+    """
+    Get the (cached) tokenizer for the given dialect
+    :param dialect: dialect name (default if None)
+    :return: WordTokenizer instance
+    """
+    if dialect is None:
+        dialect = dialects.get_default()
+    try:
+        return _tokenizers[dialect]
+    except KeyError:
+        tokenizer = WordTokenizer(dialect_word_map(dialect))
+        _tokenizers[dialect] = tokenizer
+        return tokenizer
+
+
+def intern_word(letter, value, dialect=None):
+    """
+    Get a shared FrozenWord instance for the given word
+    :param letter: word letter
+    :param value: word value (as parsed, or cast)
+    :param dialect: dialect name (default if None)
+    :return: FrozenWord instance
+    """
+    if dialect is None:
+        dialect = dialects.get_default()
+    letter = letter.upper()
+    key = (dialect, letter, value)
+    try:
+        return _interned_words[key]
+    except KeyError:
+        word = FrozenWord(letter, value, dialect=dialect)
+        if len(_interned_words) < INTERN_MAX_SIZE:  # uncommon values are not retained
+            # keyed by given & cast value (eg: 'G01', 'G1' & Word('G', 1) share an instance)
+            word = _interned_words.setdefault((dialect, letter, word.value), word)
+            _interned_words[key] = word
+        return word
+
+
+def text2words(block_text, dialect=None, intern_words=True):
+    """
+    Iterate through block text yielding Word instances
+    :param block_text: text for given block with comments removed
+    :param intern_words: if True, command words (G, M & T) are shared FrozenWord instances
+    """
+    if dialect is None:
+        dialect = dialects.get_default()
+    return dialect_tokenizer(dialect).iter_words(block_text, dialect=dialect, intern_words=intern_words)
 
 
-def str2word(word_str):
-    words = list(text2words(word_str))
+def str2word(word_str, dialect=None):
+    words = list(text2words(word_str, dialect=dialect))
     if words:
         if len(words) > 1:
             raise GCodeWordStrError("more than one word given")
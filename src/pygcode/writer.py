@@ -0,0 +1,270 @@
+import io
+
+import six
+
+from .gcodes_base import GCode
+from .line import Line
+from .block import Block
+from .words import Word, dialect_word_map
+from . import dialects
+
+DEFAULT_BUFFER_SIZE = 64 * 1024  # characters written to file at a time
+DEFAULT_DECIMAL_PLACES = 3
+DEFAULT_ENCODING = 'utf-8'
+
+
+def number_formatter(decimal_places):
+    """
+    Number formatting function, for a number of decimal places
+    (trailing zeros are removed, and numbers are never given in scientific notation)
+    :param decimal_places: number of decimal places
+    :return: function: <float> -> <str>
+    """
+    fmt = '%%.%if' % decimal_places
+
+    def format_number(value):
+        text = fmt % value
+        if decimal_places:
+            text = text.rstrip('0').rstrip('.')
+        return '0' if text == '-0' else text
+    return format_number
+
+
+class GCodeWriter(object):
+    """
+    Buffered gcode output, to a file object.
+
+    Words are formatted by (cached) functions for each letter: float values
+    are given with the number of decimal places set for their letter;
+    command words (G, M, T) and other values as the dialect cleans them
+    (eg: ``G01``), command words' strings are kept once formatted.
+    Lines & blocks that haven't been changed since they were parsed are
+    written as they were (their original text), unless ``keep_text`` is
+    False; so when only some lines of a file are changed, only those are
+    formatted. Lines are written to the file in batches of ``buffer_size``
+    characters.
+
+    .. code-block:: python
+
+        from pygcode import GCodeWriter, parse_file
+        with open('out.gcode', 'w') as fileobj:
+            with GCodeWriter(fileobj, decimal_places={'E': 5}) as writer:
+                writer.write_lines(parse_file('part.gcode'))
+
+    """
+    # Command words' letters (their strings are kept, by value)
+    COMMAND_LETTERS = 'GMT'
+
+    def __init__(self, fileobj, decimal_places=None, default_decimal_places=DEFAULT_DECIMAL_PLACES,
+                 dialect=None, buffer_size=DEFAULT_BUFFER_SIZE, newline='\n', encoding=DEFAULT_ENCODING,
+                 keep_text=True):
+        """
+        :param fileobj: file object opened for writing (binary or text)
+        :param decimal_places: dict of the form {<letter>: <decimal places>, ...} (eg: {'E': 5})
+        :param default_decimal_places: decimal places of numbers with letters not in decimal_places
+        :param dialect: dialect of written words (default if None)
+        :param buffer_size: number of characters written to file at a time
+        :param newline: end of every line
+        :param encoding: encoding of lines written to a binary file object
+        :param keep_text: if True, lines & blocks that haven't changed (see Line.dirty)
+                          are written as their original text
+        """
+        if dialect is None:
+            dialect = dialects.get_default()
+        self.fileobj = fileobj
+        self.decimal_places = dict((k.upper(), v) for (k, v) in (decimal_places or {}).items())
+        self.default_decimal_places = default_decimal_places
+        self.dialect = dialect
+        self.buffer_size = buffer_size
+        self.newline = newline
+        self.encoding = encoding
+        self.keep_text = keep_text
+        self._binary = not isinstance(fileobj, io.TextIOBase)
+
+        self._word_map = dialect_word_map(dialect)
+        self._formatters = {}  # {(<letter>, <decimal places>): <function>, ...}
+        self._letter_formatters = {}  # {<letter>: <function>, ...}
+        self._command_strs = {}  # {(<letter>, <value>): <str>, ...}
+
+        self._buffer = []
+        self._buffered = 0  # characters in buffer
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.flush()
+
+    # --- Formatting
+    def formatter(self, letter, decimal_places=None):
+        """
+        Word formatting function
+        :param letter: word letter
+        :param decimal_places: decimal places of numbers (default: set for letter)
+        :return: function: <value> -> <word str> (eg: 1.5 -> 'X1.5')
+        """
+        if decimal_places is None:
+            try:
+                return self._letter_formatters[letter]
+            except KeyError:
+                pass
+            decimal_places = self.decimal_places.get(letter, self.default_decimal_places)
+            function = self._letter_formatters[letter] = self.formatter(letter, decimal_places)
+            return function
+
+        key = (letter, decimal_places)
+        try:
+            return self._formatters[key]
+        except KeyError:
+            clean_value = self._word_map[letter].clean_value
+            if letter in self.COMMAND_LETTERS:
+                function = lambda v: letter + str(clean_value(v))
+            else:
+                format_number = number_formatter(decimal_places)
+                function = lambda v: letter + (format_number(v) if isinstance(v, float) else str(clean_value(v)))
+            self._formatters[key] = function
+            return function
+
+    def format_word(self, word):
+        """
+        :param word: Word instance
+        :return: str
+        """
+        letter = word.letter
+        if letter in self.COMMAND_LETTERS:
+            key = (letter, word.value)
+            try:
+                return self._command_strs[key]
+            except KeyError:
+                text = self._command_strs[key] = self.formatter(letter)(word.value)
+                return text
+        return self.formatter(letter)(word.value)
+
+    def format_gcode(self, gcode):
+        """
+        :param gcode: GCode instance
+        :return: str (as str(gcode), with parameters formatted by the writer)
+        """
+        params = gcode.params
+        words = [self.format_word(gcode.word)]
+        if gcode._whitespace_prefix:
+            words[0] = ' ' * len(words[0])
+        if params:
+            words += [self.format_word(params[k]) for k in sorted(params)]
+        return ' '.join(words)
+
+    def format_block(self, block):
+        """
+        :param block: Block instance
+        :return: str (as str(block), with words formatted by the writer)
+        """
+        if self.keep_text and block._raw_text and not block.dirty:
+            return block._raw_text.strip()
+        return ' '.join(
+            [self.format_gcode(g) for g in block.gcodes] +
+            [self.format_word(w) for w in block.modal_params]
+        )
+
+    def format_line(self, line):
+        """
+        :param line: Line instance
+        :return: str (block, comment, and macro)
+        """
+        if self.keep_text and (line._text is not None) and not line.dirty:
+            return line._text.rstrip('\r\n')
+        parts = []
+        if line.block:
+            parts.append(self.format_block(line.block))
+        parts += [str(x) for x in (line.comment, line.macro) if x]
+        return ' '.join(parts)
+
+    def format(self, obj):
+        """
+        :param obj: Line, Block, GCode, or Word instance, or str (written as-is)
+        :return: str
+        """
+        if isinstance(obj, six.string_types):
+            return obj
+        elif isinstance(obj, Line):
+            return self.format_line(obj)
+        elif isinstance(obj, Block):
+            return self.format_block(obj)
+        elif isinstance(obj, GCode):
+            return self.format_gcode(obj)
+        elif isinstance(obj, Word):
+            return self.format_word(obj)
+        raise AssertionError("invalid parameter: %r" % obj)
+
+    # --- Writing
+    def _append(self, text):
+        self._buffer.append(text)
+        self._buffered += len(text)
+        if self._buffered >= self.buffer_size:
+            self.flush()
+
+    def write(self, *objs):
+        """
+        Write a line
+        :param objs: Line, Block, GCode, Word instances, or str, written on the same line
+        """
+        self._append(' '.join(self.format(obj) for obj in objs) + self.newline)
+
+    def write_lines(self, lines):
+        """
+        Write lines
+        :param lines: iterable of Line, Block, or GCode instances, or str (one per line)
+        """
+        format = self.format
+        newline = self.newline
+        for line in lines:
+            self._append(format(line) + newline)
+
+    def write_moves(self, word, columns):
+        """
+        Write a line for each row of coordinate columns (requires numpy)
+        :param word: command word of every line, as Word or str (eg: 'G1')
+        :param columns: list of (<letter>, <numpy array>) tuples, in the order they're written;
+                        rows with a nan value are written without the word(s)
+
+        Rows are formatted in chunks (by a single format string per chunk), so
+        numbers are written with all of their decimal places (eg: ``X1.500``).
+        """
+        import numpy
+        if not columns:
+            return
+        if isinstance(word, Word):
+            word = self.format_word(word)
+        letters = [letter for (letter, values) in columns]
+        places = [self.decimal_places.get(l, self.default_decimal_places) for l in letters]
+        values = numpy.column_stack([numpy.asarray(v, dtype=float) for (l, v) in columns])
+        for (i, p) in enumerate(places):
+            column = values[:, i]
+            column[numpy.round(column, p) == 0] = 0.  # (not -0)
+        row_format = word + ''.join(' %s%%.%if' % (l, p) for (l, p) in zip(letters, places)) + self.newline
+
+        # Rows without nan: formatted in chunks (of about buffer_size)
+        missing = numpy.flatnonzero(numpy.isnan(values).any(axis=1))
+        chunk = None
+        start = 0
+        for index in missing.tolist() + [len(values)]:
+            if (index > start) and (chunk is None):
+                chunk = max(1, self.buffer_size // len(row_format % tuple(values[start].tolist())))
+            for i in range(start, index, chunk or 1):
+                j = min(i + chunk, index)
+                self._append((row_format * (j - i)) % tuple(values[i:j].ravel().tolist()))
+            if index < len(values):
+                self._append(word + ''.join(
+                    (' %s%%.%if' % (l, p)) % v for (l, p, v) in zip(letters, places, values[index].tolist())
+                    if v == v  # (not nan)
+                ) + self.newline)
+            start = index + 1
+
+    def flush(self):
+        """Write buffered lines to file"""
+        if self._buffer:
+            text = ''.join(self._buffer)
+            if self._binary:
+                text = text.encode(self.encoding)
+            self.fileobj.write(text)
+            self._buffer = []
+            self._buffered = 0
@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+"""
+Linearizing arcs, and writing their moves: a G1 gcode per linear move
+(LinearizeArcs with batch_size=0), vs arcs linearized in batches, their
+moves written straight from their coordinates (as pygcode-norm does).
+
+usage: python bench_linearize.py [<gcode file>]
+(a synthetic program of arcs is used if no file is given; requires a
+dialect with plane selection as default, eg: linuxcnc)
+"""
+import io
+import os
+import sys
+import random
+import argparse
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from testutils import add_pygcode_to_path
+add_pygcode_to_path()
+
+from pygcode import Line, GCodeWriter
+from pygcode.pipeline import Pipeline, LinearizeArcs, LinearMoves
+
+
+def arc_program_lines(count, seed=0):
+    rand = random.Random(seed)
+    yield 'G90 G17 G21'
+    yield 'G0 X0 Y0 Z0'
+    for i in range(count):
+        yield 'G%i X%.3f Y%.3f I%.3f J%.3f' % (
+            rand.choice([2, 3]), rand.uniform(-10, 10), rand.uniform(-10, 10),
+            rand.uniform(-2, 2), rand.uniform(-2, 2),
+        )
+
+
+def linearized(lines, batch_size):
+    fileobj = io.StringIO()
+    with GCodeWriter(fileobj) as writer:
+        for (line, state) in Pipeline([LinearizeArcs(batch_size=batch_size)]).process(lines):
+            if isinstance(line, LinearMoves):
+                line.write(writer)
+            else:
+                writer.write(line)
+    return fileobj.getvalue()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Arc linearizing throughput")
+    parser.add_argument('infile', nargs='?', type=argparse.FileType('r'), default=None)
+    parser.add_argument('--arcs', type=int, default=2000, help="arcs of synthetic program")
+    parser.add_argument('--repeat', type=int, default=3, help="best of this many runs")
+    args = parser.parse_args()
+
+    if args.infile:
+        texts = [l.rstrip('\n') for l in args.infile]
+    else:
+        texts = list(arc_program_lines(args.arcs))
+
+    print("lines: %i" % len(texts))
+    for (name, batch_size) in [('per move', 0), ('batched', 1000)]:
+        duration = min(timeit.repeat(
+            lambda: linearized((Line(t) for t in texts), batch_size),
+            number=1, repeat=args.repeat,
+        ))
+        written = linearized((Line(t) for t in texts), batch_size).count('\n')
+        print("%-10s %8.0f lines/s  (%i lines written: %.0f/s)" % (
+            name, len(texts) / duration, written, written / duration,
+        ))
@@ -0,0 +1,48 @@
+#!/usr/bin/env python
+"""
+Machine simulation throughput: motion gcodes processed per second
+(lines are parsed before timing starts).
+
+usage: python bench_machine.py [<gcode file>]
+(a synthetic Marlin program is used if no file is given)
+"""
+import os
+import sys
+import argparse
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from testutils import add_pygcode_to_path
+add_pygcode_to_path()
+
+from pygcode import Machine, Line
+from pygcode.gcodes_base import GCodeMotion
+
+from marlin_program import marlin_program_lines
+
+
+def simulate(blocks):
+    machine = Machine()
+    for block in blocks:
+        machine.process_block(block)
+    return machine
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Machine simulation throughput")
+    parser.add_argument('infile', nargs='?', type=argparse.FileType('r'), default=None)
+    parser.add_argument('--layers', type=int, default=20, help="layers of synthetic program")
+    parser.add_argument('--repeat', type=int, default=3, help="best of this many runs")
+    args = parser.parse_args()
+
+    if args.infile:
+        lines = [l.rstrip('\n') for l in args.infile]
+    else:
+        lines = list(marlin_program_lines(layer_count=args.layers))
+    blocks = [Line(l).block for l in lines]
+    moves = sum(1 for b in blocks for g in b.gcodes if isinstance(g, GCodeMotion))
+
+    duration = min(timeit.repeat(lambda: simulate(blocks), number=1, repeat=args.repeat))
+    print("lines: %i, moves: %i" % (len(blocks), moves))
+    print("moves per second: %.0f" % (moves / duration))
+    print("lines per second: %.0f" % (len(blocks) / duration))
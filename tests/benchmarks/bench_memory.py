@@ -0,0 +1,54 @@
+#!/usr/bin/env python
+"""
+Memory used by parsed lines (bytes per Line instance, including its
+Block, Words, GCodes & Comment).
+
+usage: python bench_memory.py [<gcode file>]
+(a synthetic Marlin program is used if no file is given)
+"""
+import os
+import sys
+import gc
+import argparse
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from testutils import add_pygcode_to_path
+add_pygcode_to_path()
+
+from pygcode import Line
+
+from marlin_program import marlin_program_lines
+
+
+def measure(lines):
+    """
+    :param lines: list of gcode line strings
+    :return: (<bytes per line>, <parsed lines>)
+    """
+    Line(lines[0])  # import / build maps before tracing
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    parsed = [Line(l) for l in lines]
+    gc.collect()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    total = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+    return (float(total) / len(parsed), parsed)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Memory used per parsed line")
+    parser.add_argument('infile', nargs='?', type=argparse.FileType('r'), default=None)
+    parser.add_argument('--layers', type=int, default=20, help="layers of synthetic program")
+    args = parser.parse_args()
+
+    if args.infile:
+        lines = [l.rstrip('\n') for l in args.infile]
+    else:
+        lines = list(marlin_program_lines(layer_count=args.layers))
+
+    (bytes_per_line, parsed) = measure(lines)
+    print("lines: %i" % len(parsed))
+    print("bytes per line: %.1f" % bytes_per_line)
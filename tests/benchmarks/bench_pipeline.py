@@ -0,0 +1,57 @@
+#!/usr/bin/env python
+"""
+Chaining line processors: each processing lines with its own machine, vs
+a Pipeline processing lines once (stages share the lines' states).
+
+usage: python bench_pipeline.py [<gcode file>]
+(a synthetic Marlin program is used if no file is given)
+"""
+import os
+import sys
+import argparse
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from testutils import add_pygcode_to_path
+add_pygcode_to_path()
+
+from pygcode import Line
+from pygcode.pipeline import Pipeline, ProcessorStage
+from pygcode.simplify import PolylineSimplifier, WordCompactor
+
+from marlin_program import marlin_program_lines
+
+
+def chained(lines):
+    lines = PolylineSimplifier().process_lines(lines)
+    lines = WordCompactor().process_lines(lines)
+    return [l.text for l in lines]
+
+
+def pipeline(lines):
+    return [l.text for l in Pipeline([
+        ProcessorStage(PolylineSimplifier()),
+        ProcessorStage(WordCompactor(), keeps_state=True),
+    ]).process_lines(lines)]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Chained line processors' speed")
+    parser.add_argument('infile', nargs='?', type=argparse.FileType('r'), default=None)
+    parser.add_argument('--layers', type=int, default=20, help="layers of synthetic program")
+    parser.add_argument('--repeat', type=int, default=3, help="best of this many runs")
+    args = parser.parse_args()
+
+    if args.infile:
+        text_lines = [l.rstrip('\n') for l in args.infile]
+    else:
+        text_lines = list(marlin_program_lines(layer_count=args.layers))
+
+    print("lines: %i" % len(text_lines))
+    assert chained(Line(l) for l in text_lines) == pipeline(Line(l) for l in text_lines)
+    for (name, function) in [('chained', chained), ('pipeline', pipeline)]:
+        duration = min(timeit.repeat(
+            lambda: function(Line(l) for l in text_lines),
+            number=1, repeat=args.repeat,
+        ))
+        print("%-10s %8.0f lines/s" % (name, len(text_lines) / duration))
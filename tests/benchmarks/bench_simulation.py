@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+"""
+Bounding box & travel of a program: step-by-step Machine vs Simulation,
+from parsed lines, and from text (Simulation's lines are parsed lazily,
+so its batched moves are never parsed).
+
+usage: python bench_simulation.py [<gcode file>]
+(a synthetic Marlin program is used if no file is given)
+"""
+import os
+import sys
+import argparse
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from testutils import add_pygcode_to_path
+add_pygcode_to_path()
+
+from pygcode import Machine, Simulation, Line
+
+from marlin_program import marlin_program_lines
+
+
+def stepped(lines):
+    machine = Machine()
+    pos = machine.abs_pos
+    (x, y, z) = (pos.X, pos.Y, pos.Z)
+    travel = 0.0
+    for line in lines:
+        machine.process_block(line.block)
+        (x0, y0, z0) = (x, y, z)
+        (x, y, z) = (pos.X, pos.Y, pos.Z)
+        travel += ((x - x0) ** 2 + (y - y0) ** 2 + (z - z0) ** 2) ** 0.5
+    return (machine.abs_range_min, machine.abs_range_max, travel)
+
+
+def simulated(lines):
+    sim = Simulation()
+    sim.process_lines(lines)
+    return sim.bounds() + (sim.travel(),)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Bounding box & travel throughput")
+    parser.add_argument('infile', nargs='?', type=argparse.FileType('r'), default=None)
+    parser.add_argument('--layers', type=int, default=20, help="layers of synthetic program")
+    parser.add_argument('--repeat', type=int, default=3, help="best of this many runs")
+    args = parser.parse_args()
+
+    if args.infile:
+        texts = [l.rstrip('\n') for l in args.infile]
+    else:
+        texts = list(marlin_program_lines(layer_count=args.layers))
+    parsed = [Line(t) for t in texts]
+
+    print("lines: %i" % len(texts))
+    for (name, function, get_lines) in [
+            ('Machine', stepped, lambda: parsed),
+            ('Simulation', simulated, lambda: parsed),
+            ('Machine (from text)', stepped, lambda: (Line(t) for t in texts)),
+            ('Simulation (from text)', simulated, lambda: (Line(t, lazy=True) for t in texts))]:
+        duration = min(timeit.repeat(lambda: function(get_lines()), number=1, repeat=args.repeat))
+        (low, high, travel) = function(get_lines())
+        print("%-22s %9.0f lines/s  (%s - %s, travel: %.3f)" % (
+            name, len(texts) / duration, low, high, travel,
+        ))
@@ -0,0 +1,56 @@
+#!/usr/bin/env python
+"""
+Job time estimate throughput: gcode processing (from parsed lines, with
+and without batched moves, and from text), and the (numpy) estimate itself,
+timed separately.
+
+usage: python bench_timing.py [<gcode file>]
+(a synthetic Marlin program is used if no file is given)
+"""
+import os
+import sys
+import argparse
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from testutils import add_pygcode_to_path
+add_pygcode_to_path()
+
+from pygcode import TimeEstimator, Line
+
+from marlin_program import marlin_program_lines
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Job time estimate throughput")
+    parser.add_argument('infile', nargs='?', type=argparse.FileType('r'), default=None)
+    parser.add_argument('--layers', type=int, default=20, help="layers of synthetic program")
+    args = parser.parse_args()
+
+    if args.infile:
+        lines = [l.rstrip('\n') for l in args.infile]
+    else:
+        lines = list(marlin_program_lines(layer_count=args.layers))
+    texts = lines
+    lines = [Line(l) for l in texts]
+    for line in lines:
+        line.block  # (parse)
+
+    # Processing: parsed lines (moves processed by the machine, or batched), and from text (parsed lazily)
+    for (name, batch, get_lines) in [
+            ('parsed, unbatched', False, lambda: lines),
+            ('parsed', True, lambda: lines),
+            ('from text', True, lambda: (Line(t, lazy=True) for t in texts))]:
+        estimator = TimeEstimator()
+        estimator.toolpath.batch = batch
+        start = time.time()
+        estimator.process_lines(get_lines())
+        processed = time.time()
+        print("processing (%s): %.0f lines per second" % (name, len(lines) / (processed - start)))
+
+    total = estimator.total_time()
+    estimated = time.time()
+
+    print("lines: %i, segments: %i" % (len(lines), len(estimator.toolpath)))
+    print("estimate: %.0f seconds" % total)
+    print("estimate: %.0f segments per second" % (len(estimator.toolpath) / (estimated - processed)))
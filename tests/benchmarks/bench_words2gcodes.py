@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+"""
+Time taken to group words into gcodes (words2gcodes), compared with the
+previous (quadratic) implementation, for short and long blocks.
+
+usage: python bench_words2gcodes.py
+"""
+import os
+import sys
+import timeit
+from collections import defaultdict
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from testutils import add_pygcode_to_path
+add_pygcode_to_path()
+
+from pygcode.words import text2words
+from pygcode.gcodes import words2gcodes, word_gcode_class
+
+
+def legacy_words2gcodes(words):
+    """words2gcodes as it was: candidates are linked to every following word"""
+    gcodes = []
+    word_info_list = [
+        {
+            'index': i,
+            'word': word,
+            'gcode_class': word_gcode_class(word),
+            'param_to_index': None,
+        }
+        for (i, word) in enumerate(words)
+    ]
+    for word_info in word_info_list:
+        if word_info['gcode_class'] is None:
+            continue
+        for param_info in word_info_list[word_info['index'] + 1:]:
+            if param_info['word'].letter in word_info['gcode_class'].param_letters:
+                param_info['param_to_index'] = word_info['index']
+                param_info['gcode_class'] = None
+    parameter_map = defaultdict(list)
+    for word_info in word_info_list:
+        if word_info['gcode_class']:
+            continue
+        parameter_map[word_info['param_to_index']].append(word_info['word'])
+    for word_info in word_info_list:
+        if word_info['gcode_class'] is None:
+            continue
+        gcode = word_info['gcode_class'](
+            word_info['word'],
+            *parameter_map[word_info['index']]
+        )
+        gcodes.append(gcode)
+    return (gcodes, parameter_map[None])
+
+
+BLOCKS = [
+    'G1 X10.5 Y20.25 E0.5',
+    'M92 X80 Y80 Z400 E93 T0',
+    'M203 X500 Y500 Z12 E120 T0',
+    'M205 X8 Y8 Z0.4 E5 B20000 S0 T0 J0.02',
+    'G1 F1500 X1 Y2 Z3 E4 M106 S255 M104 S210 T0 M140 S60 G92 E0 M82 M107',
+]
+
+
+if __name__ == '__main__':
+    for block_str in BLOCKS:
+        words = list(text2words(block_str))
+        assert words2gcodes(words) == legacy_words2gcodes(words), block_str
+        number = 5000
+        (legacy, linear) = (
+            min(timeit.repeat(lambda: func(words), number=number, repeat=3)) / number
+            for func in (legacy_words2gcodes, words2gcodes)
+        )
+        print("%2i words: legacy %6.2fus, linear %6.2fus (x%.2f)  %s" % (
+            len(words), legacy * 1e6, linear * 1e6, legacy / linear, block_str,
+        ))
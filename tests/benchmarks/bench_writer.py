@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+"""
+Writing a program: print(str(line)) vs GCodeWriter, formatting every line or
+keeping unchanged lines' original text (lines are parsed before timing starts),
+and writing a program's coordinates from numpy columns.
+
+usage: python bench_writer.py [<gcode file>]
+(a synthetic Marlin program is used if no file is given)
+"""
+import io
+import os
+import sys
+import argparse
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from testutils import add_pygcode_to_path
+add_pygcode_to_path()
+
+from pygcode import GCodeWriter, Line, Toolpath
+
+from marlin_program import marlin_program_lines
+
+
+def printed(lines):
+    fileobj = io.StringIO()
+    for line in lines:
+        print(str(line), file=fileobj)
+    return fileobj.getvalue()
+
+
+def writer(lines, keep_text=False):
+    fileobj = io.StringIO()
+    with GCodeWriter(fileobj, keep_text=keep_text) as w:
+        w.write_lines(lines)
+    return fileobj.getvalue()
+
+
+def kept_text(lines):
+    return writer(lines, keep_text=True)
+
+
+def columns(arrays):
+    fileobj = io.StringIO()
+    with GCodeWriter(fileobj, decimal_places={'E': 5}) as w:
+        w.write_moves('G1', [(a.upper(), arrays['end_' + a]) for a in 'xyz'] + [('E', arrays['end_e'])])
+    return fileobj.getvalue()
+
+
+def column_lines(arrays):
+    fileobj = io.StringIO()
+    with GCodeWriter(fileobj, decimal_places={'E': 5}) as w:
+        rows = zip(*[arrays['end_' + a].tolist() for a in 'xyze'])
+        w.write_lines('G1 X%.3f Y%.3f Z%.3f E%.5f' % row for row in rows)
+    return fileobj.getvalue()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Gcode output throughput")
+    parser.add_argument('infile', nargs='?', type=argparse.FileType('r'), default=None)
+    parser.add_argument('--layers', type=int, default=20, help="layers of synthetic program")
+    parser.add_argument('--repeat', type=int, default=3, help="best of this many runs")
+    args = parser.parse_args()
+
+    if args.infile:
+        text_lines = [l.rstrip('\n') for l in args.infile]
+    else:
+        text_lines = list(marlin_program_lines(layer_count=args.layers))
+    lines = [Line(l) for l in text_lines]
+
+    print("lines: %i" % len(lines))
+    assert printed(lines) == writer(lines)
+    assert kept_text(lines) == ''.join(l + '\n' for l in text_lines)
+    for (name, function) in [('print', printed), ('GCodeWriter', writer), ('original text', kept_text)]:
+        duration = min(timeit.repeat(lambda: function(lines), number=1, repeat=args.repeat))
+        print("%-14s %8.0f lines/s" % (name, len(lines) / duration))
+
+    toolpath = Toolpath()
+    toolpath.process_lines(lines)
+    arrays = toolpath.arrays()
+    print("motions: %i" % len(toolpath))
+    for (name, function) in [('row by row', column_lines), ('write_moves', columns)]:
+        duration = min(timeit.repeat(lambda: function(arrays), number=1, repeat=args.repeat))
+        print("%-14s %8.0f lines/s" % (name, len(toolpath) / duration))
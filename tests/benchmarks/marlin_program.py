@@ -0,0 +1,53 @@
+# Synthetic (slicer-like) Marlin program, for benchmarks
+import math
+
+
+def marlin_program_lines(layer_count=20, segments_per_layer=200):
+    """
+    Generate lines of a representative Marlin print file
+    (header, then perimeters with extrusion, travel moves & retractions)
+    :param layer_count: number of layers
+    :param segments_per_layer: number of extruding moves per layer
+    :return: generator of gcode lines (without trailing newline)
+    """
+    # Header
+    yield '; generated by pygcode benchmarks'
+    yield 'M140 S60 ; set bed temperature'
+    yield 'M104 S210 ; set hotend temperature'
+    yield 'M190 S60'
+    yield 'M109 S210'
+    yield 'G28 ; home all axes'
+    yield 'G90'
+    yield 'M82 ; absolute extrusion'
+    yield 'G92 E0'
+    yield 'M107'
+
+    e = 0.0
+    for layer in range(layer_count):
+        z = 0.2 * (layer + 1)
+        yield ';LAYER:%i' % layer
+        if layer == 1:
+            yield 'M106 S255'
+        yield 'G0 F9000 X%.3f Y%.3f Z%.3f' % (100.0, 100.0 - 40.0, z)
+        yield 'G1 F1500 E%.5f' % e  # un-retract
+        yield ';TYPE:WALL-OUTER'
+        (x0, y0) = (100.0, 60.0)
+        for i in range(1, segments_per_layer + 1):
+            angle = 2 * math.pi * i / segments_per_layer
+            (x, y) = (100.0 + 40.0 * math.sin(angle), 100.0 - 40.0 * math.cos(angle))
+            e += math.hypot(x - x0, y - y0) * 0.0333
+            if i == 1:
+                yield 'G1 F1200 X%.3f Y%.3f E%.5f' % (x, y, e)
+            else:
+                yield 'G1 X%.3f Y%.3f E%.5f' % (x, y, e)
+            (x0, y0) = (x, y)
+        yield 'G1 F2100 E%.5f' % (e - 5)  # retract
+
+    # Footer
+    yield 'M107'
+    yield 'M104 S0'
+    yield 'M140 S0'
+    yield 'G91'
+    yield 'G1 Z10 F600'
+    yield 'G90'
+    yield 'M84'
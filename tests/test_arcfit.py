@@ -0,0 +1,95 @@
+import io
+import math
+import unittest
+
+# Add relative pygcode to path
+from testutils import add_pygcode_to_path, str_lines
+add_pygcode_to_path()
+
+# Units under test
+from pygcode import Line, parse_file
+from pygcode.arcfit import ArcFitter, fit_arcs, circle_through
+
+
+def arc_program(count=36, radius=10., sweep=1.5 * math.pi, cw=False, e_relative=False, e_rate=0.05):
+    # polyline approximating an arc centered on X50 Y50, starting at its right (X60 Y50 for r=10)
+    lines = ['G90', 'M83' if e_relative else 'M82', 'G92 E0', 'G0 X%g Y50' % (50 + radius)]
+    (e, prev) = (0., (50 + radius, 50.))
+    for i in range(1, count + 1):
+        angle = sweep * i / count * (-1 if cw else 1)
+        point = (50 + radius * math.cos(angle), 50 + radius * math.sin(angle))
+        extrusion = math.hypot(point[0] - prev[0], point[1] - prev[1]) * e_rate
+        e += extrusion
+        lines.append('G1 X%.3f Y%.3f E%.5f%s' % (
+            point[0], point[1], extrusion if e_relative else e, ' F1200' if i == 1 else '',
+        ))
+        prev = point
+    lines.append('G1 X0 Y0')
+    return '\n'.join(lines)
+
+
+def fitted(text, **kwargs):
+    return [l.text for l in fit_arcs(parse_file(io.StringIO(text)), **kwargs)]
+
+
+class CircleThroughTests(unittest.TestCase):
+    def test_circle(self):
+        ((x, y), r) = circle_through((1, 0), (0, 1), (-1, 0))
+        self.assertAlmostEqual(x, 0)
+        self.assertAlmostEqual(y, 0)
+        self.assertAlmostEqual(r, 1)
+        self.assertIsNone(circle_through((0, 0), (1, 1), (2, 2)))
+
+
+class ArcFitterTests(unittest.TestCase):
+    def test_ccw(self):
+        self.assertEqual(fitted(arc_program()), [
+            'G90', 'M82', 'G92 E0', 'G0 X60 Y50',
+            'G03 X50 Y40 I-10 J0 E2.35451 F1200',
+            'G1 X0 Y0',
+        ])
+
+    def test_cw(self):
+        self.assertEqual(fitted(arc_program(cw=True))[4], 'G02 X50 Y60 I-10 J0 E2.35451 F1200')
+
+    def test_relative_extrusion(self):
+        self.assertEqual(fitted(arc_program(e_relative=True))[4], 'G03 X50 Y40 I-10 J0 E2.3544 F1200')
+
+    def test_travel(self):
+        self.assertEqual(fitted(arc_program(e_rate=0))[4], 'G03 X50 Y40 I-10 J0 F1200')
+
+    def test_full_circle(self):
+        # (arcs are less than a full circle)
+        lines = fitted(arc_program(sweep=2 * math.pi))
+        self.assertEqual(len(lines), 7)
+        self.assertTrue(lines[4].startswith('G03'))
+        self.assertEqual(lines[5], 'G1 X60.000 Y50.000 E3.13761')
+
+    def test_unchanged(self):
+        # not on an arc
+        zigzag = '\n'.join(['G0 X0 Y0'] + ['G1 X%i Y%i E%i' % (i, i % 2, i) for i in range(1, 10)])
+        self.assertEqual(fitted(zigzag), zigzag.split('\n'))
+        # uneven extrusion
+        lines = arc_program(e_relative=True).split('\n')
+        lines[10] = lines[10].replace(' E0.0', ' E0.1')
+        output = fitted('\n'.join(lines))
+        self.assertEqual(output[5], lines[10])  # (between arcs)
+        self.assertEqual([l[:3] for l in output[4:7]], ['G03', 'G1 ', 'G03'])
+        # too few lines
+        self.assertEqual(fitted(arc_program(count=2)), arc_program(count=2).split('\n'))
+
+    def test_tolerance(self):
+        # arc's distance from every vertex (& chord mid-point) is within tolerance
+        text = arc_program(count=10, radius=20)
+        self.assertEqual(len(fitted(text, tolerance=1)), 6)
+        self.assertEqual(len(fitted(text, tolerance=0.01)), len(text.split('\n')))
+
+    def test_breaks(self):
+        # comments, & other gcodes end runs
+        lines = arc_program().split('\n')
+        lines.insert(20, 'M106 S255')
+        lines[30] += ' ; comment'
+        output = fitted('\n'.join(lines))
+        self.assertIn('M106 S255', output)
+        self.assertIn(lines[30], output)
+        self.assertEqual(sum(1 for l in output if l.startswith('G03')), 3)
@@ -0,0 +1,79 @@
+import unittest
+from copy import copy
+
+# Add relative pygcode to path
+from testutils import add_pygcode_to_path, str_lines
+add_pygcode_to_path()
+
+# Units under test
+from pygcode import Line, Block, ParseCache
+from pygcode.words import Word, FrozenWord
+from pygcode.exceptions import GCodeWordStrError
+
+
+class ParseCacheTests(unittest.TestCase):
+    def test_counters(self):
+        cache = ParseCache(max_size=2)
+        for text in ['G1 E-0.8 F2100', 'M106 S255', 'G1  E-0.8 F2100 ; retract']:
+            Line(text, cache=cache)
+        self.assertEqual((cache.hits, cache.misses, cache.evictions), (1, 2, 0))
+        Line('G92 E0', cache=cache)  # evicts 'M106 S255' (least recently used)
+        Line('M106 S255', cache=cache)
+        self.assertEqual((cache.hits, cache.misses, cache.evictions), (1, 4, 2))
+        self.assertEqual(len(cache), 2)
+        cache.clear()
+        self.assertEqual((len(cache), cache.hits, cache.misses, cache.evictions), (0, 0, 0, 0))
+
+    def test_equivalent(self):
+        cache = ParseCache()
+        for text in ['G1 X1 Y2 E3', 'X1 Y2', 'M104 S200 T0', '', 'G1 X1 Y2 E3']:
+            (block, cached_block) = (Block(text), Block(text, cache=cache))
+            self.assertEqual(cached_block.words, block.words)
+            self.assertEqual(cached_block.gcodes, block.gcodes)
+            self.assertEqual(cached_block.modal_params, block.modal_params)
+            self.assertEqual(str(cached_block), str(block))
+
+    def test_shared(self):
+        cache = ParseCache(copy=False)
+        (b1, b2) = (Block('G1 X1 Y2', cache=cache), Block('G1 X1 Y2', cache=cache))
+        self.assertIsNot(b1.gcodes, b2.gcodes)  # lists are not shared
+        self.assertIs(b1.gcodes[0], b2.gcodes[0])
+        self.assertTrue(all(isinstance(w, FrozenWord) for w in b1.words))
+        # shared gcodes are immutable
+        gcode = b1.gcodes[0]
+        self.assertTrue(gcode.frozen)
+        with self.assertRaises(AttributeError):
+            gcode.X = 10
+        with self.assertRaises(AttributeError):
+            gcode.add_parameter(Word('Z', 1))
+        with self.assertRaises(TypeError):
+            gcode.params['X'] = Word('X', 10)
+        with self.assertRaises(AttributeError):
+            gcode.dirty = True
+        self.assertEqual(str(b2), 'G01 X1 Y2')
+        # copies are not
+        gcode = copy(gcode)
+        gcode.X = 10
+        self.assertEqual((gcode.frozen, str(gcode)), (False, 'G01 X10 Y2'))
+
+    def test_copy(self):
+        cache = ParseCache()
+        (b1, b2) = (Block('G1 X1 Y2', cache=cache), Block('G1 X1 Y2', cache=cache))
+        self.assertIsNot(b1.gcodes[0], b2.gcodes[0])
+        b1.gcodes[0].X = 10
+        self.assertEqual(str(b1), 'G01 X10 Y2')
+        self.assertEqual(str(b2), 'G01 X1 Y2')
+        self.assertEqual(str(Block('G1 X1 Y2', cache=cache)), 'G01 X1 Y2')
+        # (lines too; and the whitespace prefix)
+        (l1, l2) = (Line('G1 X1 Y1', cache=cache), Line('G1 X1 Y1', cache=cache))
+        l1.block.gcodes[0].X = 5
+        l1.block.gcodes[0]._whitespace_prefix = True
+        self.assertEqual(str(l2), 'G01 X1 Y1')
+        self.assertFalse(l2.dirty)
+
+    def test_errors_not_cached(self):
+        cache = ParseCache()
+        for i in range(2):
+            with self.assertRaises(GCodeWordStrError):
+                Block('G1 X1 ?', cache=cache)
+        self.assertEqual(len(cache), 0)
@@ -0,0 +1,108 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+# Add relative pygcode to path
+from testutils import add_pygcode_to_path, str_lines
+add_pygcode_to_path()
+
+# Units under test
+from pygcode import Machine, NullMachine, CheckpointIndex, parse_file
+from pygcode.checkpoint import seek, sidecar_path
+from pygcode.words import _word_dialect
+
+
+PROGRAM = ''.join(
+    'G0 Z{z}\nG1 X10 Y{z} F300\nG91\nX-5\nG90\n'.format(z=z)
+    for z in range(1, 9)
+)  # 40 lines, 8 layers
+
+
+class CheckpointIndexTests(unittest.TestCase):
+    def setUp(self):
+        self.tempdir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.tempdir, 'part.gcode')
+        with open(self.filename, 'w') as fh:
+            fh.write(PROGRAM)
+
+    def tearDown(self):
+        shutil.rmtree(self.tempdir)
+
+    def simulated(self, line_number):
+        # machine having processed all lines before line_number
+        machine = Machine()
+        for line in parse_file(self.filename):
+            if line.line_number >= line_number:
+                break
+            machine.process_block(line.block)
+        return machine
+
+    def assert_machines_equal(self, m1, m2):
+        self.assertEqual(str(m1.mode), str(m2.mode))
+        self.assertEqual(m1.pos, m2.pos)
+        self.assertEqual(m1.abs_range_min, m2.abs_range_min)
+        self.assertEqual(m1.abs_range_max, m2.abs_range_max)
+        self.assertEqual(m1.state.cur_coord_sys, m2.state.cur_coord_sys)
+
+    def test_build(self):
+        index = CheckpointIndex.build(self.filename, interval=10)
+        self.assertEqual([cp.line_number for cp in index.checkpoints], [11, 21, 31])
+        index = CheckpointIndex.build(self.filename, interval=100, layers=True)
+        self.assertEqual([cp.line_number for cp in index.checkpoints], [2, 7, 12, 17, 22, 27, 32, 37])
+        self.assertEqual(index.find(line_number=1), None)
+        self.assertEqual(index.find(line_number=11).line_number, 7)
+        self.assertEqual(index.find(byte_offset=index.checkpoints[2].byte_offset).line_number, 12)
+
+    def test_restore(self):
+        index = CheckpointIndex.build(self.filename, interval=7)
+        for checkpoint in index.checkpoints:
+            machine = Machine()
+            index.restore(checkpoint, machine)
+            self.assert_machines_equal(machine, self.simulated(checkpoint.line_number))
+
+    def test_restore_dialect(self):
+        # mode's gcodes are parsed in the index's dialect
+        index = CheckpointIndex.build(self.filename, interval=10, dialect='linuxcnc')
+        machine = Machine()
+        index.restore(index.checkpoints[0], machine)
+        self.assertEqual(set(_word_dialect(g.word) for g in machine.mode.gcodes), {'linuxcnc'})
+
+    def test_sidecar(self):
+        index = CheckpointIndex.build(self.filename, interval=10)
+        index.save(sidecar_path(self.filename))
+        loaded = CheckpointIndex.load(sidecar_path(self.filename))
+        self.assertEqual(loaded.checkpoints, index.checkpoints)
+        self.assertTrue(loaded.matches(Machine(), self.filename))
+        self.assertFalse(loaded.matches(NullMachine(), self.filename))  # different default mode
+        self.assertIsNone(CheckpointIndex.load(os.path.join(self.tempdir, 'missing.json')))
+
+    def test_stale(self):
+        # a file edited after it's indexed (even to the same size) doesn't match
+        index = CheckpointIndex.build(self.filename, interval=10)
+        index.save(sidecar_path(self.filename))
+        mtime = os.stat(self.filename).st_mtime
+        with open(self.filename, 'w') as fh:
+            fh.write(PROGRAM.replace('X10', 'X20'))
+        os.utime(self.filename, (mtime + 1, mtime + 1))
+        self.assertEqual(os.path.getsize(self.filename), index.file_size)
+        self.assertFalse(index.matches(Machine(), self.filename))
+        machine = Machine()
+        list(seek(self.filename, machine, line_number=22))
+        self.assert_machines_equal(machine, self.simulated(22))
+
+    def test_seek(self):
+        CheckpointIndex.build(self.filename, interval=10).save(sidecar_path(self.filename))
+        for line_number in (1, 10, 11, 17, 40):
+            machine = Machine()
+            lines = list(seek(self.filename, machine, line_number=line_number))
+            self.assertEqual(lines[0].line_number, line_number)
+            self.assertEqual(len(lines), 41 - line_number)
+            self.assert_machines_equal(machine, self.simulated(line_number))
+
+    def test_seek_byte_offset(self):
+        index = CheckpointIndex.build(self.filename, interval=10)
+        machine = Machine()
+        lines = seek(self.filename, machine, byte_offset=index.checkpoints[1].byte_offset + 1, index=index)
+        self.assertEqual(next(lines).line_number, 22)
+        self.assert_machines_equal(machine, self.simulated(22))
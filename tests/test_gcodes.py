@@ -14,6 +14,22 @@ from pygcode import words
 from pygcode import machine
 
 from pygcode.exceptions import GCodeWordStrError
+from pygcode.dialects import get_default as get_default_dialect
+
+def linear_word_gcode_class(word):
+    # word -> class, testing every class of the dialect in turn
+    classes = [
+        cls for cls in gcodes._subclasses(gcodes.GCode)
+        if get_default_dialect() in getattr(cls, 'dialects', [get_default_dialect()])
+    ]
+    for cls in classes:
+        if (cls.word_key is not None) and (cls.word_key == word):
+            return cls
+    for cls in classes:
+        if (cls.word_key is None) and (cls.word_matches is not None) and cls.word_matches(word):
+            return cls
+    return None
+
 
 class GCodeWordMappingTests(unittest.TestCase):
     def test_word_map_integrity(self):
@@ -28,6 +44,69 @@ class GCodeWordMappingTests(unittest.TestCase):
                     "conflict with %s and %s" % (fn_class, key_class)
                 )
 
+    def test_word_keys(self):
+        gcodes.build_maps()
+        for cls in gcodes._subclasses(gcodes.GCode):
+            for word in (cls.word_keys or []):
+                # finite matches are expanded into the word map
+                self.assertIs(gcodes.word_gcode_class(word), gcodes._gcode_word_map.get(word, cls))
+
+    def test_same_classes(self):
+        # words map to the same classes as testing every class in turn
+        gcodes.build_maps()
+        select_tool = getattr(gcodes, 'GCodeSelectOrReportTool', None)
+        test_words = list(words.text2words('N10 G999 M9999 F100 S5 T8'))
+        for cls in gcodes._subclasses(gcodes.GCode):
+            test_words += list(cls.word_keys or [])
+            if cls.default_word is not None:
+                test_words.append(cls.default_word)
+        for word in test_words:
+            if (select_tool is not None) and (word in select_tool.word_keys):
+                continue  # (see test_select_tool)
+            self.assertIs(gcodes.word_gcode_class(word), linear_word_gcode_class(word), word)
+
+    def test_select_tool(self):
+        # marlin T0..T7 values are strings, never matched by testing every class
+        if not hasattr(gcodes, 'GCodeSelectOrReportTool'):
+            self.skipTest("dialect has no GCodeSelectOrReportTool")
+        gcodes.build_maps()
+        for i in range(8):
+            (word,) = words.text2words('T%i' % i)
+            self.assertIsNone(linear_word_gcode_class(word))
+            self.assertIs(gcodes.word_gcode_class(word), gcodes.GCodeSelectOrReportTool)
+        (gc,) = gcodes.text2gcodes('T3')
+        self.assertIsInstance(gc, gcodes.GCodeSelectOrReportTool)
+
+    def test_unmatched(self):
+        gcodes.build_maps()
+        calls = []
+        def word_matches(w):
+            calls.append(w)
+            return False
+        gcodes._gcode_function_map.setdefault('M', []).append((word_matches, None))
+        word = words.Word('M', 9999)
+        for i in range(2):
+            self.assertIsNone(gcodes.word_gcode_class(word))
+            self.assertIn(9999, gcodes._gcode_unmatched['M'])
+        self.assertEqual(calls, [word])  # (second lookup is negatively cached)
+        gcodes.build_maps()  # clears negative cache
+        self.assertNotIn('M', gcodes._gcode_unmatched)
+
+class GCodeSlotsTests(unittest.TestCase):
+    def test_no_dict(self):
+        (gc,) = gcodes.text2gcodes('G1 X1 Y2')
+        self.assertFalse(hasattr(gc, '__dict__'))
+        gc.X = 3  # parameter attribute API is unchanged
+        self.assertEqual(gc.X, 3)
+        gc._whitespace_prefix = True
+        with self.assertRaises(AttributeError):
+            gc.foo = 1
+
+    def test_subclasses(self):
+        for cls in gcodes._subclasses(gcodes.GCode):
+            self.assertIn('__slots__', cls.__dict__, cls)
+
+
 class GCodeModalGroupTests(unittest.TestCase):
     def test_modal_groups(self):
         # Modal groups taken (and slightly modified) from LinuxCNC documentation:
@@ -104,6 +183,20 @@ class Words2GCodesTests(unittest.TestCase):
         #   F1500
         self.assertEqual(gcode_list[1].word, words.Word('F', 1500))
 
+    def test_closest_gcode_parameters(self):
+        # parameters belong to the closest gcode before them that accepts them
+        word_list = list(words.text2words('X0 M104 S200 T0 G1 X1 S5 M107'))
+        (gcode_list, unused_words) = gcodes.words2gcodes(word_list)
+        self.assertEqual([str(g) for g in gcode_list], ['M104 S200 T0', 'G01 S5 X1', 'M107'])
+        self.assertEqual(unused_words, [words.Word('X', 0)])
+
+    def test_parameter_candidates(self):
+        # gcode candidates that are parameters of an earlier gcode are parameters
+        word_list = list(words.text2words('M205 X8 T0 S0 J0.02'))
+        (gcode_list, unused_words) = gcodes.words2gcodes(word_list)
+        self.assertEqual(len(gcode_list), 1)
+        self.assertEqual(sorted(gcode_list[0].params), ['J', 'S', 'T', 'X'])
+
 
 class Text2GCodesTests(unittest.TestCase):
     def test_basic(self):
@@ -120,6 +213,14 @@ class Text2GCodesTests(unittest.TestCase):
         with self.assertRaises(GCodeWordStrError):
             gcodes.text2gcodes('X1 Y2')
 
+    def test_param_copy_on_write(self):
+        (gc1,) = gcodes.text2gcodes('M104 T0 S200')
+        (gc2,) = gcodes.text2gcodes('M104 T0 S210')
+        self.assertIs(gc1.params['T'], gc2.params['T'])  # interned
+        gc1.T = 1
+        self.assertEqual(gc1.params['T'], words.Word('T', 1))
+        self.assertEqual(gc2.params['T'], words.Word('T', 0))
+
 
 class GCodeSplitTests(unittest.TestCase):
 
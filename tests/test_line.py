@@ -1,4 +1,5 @@
 import unittest
+import pickle
 
 # Add relative pygcode to path
 from testutils import add_pygcode_to_path, str_lines
@@ -6,6 +7,8 @@ add_pygcode_to_path()
 
 # Units under test
 from pygcode.line import Line
+from pygcode.words import Word
+from pygcode.exceptions import GCodeWordStrError
 
 
 class LineCommentTests(unittest.TestCase):
@@ -49,3 +52,74 @@ class LineCommentTests(unittest.TestCase):
         line = Line('G02 X10.75 Y2 ; abc %something%')
         self.assertEqual(line.comment.text.strip(), 'abc')
         self.assertEqual(line.macro, '%something%')
+
+
+class LineLazyTests(unittest.TestCase):
+    def test_lazy_equivalent(self):
+        for text in ['G1 X1 Y2 ; move', '; just a comment', '', '% macro %', 'M104 S200']:
+            (line, lazy_line) = (Line(text), Line(text, lazy=True))
+            self.assertEqual(str(lazy_line), str(line))
+            self.assertEqual(lazy_line.block.words, line.block.words)
+            self.assertEqual(lazy_line.block.gcodes, line.block.gcodes)
+            self.assertEqual(lazy_line.macro, line.macro)
+
+    def test_lazy_deferred(self):
+        line = Line('G1 X1 (comment)', lazy=True)
+        self.assertIsNone(line._block)  # not yet split
+        self.assertEqual(line.comment.text, 'comment')
+        self.assertIsNone(line._block._words)  # block not yet parsed
+        self.assertIsNone(line._block._gcodes)
+        self.assertEqual(len(line.block.words), 2)
+        self.assertIsNone(line._block._gcodes)  # words don't need gcodes
+        self.assertEqual(len(line.gcodes), 1)
+
+    def test_lazy_errors_deferred(self):
+        line = Line('G1 X1 ?', lazy=True)
+        self.assertEqual(line.text, 'G1 X1 ?')
+        with self.assertRaises(GCodeWordStrError):
+            line.block.words
+
+    def test_lazy_set(self):
+        line = Line('G1 X1 ; abc', lazy=True)
+        line.comment = None
+        self.assertEqual(str(line), 'G01 X1')
+
+
+class LineDirtyTests(unittest.TestCase):
+    def test_clean(self):
+        line = Line('g1  x1.50 ; move')
+        self.assertFalse(line.dirty)
+        line.gcodes  # (parsing doesn't change it)
+        self.assertFalse(line.dirty)
+        self.assertEqual(line.text, 'g1  x1.50 ; move')
+
+    def test_changed(self):
+        for change in [
+            lambda l: setattr(l.block.gcodes[0], 'X', 2),
+            lambda l: l.block.gcodes[0].add_parameter(Word('Y', 2)),
+            lambda l: setattr(l.block, 'modal_params', []),
+            lambda l: setattr(l, 'comment', None),
+        ]:
+            line = Line('G1 X1.50 ; move')
+            change(line)
+            self.assertTrue(line.dirty)
+            self.assertEqual(line.text, str(line))
+
+    def test_set(self):
+        line = Line('G1 X1 Y2')
+        line.block.gcodes[0].params.pop('Y')  # (in place: not detected)
+        self.assertFalse(line.dirty)
+        line.block.dirty = True
+        self.assertEqual(line.text, 'G01 X1')
+
+
+class LinePickleTests(unittest.TestCase):
+    def test_pickle(self):
+        line = Line('G1 X1 Y2 T0 ; comment')
+        line.line_number = 3
+        line2 = pickle.loads(pickle.dumps(line))
+        self.assertEqual(str(line2), str(line))
+        self.assertEqual(line2.line_number, 3)
+        self.assertEqual(line2.block.words, line.block.words)
+        self.assertEqual(line2.block.gcodes, line.block.gcodes)
+        self.assertEqual(line2.block.words[1].description, line.block.words[1].description)
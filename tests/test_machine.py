@@ -1,18 +1,30 @@
+import sys
 import unittest
+from copy import copy
 
 # Add relative pygcode to path
 from testutils import add_pygcode_to_path, str_lines
 add_pygcode_to_path()
 
 # Units under test
-from pygcode.machine import Position, Machine
+from pygcode.machine import Position, Machine, Mode, NullMode
 from pygcode.line import Line
+from pygcode.words import Word
+from pygcode.gcodes_base import GCodeCannedCycle
 from pygcode.exceptions import MachineInvalidAxis
-from pygcode.gcodes import (
-    GCodeAbsoluteDistanceMode, GCodeIncrementalDistanceMode,
-    GCodeAbsoluteArcDistanceMode, GCodeIncrementalArcDistanceMode,
-    GCodeCannedCycleReturnPrevLevel, GCodeCannedCycleReturnToR,
-)
+try:
+    from pygcode.gcodes import (
+        GCodeAbsoluteDistanceMode, GCodeIncrementalDistanceMode,
+        GCodeAbsoluteArcDistanceMode, GCodeIncrementalArcDistanceMode,
+        GCodeCannedCycleReturnPrevLevel, GCodeCannedCycleReturnToR,
+    )
+except ImportError:  # (dialect without them)
+    GCodeAbsoluteDistanceMode = None
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
 
 
 class PositionTests(unittest.TestCase):
@@ -85,7 +97,171 @@ class PositionTests(unittest.TestCase):
         p = Position(axes='XYZ', X=2, Y=10)
         self.assertEqual(p / 2, Position(axes='XYZ', X=1, Y=5))
 
+    def test_arithmetic_inplace(self):
+        p = Position(axes='XYZ', X=1, Y=2)
+        p_id = id(p)
+        p += Position(axes='XYZ', X=1, Z=3)
+        p -= Position(axes='XY', Y=1)
+        p *= 4
+        p /= 2
+        self.assertEqual(id(p), p_id)
+        self.assertEqual(p, Position(axes='XYZ', X=4, Y=2, Z=6))
+        with self.assertRaises(MachineInvalidAxis):
+            p += Position(axes='XYZA')
+
+    def test_min_max(self):
+        p = Position(axes='XYZ', X=1, Y=-2)
+        p.update_min(Position(axes='XYZ', X=3, Y=-5, Z=-1))
+        self.assertEqual(p, Position(axes='XYZ', X=1, Y=-5, Z=-1))
+        p.update_max(Position(axes='XYZ', X=3))
+        self.assertEqual(p, Position(axes='XYZ', X=3, Y=0, Z=0))
+
+    def test_invalid_axis(self):
+        p = Position(axes='XYZ')
+        with self.assertRaises(AttributeError):
+            p.A
+        with self.assertRaises(MachineInvalidAxis):
+            p.A = 1
+        with self.assertRaises(MachineInvalidAxis):
+            Position(axes='XY', Z=1)
+
+    @unittest.skipIf(numpy is None, "numpy not installed")
+    def test_numpy(self):
+        positions = [Position(axes='XYZ', X=i, Z=-i) for i in range(3)]
+        array = Position.to_numpy(positions)
+        self.assertEqual(array.shape, (3, 9))
+        self.assertEqual(list(array[:, 2]), [0, -1, -2])
+        self.assertEqual(Position.from_numpy(array, axes='XYZ'), positions)
+        self.assertEqual(Position.from_numpy(positions[1].array, axes='XZ'), Position(axes='XZ', X=1, Z=-1))
+
+
+class ModeTests(unittest.TestCase):
+    def test_default_gcodes_cached(self):
+        (m1, m2) = (Mode(), Mode())
+        self.assertIs(m1.default_gcodes(), m2.default_gcodes())
+        self.assertEqual(str(m1), str(m2))
+        m1.set_mode(*Line('G1 X1').block.gcodes)
+        self.assertEqual(str(Mode()), str(m2))  # cached gcodes are not changed
+
+    def test_default_gcodes_subclass(self):
+        mode = type('G91Mode', (Mode,), {'default_mode': 'G91'})()
+        self.assertEqual([str(g) for g in mode.default_gcodes()], ['G91'])
+        self.assertEqual(NullMode().default_gcodes(), ())
+
+
+class MachineSnapshotTests(unittest.TestCase):
+    def test_restore(self):
+        m = Machine()
+        m.process_str('G1 X1 Y2 F100')
+        snap = m.snapshot()
+        (mode_str, pos) = (str(m.mode), m.pos)
+        m.process_str('G0 G91 X10 Z3')
+        self.assertNotEqual(str(m.mode), mode_str)
+        m.restore(snap)
+        self.assertEqual(str(m.mode), mode_str)
+        self.assertEqual(m.pos, pos)
+        self.assertIs(m.abs_range_max, snap.abs_range_max)
+
+    def test_shared(self):
+        m = Machine()
+        snap = m.snapshot()
+        self.assertIs(snap.abs_pos, m.abs_pos)
+        self.assertIs(snap.mode, m.mode.modal_groups)
+        m.process_str('G1 X1')
+        self.assertIsNot(snap.mode, m.mode.modal_groups)  # copied on change
+        self.assertIsNot(snap.abs_pos, m.abs_pos)  # copied on change
+
+    def test_shared_state(self):
+        # state's offsets are copied before they're given out (to be changed)
+        m = Machine()
+        snap = m.snapshot()
+        self.assertIs(snap.state['_offset'], m.state._offset)
+        m.state.offset.X = 5
+        m.state.coord_systems[1].offset.Y = 3
+        self.assertEqual(snap.state['_offset'], m.Position())
+        self.assertEqual(snap.state['_coord_systems'][1].offset, m.Position())
+        m.restore(snap)
+        self.assertEqual(m.state.offset, m.Position())
+        self.assertEqual(m.state.coord_systems[1].offset, m.Position())
+        m.state.offset.X = 1  # (restored offsets are copied too)
+        self.assertEqual(snap.state['_offset'], m.Position())
+
+    def test_copy(self):
+        m1 = Machine()
+        m1.process_str('G1 X1 Y2')
+        m2 = copy(m1)
+        m2.process_str('G0 X5')
+        self.assertEqual(m1.pos, m1.Position(X=1, Y=2))
+        self.assertEqual(m2.pos, m1.Position(X=5, Y=2))
+        self.assertNotEqual(str(m1.mode), str(m2.mode))
+        self.assertEqual(m2.state.cur_coord_sys, m1.state.cur_coord_sys)
+        # state & positions are not shared
+        m2.state.offset.X = 5
+        m2.state.coord_systems[1].offset.Y = 5
+        m2.abs_pos.Z = 5
+        self.assertEqual(m1.state.offset, m1.Position())
+        self.assertEqual(m1.state.coord_systems[1].offset, m1.Position())
+        self.assertEqual(m1.abs_pos, m1.Position(X=1, Y=2))
+
+    def test_move_in_place(self):
+        m = Machine()
+        abs_pos = m.abs_pos
+        m.process_str('G1 X1 Y2')
+        self.assertIs(m.abs_pos, abs_pos)
+        snap = m.snapshot()
+        m.process_str('G1 X-3 Z4')
+        self.assertEqual(snap.abs_pos, m.Position(X=1, Y=2))  # snapshot is unchanged
+        self.assertEqual(snap.abs_range_min, m.Position())
+        self.assertEqual(m.abs_range_min, m.Position(X=-3))
+        self.assertEqual(m.abs_range_max, m.Position(X=1, Y=2, Z=4))
+
+
+class MachineOffsetTests(unittest.TestCase):
+    def test_offsets_changed(self):
+        m = Machine()
+        m.process_str('G1 X1')
+        m.state.offset.X = 10
+        self.assertEqual(m.pos, m.Position(X=-9))  # (absolute X unchanged)
+        m.process_str('G1 Y1')
+        self.assertEqual(m.pos, m.Position(X=-9, Y=1))
+        m.process_str('G1 X2')
+        self.assertEqual(m.abs_pos, m.Position(X=12, Y=1))
+        # coordinate system's offset
+        m.state.coord_systems[2].offset.Y = 3
+        m.state.cur_coord_sys = 2
+        self.assertEqual(m.pos, m.Position(X=2, Y=-2))
+        self.assertEqual(m.work2abs(m.Position(X=2, Y=-2)), m.abs_pos)
+        # replaced offset
+        m.state.offset = m.Position()
+        self.assertEqual(m.abs2work(m.abs_pos), m.Position(X=12, Y=-2))
+        # changed by a reference kept from the state: cleared explicitly
+        offset = m.state.offset
+        self.assertEqual(m.pos, m.Position(X=12, Y=-2))
+        offset.X = 2
+        self.assertEqual(m.pos, m.Position(X=12, Y=-2))  # (cached)
+        m.offsets_changed()
+        self.assertEqual(m.pos, m.Position(X=10, Y=-2))
+
+    def test_coord_sys_selected(self):
+        # cached offset is cleared when a coordinate system is selected (eg: by G54-G59)
+        m = Machine()
+        m.state.coord_systems[2].offset.X = 5
+        self.assertEqual(m.pos, m.Position())
+        m.state.cur_coord_sys = 2
+        self.assertEqual(m.pos, m.Position(X=-5))
+        m.restore(Machine().snapshot())
+        self.assertEqual(m.pos, m.Position())
+
+
+class MachineCannedCycleTests(unittest.TestCase):
+    def test_dialect_neutral(self):
+        # processing a canned cycle imports no other dialect's gcodes
+        modules = set(sys.modules)
+        Machine().process_gcodes(GCodeCannedCycle(Word('G', 81), X=1, Y=2, Z=-1))
+        self.assertEqual(set(sys.modules) - modules, set())
+
 
+@unittest.skipIf(GCodeAbsoluteDistanceMode is None, "dialect does not support distance modes")
 class MachineGCodeProcessingTests(unittest.TestCase):
     def assert_processed_lines(self, line_data, machine):
         """
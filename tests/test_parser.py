@@ -0,0 +1,104 @@
+import io
+import os
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+# Add relative pygcode to path
+from testutils import add_pygcode_to_path, str_lines
+add_pygcode_to_path()
+
+# Units under test
+from pygcode import parse_file, parse_file_parallel
+from pygcode.parser import iter_file_lines
+
+
+FILE_CONTENT = b'; header\nG28\r\nG1 X1 Y2 ; move\n\nM104 S200'
+
+
+class IterFileLinesTests(unittest.TestCase):
+    def test_chunk_sizes(self):
+        expected = list(iter_file_lines(io.BytesIO(FILE_CONTENT), chunk_size=1024))
+        self.assertEqual([l for (o, l) in expected], FILE_CONTENT.split(b'\n'))
+        for chunk_size in range(1, 12):
+            self.assertEqual(
+                list(iter_file_lines(io.BytesIO(FILE_CONTENT), chunk_size=chunk_size)),
+                expected,
+            )
+
+    def test_long_line(self):
+        content = b'G1' + (b' X1' * 1000) + b'\nG28'
+        lines = list(iter_file_lines(io.BytesIO(content), chunk_size=5))
+        self.assertEqual(lines, [(0, content[:-4]), (len(content) - 3, b'G28')])
+
+    def test_offsets(self):
+        for (offset, line) in iter_file_lines(io.BytesIO(FILE_CONTENT), chunk_size=4):
+            self.assertEqual(FILE_CONTENT[offset:offset + len(line)], line)
+
+
+class ParseFileTests(unittest.TestCase):
+    def assert_lines(self, lines):
+        self.assertEqual([l.line_number for l in lines], [1, 2, 3, 4, 5])
+        self.assertEqual([l.byte_offset for l in lines], [0, 9, 14, 30, 31])
+        self.assertEqual(lines[0].comment.text, 'header')
+        self.assertEqual(lines[1].text, 'G28')
+        self.assertEqual(str(lines[2].block), 'G01 X1 Y2')
+        self.assertFalse(lines[3].block)
+        self.assertEqual(str(lines[4]), 'M104 S200')
+
+    def test_fileobj(self):
+        self.assert_lines(list(parse_file(io.BytesIO(FILE_CONTENT), chunk_size=7)))
+        self.assert_lines(list(parse_file(io.StringIO(FILE_CONTENT.decode()), chunk_size=7)))
+
+    def test_filename(self):
+        (fd, filename) = tempfile.mkstemp(suffix='.gcode')
+        try:
+            with os.fdopen(fd, 'wb') as fh:
+                fh.write(FILE_CONTENT)
+            self.assert_lines(list(parse_file(filename)))
+            with open(filename, 'r') as fh:  # text mode
+                self.assert_lines(list(parse_file(fh)))
+            with open(filename, 'r', newline='') as fh:  # already read from (text is buffered)
+                fh.readline()
+                lines = list(parse_file(fh, chunk_size=7))
+                self.assertEqual([str(l) for l in lines], ['G28', 'G01 X1 Y2 ; move', '', 'M104 S200'])
+        finally:
+            os.remove(filename)
+
+    def test_start(self):
+        expected = list(parse_file(io.BytesIO(FILE_CONTENT)))[2:]
+        lines = list(parse_file(io.BytesIO(FILE_CONTENT), line_number=3, byte_offset=14))
+        self.assertEqual([(l.line_number, l.byte_offset, str(l)) for l in lines],
+                         [(l.line_number, l.byte_offset, str(l)) for l in expected])
+
+    def test_lazy(self):
+        lines = list(parse_file(io.BytesIO(FILE_CONTENT), lazy=True))
+        self.assertIsNone(lines[2]._block)
+        self.assert_lines(lines)
+
+
+class ParseFileParallelTests(unittest.TestCase):
+    def assert_identical(self, lines, expected):
+        self.assertEqual(len(lines), len(expected))
+        for (line, expected_line) in zip(lines, expected):
+            self.assertEqual(line.line_number, expected_line.line_number)
+            self.assertEqual(line.byte_offset, expected_line.byte_offset)
+            self.assertEqual(str(line), str(expected_line))
+            self.assertEqual(line.block.words, expected_line.block.words)
+            self.assertEqual(line.block.gcodes, expected_line.block.gcodes)
+            self.assertEqual(line.block.modal_params, expected_line.block.modal_params)
+
+    def test_chunks(self):
+        content = FILE_CONTENT + b'\nG1 X3 Y4\nX5 Y6\n' * 5
+        expected = list(parse_file(io.BytesIO(content)))
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            for chunk_lines in (1, 2, 7, 100):
+                lines = list(parse_file_parallel(
+                    io.BytesIO(content), chunk_lines=chunk_lines, executor=executor, max_workers=2,
+                ))
+                self.assert_identical(lines, expected)
+
+    def test_processes(self):
+        expected = list(parse_file(io.BytesIO(FILE_CONTENT)))
+        lines = list(parse_file_parallel(io.BytesIO(FILE_CONTENT), chunk_lines=2, max_workers=2))
+        self.assert_identical(lines, expected)
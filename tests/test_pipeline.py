@@ -0,0 +1,190 @@
+import io
+import random
+import unittest
+
+# Add relative pygcode to path
+from testutils import add_pygcode_to_path, str_lines
+add_pygcode_to_path()
+
+# Units under test
+from pygcode import Line, Machine, parse_file
+from pygcode.pipeline import Pipeline, Stage, ProcessorStage, LinearizeArcs, ExpandCannedCycles
+from pygcode.pipeline import LinearMoves
+from pygcode.simplify import PolylineSimplifier, WordCompactor
+try:
+    from pygcode.gcodes import GCodeSelectXYPlane
+except ImportError:  # (dialect without planes)
+    GCodeSelectXYPlane = None
+
+
+def random_program(count=1000, seed=0):
+    rand = random.Random(seed)
+    lines = ['G90', 'M82', 'G92 E0']
+    for i in range(count):
+        if rand.random() < 0.05:
+            lines.append(rand.choice(['G92 E0', 'M83', 'M82', '; comment', 'G28', 'T1', 'G1 F3000']))
+        else:
+            lines.append('G1 X%.2f Y%.3f E%.3f' % (i * 0.1, rand.random() * 0.01, i * 0.01))
+    return lines
+
+
+class CountingMachine(Machine):
+    processed = 0
+
+    def process_block(self, block):
+        CountingMachine.processed += 1
+        super(CountingMachine, self).process_block(block)
+
+
+def assert_states(testcase, items):
+    # each line's state is that of a machine processing every line before it
+    machine = Machine()
+    for (line, state) in items:
+        testcase.assertEqual(state.pos, machine.pos, line.text)
+        if isinstance(line, LinearMoves):
+            for move in line.lines():
+                machine.process_block(move.block)
+            # (incremental moves' deltas are summed in another order)
+            end = state.new_machine(state.end)
+            for axis in 'XYZ':
+                testcase.assertAlmostEqual(getattr(end.pos, axis), getattr(machine.pos, axis), places=9)
+            machine = end
+            continue
+        if line.block:
+            machine.process_block(line.block)
+        testcase.assertEqual(state.new_machine(state.end).pos, machine.pos, line.text)
+
+
+class PipelineTests(unittest.TestCase):
+    def test_states(self):
+        lines = [Line(l) for l in ['G1 X1 Y2', '; comment', 'G1 X3', 'G1 Y1']]
+        pipeline = Pipeline()
+        items = list(pipeline.process(lines))
+        self.assertEqual([l for (l, s) in items], lines)
+        assert_states(self, items)
+        self.assertIs(items[1][1].start, items[1][1].end)  # (comment: nothing processed)
+        self.assertEqual((pipeline.machine.pos.X, pipeline.machine.pos.Y), (3, 1))
+
+    def test_stages(self):
+        class DropComments(Stage):
+            def process(self, line, state):
+                return [] if (line.comment and not line.block) else [(line, state)]
+
+        def numbered(items):
+            for (i, (line, state)) in enumerate(items):
+                line.line_number = i
+                yield (line, state)
+
+        pipeline = Pipeline([DropComments()]).add(numbered)
+        output = list(pipeline.process_lines(Line(l) for l in ['G1 X1', '; comment', 'G1 X2']))
+        self.assertEqual([(l.text, l.line_number) for l in output], [('G1 X1', 0), ('G1 X2', 1)])
+
+
+class ProcessorStageTests(unittest.TestCase):
+    def test_simplifier(self):
+        text = '\n'.join(random_program())
+        expected = [l.text for l in PolylineSimplifier().process_lines(parse_file(io.StringIO(text)))]
+        stage = ProcessorStage(PolylineSimplifier())
+        items = list(Pipeline([stage]).process(parse_file(io.StringIO(text))))
+        self.assertEqual([l.text for (l, s) in items], expected)
+        self.assertLess(len(items), 1000)
+        assert_states(self, items)
+        self.assertEqual(len(stage._pending), 0)
+
+    def test_chained(self):
+        lines = random_program()
+        expected = [l.text for l in WordCompactor().process_lines(
+            PolylineSimplifier().process_lines(Line(l) for l in lines)
+        )]
+        for keeps_state in (False, True):
+            items = list(Pipeline([
+                ProcessorStage(PolylineSimplifier()),
+                ProcessorStage(WordCompactor(), keeps_state=keeps_state),
+            ]).process(Line(l) for l in lines))
+            self.assertEqual([l.text for (l, s) in items], expected)
+            assert_states(self, items)
+
+    def test_processed_once(self):
+        # lines are processed by the pipeline's machine, and lines made by stages once
+        lines = [Line(l) for l in random_program()]
+        CountingMachine.processed = 0
+        output = list(Pipeline([
+            ProcessorStage(PolylineSimplifier()),
+            ProcessorStage(WordCompactor(), keeps_state=True),
+        ], machine=CountingMachine()).process_lines(lines))
+        made = [l for l in output if not any(l is l2 for l2 in lines)]
+        self.assertGreater(len(made), 0)
+        merged = [l for l in made if l.text.startswith('G01')]  # (by the simplifier, not the compactor)
+        self.assertEqual(CountingMachine.processed, len([l for l in lines if l.block]) + len(merged))
+
+    def test_processor_machine(self):
+        # processor's machine is restored to the pipeline's states (not processing lines)
+        processor = PolylineSimplifier(machine=CountingMachine())
+        CountingMachine.processed = 0
+        items = list(Pipeline([ProcessorStage(processor)]).process(Line(l) for l in random_program()))
+        self.assertEqual(CountingMachine.processed, 0)
+        self.assertNotIn('process_block', vars(processor.machine))
+        self.assertEqual(processor.machine.pos, items[-1][1].new_machine(items[-1][1].end).pos)
+
+
+@unittest.skipIf(GCodeSelectXYPlane is None, "dialect does not support arc linearizing")
+class TransformStageTests(unittest.TestCase):
+    def test_linearize_arcs(self):
+        items = list(Pipeline([LinearizeArcs(max_error=0.05)]).process(Line(l) for l in [
+            'G90 G17 G21', 'G0 X0 Y0', 'G1 F100 X1',
+            'G2 X3 Y2 I1 J1 (arc)', 'X1 Y0 I-1 J-1',
+        ]))
+        lines = [l.text for (l, s) in items]
+        arc = Line('G2 X3 Y2 I1 J1').block.gcodes[0]
+        self.assertEqual(lines[:4], ['G90 G17 G21', 'G0 X0 Y0', 'G1 F100 X1', '(linearized arc: %r)' % arc])
+        self.assertFalse(any(l.startswith('G2') for l in lines))
+        self.assertEqual(lines.count('(arc)'), 1)
+        assert_states(self, items)
+        last = items[-1][1]
+        end_pos = last.new_machine(last.end).pos
+        self.assertEqual((end_pos.X, end_pos.Y), (1, 0))
+
+    @unittest.skipIf(GCodeSelectXYPlane is None, "dialect does not support arc linearizing")
+    def test_linearize_arcs_batched(self):
+        program = [
+            'G90 G17 G21', 'G0 X0 Y0', 'G1 F100 X1',
+            'G2 X3 Y2 I1 J1', 'X1 Y0 I-1 J-1 (arc)', 'G0 Z1', 'G3 X1.5 Y0.5 Z0 R0.5',
+            'G91', 'G2 X2 Y2 I1 J1', 'G1 X1', 'G3 X-1 Y1 Z0.2 I0 J1', 'G90', 'G2 X0 Y0 R3',
+        ]
+        batched = list(Pipeline([LinearizeArcs(batch_size=2)]).process(Line(l) for l in program))
+        stepped = list(Pipeline([LinearizeArcs(batch_size=0)]).process(Line(l) for l in program))
+        assert_states(self, batched)
+
+        # each arc's moves are a single line
+        moves = [l for (l, s) in batched if isinstance(l, LinearMoves)]
+        self.assertEqual(len(moves), 6)
+        expanded = []
+        for (line, state) in batched:
+            expanded += line.lines() if isinstance(line, LinearMoves) else [line]
+        self.assertEqual(len(expanded), len(stepped))
+        for (line, (stepped_line, state)) in zip(expanded, stepped):
+            self.assertEqual([g.word for g in line.block.gcodes], [g.word for g in stepped_line.block.gcodes])
+            for (gcode, stepped_gcode) in zip(line.block.gcodes, stepped_line.block.gcodes):
+                self.assertEqual(sorted(gcode.params), sorted(stepped_gcode.params))
+                for letter in gcode.params:
+                    self.assertAlmostEqual(gcode.params[letter].value, stepped_gcode.params[letter].value, places=9)
+        end = (batched[-1][1].new_machine(batched[-1][1].end).pos, stepped[-1][1].new_machine(stepped[-1][1].end).pos)
+        for axis in 'XYZ':
+            self.assertAlmostEqual(getattr(end[0], axis), getattr(end[1], axis), places=9)
+
+        # written as the moves' coordinates
+        text = str(moves[0]).splitlines()
+        self.assertEqual(text[0], 'G1 X%.3f Y%.3f Z%.3f' % tuple(v[0] for (l, v) in moves[0].columns))
+        self.assertEqual(text[-1], '   X3.000 Y2.000 Z0.000')
+        self.assertEqual(len(text), len(moves[0].lines()))
+
+    def test_expand_canned_cycles(self):
+        items = list(Pipeline([ExpandCannedCycles(comments=False)]).process(Line(l) for l in [
+            'G90 G17 G21', 'G0 X0 Y0 Z5', 'G81 X5 Y5 Z-2 R1', 'G1 X0 Y0',
+        ]))
+        self.assertEqual([l.text.strip() for (l, s) in items], [
+            'G90 G17 G21', 'G0 X0 Y0 Z5',
+            'G0 X5 Y5', 'Z1', 'G1 Z-2', 'G0 Z5.',
+            'G1 X0 Y0',
+        ])
+        assert_states(self, items)
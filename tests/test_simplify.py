@@ -0,0 +1,155 @@
+import io
+import random
+import unittest
+
+# Add relative pygcode to path
+from testutils import add_pygcode_to_path, str_lines
+add_pygcode_to_path()
+
+# Units under test
+from pygcode import Line, Machine, Toolpath, parse_file
+from pygcode.simplify import PolylineSimplifier, simplify_polylines
+from pygcode.simplify import WordCompactor, compact_lines
+from pygcode.simplify import segment_distance, simplified_vertices
+
+
+def simplified(text, **kwargs):
+    return [l.text for l in simplify_polylines(parse_file(io.StringIO(text)), **kwargs)]
+
+
+class SimplifiedVerticesTests(unittest.TestCase):
+    def test_segment_distance(self):
+        self.assertAlmostEqual(segment_distance((1, 1), (0, 0), (2, 0)), 1)
+        self.assertAlmostEqual(segment_distance((3, 0), (0, 0), (2, 0)), 1)  # (beyond end)
+        self.assertAlmostEqual(segment_distance((1, 1, 1), (1, 1, 1), (1, 1, 1)), 0)
+
+    def test_vertices(self):
+        points = [(0, 0), (1, 0.001), (2, 0), (3, 1), (4, 2), (5, 2)]
+        self.assertEqual(simplified_vertices(points, 0.01), [0, 2, 4, 5])
+        self.assertEqual(simplified_vertices(points, 10), [0, 5])
+        self.assertEqual(simplified_vertices(points[:2], 10), [0, 1])
+
+
+class PolylineSimplifierTests(unittest.TestCase):
+    def test_collinear(self):
+        self.assertEqual(simplified('\n'.join([
+            'G90', 'M82', 'G92 E0', 'G0 X0 Y0',
+            'G1 X1 Y0.001 E0.1 F1200', 'G1 X2 Y0 E0.2', 'G1 X3 Y-0.001 E0.3', 'G1 X4 Y0 E0.4',
+            'G1 X4 Y1 E0.5',
+        ])), [
+            'G90', 'M82', 'G92 E0', 'G0 X0 Y0',
+            'G01 X4 Y0 E0.4 F1200',
+            'G1 X4 Y1 E0.5',
+        ])
+
+    def test_relative_extrusion(self):
+        self.assertEqual(simplified('\n'.join([
+            'M83', 'G1 X1 E0.1', 'G1 X2 E0.1', 'G1 X3 E0.1',
+        ])), ['M83', 'G01 X3 E0.3'])
+
+    def test_boundaries(self):
+        self.assertEqual(simplified('\n'.join([
+            'G1 X1', 'G1 X2', 'G1 X3 ; comment', 'G1 X4', 'M106 S255', 'G1 X5',
+            'G1 X6 F300', 'G1 X7',  # (feed rate change)
+            'G1 X8 E1', 'G1 X9 E2',  # (extruding)
+            'G1 X10 E1.5', 'G1 X11 E1',  # (retracting)
+        ])), [
+            'G01 X2', 'G1 X3 ; comment', 'G1 X4', 'M106 S255', 'G1 X5',
+            'G01 X7 F300', 'G01 X9 E2', 'G01 X11 E1',
+        ])
+
+    def test_uneven_extrusion(self):
+        self.assertEqual(simplified('\n'.join([
+            'M83', 'G1 X1 E0.1', 'G1 X2 E0.1', 'G1 X3 E0.3', 'G1 X4 E0.3',
+        ])), ['M83', 'G01 X2 E0.2', 'G01 X4 E0.6'])
+
+    def test_removed(self):
+        simplifier = PolylineSimplifier(tolerance=0.1)
+        lines = ['G1 X%i Y%g' % (i, (i % 2) * 0.05) for i in range(101)]
+        output = list(simplifier.process_lines(Line(l) for l in lines))
+        self.assertEqual(len(output), 1)
+        self.assertEqual(simplifier.removed, 100)
+
+    def test_deviation(self):
+        # every original vertex is within tolerance of the simplified path
+        rand = random.Random(0)
+        lines = ['G1 X%.3f Y%.3f' % (i, rand.random() * 0.1) for i in range(300)]
+        output = simplified('\n'.join(lines), tolerance=0.05)
+        self.assertLess(len(output), len(lines))
+
+        machine = Machine()
+        path = [(0., 0.)]
+        for line in output:
+            machine.process_block(Line(line).block)
+            path.append((machine.pos.X, machine.pos.Y))
+        for line in lines:
+            machine.process_block(Line(line).block)
+            point = (machine.pos.X, machine.pos.Y)
+            self.assertLessEqual(min(
+                segment_distance(point, start, end) for (start, end) in zip(path[:-1], path[1:])
+            ), 0.05 + 1e-3)
+
+
+def compacted(text, **kwargs):
+    return [l.text for l in compact_lines(parse_file(io.StringIO(text)), **kwargs)]
+
+
+class WordCompactorTests(unittest.TestCase):
+    def test_compact(self):
+        self.assertEqual(compacted('\n'.join([
+            'G90', 'M82', 'G92 E0',
+            'G1 X10 Y10 Z0.2 F1200',
+            'G1 X20 Y10 Z0.2 E1.25 F1200 ; comment',
+            'G1  X20 Y20 Z0.2 E1.25',
+            'G1 X20.0 Y20.000 E1.25',  # (keeps a coordinate)
+            'T0', 'T0',
+            'G1 F1200', 'G1 F1200 ; comment', 'G0 F1200',
+            'M83', 'G1 X21 E0',
+        ])), [
+            'G90', 'M82', 'G92 E0',
+            'G1 X10 Y10 Z0.2 F1200',
+            'G1 X20 E1.25 ; comment',
+            'G1 Y20',
+            'G1 X20.0',
+            'T0',  # (repeated T0, and G1 repeating the motion mode: removed)
+            '; comment',
+            'G0',
+            'M83', 'G1 X21',
+        ])
+
+    def test_unknown_position(self):
+        # coordinates aren't removed until given, or after homing
+        self.assertEqual(compacted('\n'.join([
+            'G1 X0 Y0', 'G1 X0 Y0', 'G28', 'G1 X0 Y0 F100',
+        ])), ['G1 X0 Y0', 'G1 X0', 'G28', 'G1 X0 Y0 F100'])
+
+    def test_relative(self):
+        # (G91 isn't applied by every dialect's machine: coordinates are kept)
+        self.assertEqual(compacted('\n'.join([
+            'G1 X5 Y5', 'G91', 'G1 X5 Y0', 'G90', 'G1 X5 Y5', 'G1 X5 Y5',
+        ])), ['G1 X5 Y5', 'G91', 'G1 X5 Y0', 'G90', 'G1 X5 Y5', 'G1 X5'])
+
+    def test_toolpath(self):
+        # simulated toolpath is the same
+        rand = random.Random(0)
+        lines = []
+        for i in range(2000):
+            r = rand.random()
+            if r < 0.1:
+                lines.append(rand.choice(['G92 E0', 'M82', 'M83', 'T0', 'T1', 'G28']))
+            else:
+                lines.append('G%i X%i Y%i Z%i E%i F%i' % (
+                    rand.choice([0, 1]), rand.randint(0, 2), rand.randint(0, 2), rand.randint(0, 1),
+                    rand.randint(0, 1), rand.choice([1200, 1200, 3000]),
+                ))
+        compactor = WordCompactor()
+        output = list(compactor.process_lines(Line(l) for l in lines))
+        self.assertGreater(compactor.removed, 2000)
+        self.assertLess(sum(len(l.text) for l in output), sum(len(l) for l in lines) * 0.8)
+
+        (toolpath, compacted_toolpath) = (Toolpath(), Toolpath())
+        toolpath.process_lines(Line(l) for l in lines)
+        compacted_toolpath.process_lines(output)
+        for name in toolpath.columns:
+            if name != 'line_number':
+                self.assertEqual(list(toolpath[name]), list(compacted_toolpath[name]), name)
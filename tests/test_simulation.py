@@ -0,0 +1,116 @@
+import io
+import random
+import unittest
+
+# Add relative pygcode to path
+from testutils import add_pygcode_to_path, str_lines
+add_pygcode_to_path()
+
+# Units under test
+from pygcode import Machine, Line, Simulation, parse_file
+from pygcode.gcodes import MODAL_GROUP_MAP
+from pygcode.machine import GCodeIncrementalDistanceMode, POSITION_AXES
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+PROGRAM = b'''G90
+G92 E0
+G0 F9000 X10 Y10 Z0.2
+G1 F1200 X20 E1.5
+Y30
+G1 E-1 F2100 ; retract
+G0 X-5 Z1
+M104 S200
+'''
+
+
+def random_lines(count, seed=0):
+    rand = random.Random(seed)
+    lines = []
+    for i in range(count):
+        r = rand.random()
+        if r < 0.1:
+            lines.append(rand.choice(['G90', 'G92 E0', 'G28', 'M82', 'M83', 'G4 P1']))
+        elif r < 0.3:
+            lines.append('X%i Y%i' % (rand.randint(-9, 9), rand.randint(-9, 9)))
+        else:
+            lines.append('G%i X%i Z%.1f E1' % (rand.choice([0, 1]), rand.randint(-9, 9), rand.random()))
+    return [Line(l) for l in lines]
+
+
+@unittest.skipIf(numpy is None, "numpy not installed")
+class SimulationTests(unittest.TestCase):
+    def assert_machines_equal(self, m1, m2):
+        # (summed in a different order, so only close)
+        for attr in ('abs_pos', 'abs_range_min', 'abs_range_max'):
+            self.assertTrue(numpy.allclose(getattr(m1, attr).array, getattr(m2, attr).array))
+        self.assertEqual(str(m1.mode), str(m2.mode))
+
+    def test_program(self):
+        sim = Simulation()
+        sim.process_lines(parse_file(io.BytesIO(PROGRAM)))
+        self.assertEqual(len(sim), 5)
+        (line_numbers, positions) = sim.block_positions()
+        self.assertEqual(list(line_numbers), [3, 4, 5, 6, 7])
+        self.assertEqual(positions[:, :3].tolist(), [
+            [10, 10, 0.2], [20, 10, 0.2], [20, 30, 0.2], [20, 30, 0.2], [-5, 30, 1],
+        ])
+        (low, high) = sim.bounds()
+        self.assertEqual((low.X, low.Y, low.Z), (-5, 0, 0))
+        self.assertEqual((high.X, high.Y, high.Z), (20, 30, 1))
+        self.assertAlmostEqual(sim.travel(axes='XY'), (200 ** 0.5) + 10 + 20 + 25)
+
+    def test_on_move(self):
+        # machine's on_move is called for every move (so they're not batched)
+        machine = Machine()
+        seen = []
+        machine.on_move = lambda m: seen.append(m.pos.X)
+        sim = Simulation(machine)
+        sim.process_lines(parse_file(io.BytesIO(PROGRAM)))
+        self.assertEqual(seen, [10, 20, 20, 20, -5])
+        self.assertEqual(list(sim.positions[:, 0]), seen)
+        self.assertNotIn('_move', vars(machine))
+        self.assertFalse(sim.toolpath._pending)
+
+    def test_lazy(self):
+        # plain linear moves are batched without being parsed
+        lines = [Line(l, lazy=True) for l in ['G1 X1 F100', 'Y2 E0.1', 'G0 Z3', 'M104 S200', 'G4 P1']]
+        sim = Simulation()
+        sim.process_lines(lines)
+        self.assertEqual([l.block._gcodes is None for l in lines], [True, True, True, False, False])
+        self.assertEqual(sim.positions[:, :3].tolist(), [[1, 0, 0], [1, 2, 0], [1, 2, 3]])
+        self.assertEqual(sim.machine.mode.motion.word, Line('G0').block.gcodes[0].word)
+
+    def test_machine(self):
+        lines = random_lines(2000)
+        machine = Machine()
+        for line in lines:
+            machine.process_block(line.block)
+        sim = Simulation()
+        sim.process_lines(lines)
+        self.assert_machines_equal(sim.machine, machine)
+
+    def test_incremental(self):
+        # compared to Machine, for each motion, with distance mode & offsets changed between chunks
+        incremental = GCodeIncrementalDistanceMode()
+        machine = Machine()
+        sim = Simulation()
+        expected = []
+        for (i, lines) in enumerate(random_lines(100, seed=s) for s in range(10)):
+            for m in (machine, sim.machine):
+                m.mode._set_modal_group(MODAL_GROUP_MAP['distance'], incremental if (i % 2) else None)
+                m.state.offset = m.Position(X=i, Y=-i)
+                m.offsets_changed()
+            for line in lines:
+                machine.process_block(line.block)
+                if any(g.word.letter == 'G' and g.word.value in (0, 1) for g in line.block.gcodes) or \
+                        line.block.modal_params:
+                    expected.append(list(machine.abs_pos._value))
+            sim.process_lines(lines)
+        self.assertEqual(len(sim), len(expected))
+        self.assertTrue(numpy.allclose(sim.positions, numpy.array(expected)))
+        self.assert_machines_equal(sim.machine, machine)
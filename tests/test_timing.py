@@ -0,0 +1,99 @@
+import io
+import unittest
+
+# Add relative pygcode to path
+from testutils import add_pygcode_to_path, str_lines
+add_pygcode_to_path()
+
+# Units under test
+from pygcode import TimeEstimator, MotionLimits, Line, parse_file
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+def estimator(text, **kwargs):
+    e = TimeEstimator(**kwargs)
+    e.process_lines(parse_file(io.StringIO(text)))
+    return e
+
+
+class MotionLimitsTests(unittest.TestCase):
+    def test_update(self):
+        limits = MotionLimits()
+        for text in ['M201 X500 Y600', 'M203 Z10', 'M204 P1000 R2000 T3000', 'M205 X8 J0', 'G1 X1']:
+            limits.update(Line(text).block.gcodes[0])
+        self.assertEqual(limits.max_acceleration, {'X': 500, 'Y': 600, 'Z': 100, 'E': 10000})
+        self.assertEqual(limits.max_feed_rate['Z'], 10)
+        self.assertEqual(
+            (limits.acceleration, limits.retract_acceleration, limits.travel_acceleration),
+            (1000, 2000, 3000),
+        )
+        self.assertEqual(limits.jerk['X'], 8)
+        self.assertIsNone(limits.junction_deviation)
+        limits.update(Line('M204 S500').block.gcodes[0])
+        self.assertEqual((limits.acceleration, limits.travel_acceleration), (500, 500))
+
+    def test_kwargs(self):
+        self.assertEqual(MotionLimits(acceleration=100).acceleration, 100)
+        self.assertRaises(AttributeError, MotionLimits, bad_limit=1)
+
+
+@unittest.skipIf(numpy is None, "numpy not installed")
+class TimeEstimatorTests(unittest.TestCase):
+    def test_trapezoid(self):
+        # 100mm at 100mm/s, accelerating at 1000mm/s/s: 0.1s to accelerate (& decelerate) over 5mm
+        e = estimator('M204 S1000\nG1 X100 F6000\n')
+        self.assertAlmostEqual(e.total_time(), 0.1 + 0.9 + 0.1)
+        # triangular: 1mm, never reaching feed rate
+        e = estimator('M204 S1000\nG1 X1 F6000\n')
+        self.assertAlmostEqual(e.total_time(), 2 * (1. / 1000) ** 0.5)
+
+    def test_default_feed_rate(self):
+        # until a feed rate is given: 10mm at 25mm/s (accelerating at 3000mm/s/s)
+        self.assertAlmostEqual(estimator('G1 X10\n').total_time(), (10. / 25) + (25. / 3000))
+        e = estimator('G1 X10\n', limits=MotionLimits(default_feed_rate=10))
+        self.assertAlmostEqual(e.total_time(), (10. / 10) + (10. / 3000))
+
+    def test_lookahead(self):
+        # straight segments: no slowing down between them
+        e = estimator('M204 S1000\nG1 X100 F6000\nX200\nX300\n')
+        self.assertAlmostEqual(e.total_time(), 0.1 + 2.9 + 0.1)
+        # many tiny segments: speed carried over, like a single move
+        e = estimator('M204 S1000\nG1 F6000\n' + ''.join('X%g\n' % (x * 0.5) for x in range(1, 201)))
+        self.assertAlmostEqual(e.total_time(), 1.1)
+
+    def test_junctions(self):
+        program = 'M204 S1000\nG1 X100 F6000\nY100\n'
+        straight = 2.0 + 0.1
+        stopped = 2.2
+        jd = estimator(program).total_time()  # junction deviation
+        self.assertTrue(straight < jd < stopped)
+        jerk = estimator('M205 J0 X10 Y10\n' + program).total_time()  # classic jerk (10mm/s at the corner)
+        self.assertAlmostEqual(jerk, stopped - 2 * (0.01 - 0.0005))
+        reversed_ = estimator('M204 S1000\nG1 X100 F6000\nX0\n').total_time()
+        self.assertAlmostEqual(reversed_, stopped)
+
+    def test_axis_limits(self):
+        # Z limited to 5mm/s, & 100mm/s/s
+        e = estimator('G1 Z10 F6000\n')
+        self.assertAlmostEqual(e.total_time(), 0.05 + 1.95 + 0.05)
+        e = estimator('M203 Z10\nM201 Z1000\nG1 Z10 F6000\n')
+        self.assertAlmostEqual(e.total_time(), 0.01 + 0.99 + 0.01)
+
+    def test_waits(self):
+        e = estimator('G4 P500\nG4 S2\n')
+        self.assertAlmostEqual(e.total_time(), 2.5)
+        # hotend heats while waiting for the bed
+        e = estimator('M140 S60\nM104 S210\nM190 S60\nM109 S210\n', heating_rates={'hotend': 2., 'bed': 0.5})
+        self.assertAlmostEqual(e.total_time(), 70 + (185 - 140) / 2.)
+        # machine stops for waits
+        e = estimator('M204 S1000\nG1 X100 F6000\nG4 P0\nX200\n')
+        self.assertAlmostEqual(e.total_time(), 2.2)
+
+    def test_segment_times(self):
+        e = estimator('M204 S1000 R1000\nG1 F6000\nG1 X100 E1\nG1 E2 F1500\n')
+        self.assertEqual(len(e.segment_times()), len(e.toolpath))
+        self.assertAlmostEqual(e.segment_times()[-1], 0.025 + 0.015 + 0.025)  # 1mm at 25mm/s
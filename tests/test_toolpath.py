@@ -0,0 +1,106 @@
+import io
+import random
+import unittest
+
+# Add relative pygcode to path
+from testutils import add_pygcode_to_path, str_lines
+add_pygcode_to_path()
+
+# Units under test
+from pygcode import Toolpath, Line, parse_file
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+PROGRAM = b'''G90
+M82
+G92 E0
+G0 F9000 X10 Y10 Z0.2
+G1 F1200 X20 E1.5 ; extrude
+G1 E-1 F2100 ; retract
+M83
+G1 X30 E0.5
+G92 E0
+M104 S200
+'''
+
+
+class ToolpathTests(unittest.TestCase):
+    def setUp(self):
+        self.toolpath = Toolpath()
+        self.toolpath.process_lines(parse_file(io.BytesIO(PROGRAM)))
+
+    def test_rows(self):
+        tp = self.toolpath
+        self.assertEqual(len(tp), 4)
+        self.assertEqual(list(tp['line_number']), [4, 5, 6, 8])
+        self.assertEqual(list(tp['motion']), [0, 1, 1, 1])
+        self.assertEqual(list(tp['feed_rate']), [9000, 1200, 2100, 2100])
+        self.assertEqual(list(tp['start_x']), [0, 10, 20, 20])
+        self.assertEqual(list(tp['end_x']), [10, 20, 20, 30])
+        self.assertEqual(list(tp['end_z']), [0.2] * 4)
+
+    def test_extruder(self):
+        tp = self.toolpath
+        self.assertEqual(list(tp['start_e']), [0, 0, 1.5, -1])
+        self.assertEqual(list(tp['end_e']), [0, 1.5, -1, -0.5])  # (relative after M83)
+        self.assertEqual(tp.e, 0)  # G92 E0
+
+    @unittest.skipIf(numpy is None, "numpy not installed")
+    def test_arrays(self):
+        arrays = self.toolpath.arrays(copy=True)
+        extruded = arrays['end_e'] - arrays['start_e']
+        self.assertEqual(list(extruded > 0), [False, True, False, True])
+        self.assertEqual(arrays['line_number'].sum(), 4 + 5 + 6 + 8)
+
+
+def random_program(count, seed=0):
+    rand = random.Random(seed)
+    lines = []
+    for i in range(count):
+        r = rand.random()
+        if r < 0.1:
+            lines.append(rand.choice(['G90', 'G91', 'G92 E0', 'M82', 'M83', 'M104 S200', 'G4 P1', 'G1']))
+        elif r < 0.4:
+            lines.append('X%.2f Y%i E%.3f' % (rand.uniform(-9, 9), rand.randint(-9, 9), rand.random()))
+        else:
+            lines.append('G%i X%i Z%.1f E1 F%i' % (rand.choice([0, 1]), rand.randint(-9, 9), rand.random(), rand.randint(100, 5000)))
+    return lines
+
+
+@unittest.skipIf(numpy is None, "numpy not installed")
+class ToolpathBatchTests(unittest.TestCase):
+    def new_toolpath(self, batch):
+        toolpath = Toolpath(batch=batch)
+        state = toolpath.machine.state
+        state.offset = toolpath.machine.Position(X=0.5, Y=-1)
+        toolpath.machine.offsets_changed()
+        return toolpath
+
+    def test_same(self):
+        # batched moves are recorded exactly as they're processed by the machine
+        lines = random_program(2000)
+        expected = self.new_toolpath(batch=False)
+        expected.process_lines(Line(l) for l in lines)
+        for lazy in (False, True):
+            toolpath = self.new_toolpath(batch=True)
+            toolpath.process_lines(Line(l, lazy=lazy) for l in lines)
+            self.assertEqual(len(toolpath), len(expected))
+            for name in expected.columns:
+                self.assertEqual(list(toolpath[name]), list(expected[name]), name)
+            for attr in ('abs_pos', 'abs_range_min', 'abs_range_max'):
+                self.assertEqual(getattr(toolpath.machine, attr), getattr(expected.machine, attr))
+            self.assertEqual(str(toolpath.machine.mode), str(expected.machine.mode))
+            self.assertEqual((toolpath.e, toolpath.feed_rate), (expected.e, expected.feed_rate))
+
+    def test_flush(self):
+        toolpath = Toolpath()
+        toolpath.process_block(Line('G1 X10 F100').block)
+        self.assertEqual(len(toolpath), 1)
+        self.assertEqual(toolpath.machine.abs_pos.X, 0)  # (not yet processed by the machine)
+        self.assertEqual(list(toolpath['end_x']), [10])
+        self.assertEqual(toolpath.machine.abs_pos.X, 10)
+        self.assertEqual(toolpath.machine.mode.motion.word, Line('G1').block.gcodes[0].word)
@@ -0,0 +1,103 @@
+import unittest
+from math import pi
+
+# Add relative pygcode to path
+from testutils import add_pygcode_to_path, str_lines
+add_pygcode_to_path()
+
+# Units under test
+from pygcode import Position
+from pygcode import transform
+try:
+    from pygcode.gcodes import GCodeArcMoveCW, GCodeArcMoveCCW
+    from pygcode.gcodes import GCodeSelectXYPlane, GCodeSelectYZPlane, GCodeSelectZXPlane
+    from pygcode.gcodes import GCodeIncrementalDistanceMode
+except ImportError:  # (dialect without planes)
+    GCodeArcMoveCW = None
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+METHODS = ('ArcLinearizeInside', 'ArcLinearizeOutside', 'ArcLinearizeMid')
+
+
+@unittest.skipIf(GCodeArcMoveCW is None, "dialect does not support arc linearizing")
+@unittest.skipIf(numpy is None, "numpy not installed")
+class ArcLinearizeTests(unittest.TestCase):
+
+    def linearized(self, arc_gcode, start_pos, vectorized=True, **kwargs):
+        if vectorized:
+            return [str(g) for g in transform.linearize_arc(arc_gcode, start_pos, **kwargs)]
+        vertices = transform.ArcLinearizeMethod.vertices
+        def no_numpy(self):
+            raise ImportError()
+        transform.ArcLinearizeMethod.vertices = no_numpy
+        try:
+            return [str(g) for g in transform.linearize_arc(arc_gcode, start_pos, **kwargs)]
+        finally:
+            transform.ArcLinearizeMethod.vertices = vertices
+
+    def test_vertices(self):
+        start = Position(X=1, Y=2, Z=3)
+        for plane in (GCodeSelectXYPlane(), GCodeSelectYZPlane(), GCodeSelectZXPlane()):
+            # 3/4 of a circle (in plane), helical: 1 along the plane's normal
+            (a1, a2) = {'Z': 'XY', 'X': 'YZ', 'Y': 'ZX'}[plane.normal_axis]
+            params = {
+                a1: getattr(start, a1) + 2, a2: getattr(start, a2) + 2,
+                plane.normal_axis: getattr(start, plane.normal_axis) + 1,
+                'IJK'['XYZ'.index(a1)]: 2, 'IJK'['XYZ'.index(a2)]: 0,
+            }
+            for arc_gcode in (GCodeArcMoveCW(**params), GCodeArcMoveCCW(**params)):
+                for method_name in METHODS:
+                    kwargs = {'plane': plane, 'method_class': getattr(transform, method_name), 'max_error': 0.05}
+                    for dist_mode in (None, GCodeIncrementalDistanceMode()):
+                        kwargs['dist_mode'] = dist_mode
+                        self.assertEqual(
+                            self.linearized(arc_gcode, start, **kwargs),
+                            self.linearized(arc_gcode, start, vectorized=False, **kwargs),
+                        )
+
+
+    def test_arc_moves(self):
+        # many arcs at once: as linearize_arc() yields them
+        start = Position(X=1, Y=2, Z=3)
+        (methods, starts, incremental, expected) = ([], [], [], [])
+        for arc_gcode in (GCodeArcMoveCW(X=3, Y=4, Z=4, I=2, J=0), GCodeArcMoveCCW(X=0, Y=1, R=2)):
+            for method_name in METHODS:
+                for dist_mode in (None, GCodeIncrementalDistanceMode()):
+                    kwargs = {'method_class': getattr(transform, method_name), 'max_error': 0.05, 'dist_mode': dist_mode}
+                    methods.append(transform.linearize_arc_method(arc_gcode, start, **kwargs))
+                    starts.append(start.vector.xyz)
+                    incremental.append(dist_mode is not None)
+                    expected.append([
+                        [g.X, g.Y, g.Z] for g in transform.linearize_arc(arc_gcode, start, **kwargs)
+                    ])
+        for (moves, expected_moves) in zip(transform.arc_moves(methods, starts, incremental), expected):
+            self.assertTrue(numpy.allclose(moves, expected_moves, rtol=0, atol=1e-9))
+
+
+@unittest.skipIf(numpy is None, "numpy not installed")
+class ArcVerticesTests(unittest.TestCase):
+    def test_arc_vertices(self):
+        # many arcs at once: as they are individually
+        Vector3 = transform.Vector3
+        normal = Vector3(0, 0, 1)  # (X/Y plane)
+        methods = [
+            getattr(transform, method_name)(
+                max_error=0.01, plane_normal=normal,
+                arc_p_start=start, arc_p_end=end, arc_p_center=Vector3(0, 0, 0),
+                arc_radius=1., arc_angle=angle,
+                helical_start=Vector3(0, 0, 0), helical_end=normal * z,
+            )
+            for method_name in METHODS
+            for (start, end, angle, z) in [
+                (Vector3(1, 0, 0), Vector3(0, 1, 0), -0.5 * pi, 0.),
+                (Vector3(0, 1, 0), Vector3(1, 0, 0), 1.5 * pi, 2.),  # (helical)
+            ]
+        ]
+        for (method, vertices) in zip(methods, transform.arc_vertices(methods)):
+            expected = [list(l_end.xyz) for (l_start, l_end) in method.iter_vertices()]
+            self.assertTrue(numpy.allclose(vertices, expected))
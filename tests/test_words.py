@@ -1,4 +1,6 @@
 import unittest
+import pickle
+from copy import copy, deepcopy
 
 # Add relative pygcode to path
 from testutils import add_pygcode_to_path, str_lines
@@ -7,6 +9,7 @@ add_pygcode_to_path()
 # Units under test
 from pygcode import words
 from pygcode import dialects
+from pygcode.exceptions import GCodeWordStrError
 
 
 class WordIterTests(unittest.TestCase):
@@ -34,6 +37,80 @@ class WordIterTests(unittest.TestCase):
         self.assertEqual([w[5].letter, w[5].value], ['F', 70])
 
 
+    def test_iter_lowercase(self):
+        w = list(words.text2words('g1x-1.5 y2'))
+        self.assertEqual(w, [words.Word('G', 1), words.Word('X', -1.5), words.Word('Y', 2)])
+
+    def test_iter_invalid_value(self):
+        with self.assertRaises(GCodeWordStrError):
+            list(words.text2words('G1 X'))
+        with self.assertRaises(GCodeWordStrError):
+            list(words.text2words('G1 X1 Y2 ?'))
+
+    def test_tokens_and_words(self):
+        # words are made from the tokenizer's tokens (with the same errors)
+        tokenizer = words.dialect_tokenizer()
+        block_str = 'G1 X-1.5 y2 F100'
+        self.assertEqual(
+            [(w.letter, w.value) for w in tokenizer.iter_words(block_str)],
+            [(l, words.Word(l, v).value) for (l, v) in tokenizer.iter_tokens(block_str)],
+        )
+        for block_str in ('G1 X', 'G1 X1 Y2 ?'):
+            for method in (tokenizer.iter_tokens, tokenizer.iter_words):
+                with self.assertRaises(GCodeWordStrError):
+                    list(method(block_str))
+
+    def test_tokenizer_cached(self):
+        self.assertIs(words.dialect_tokenizer(), words.dialect_tokenizer())
+
+
+class WordTypeTests(unittest.TestCase):
+    def test_word_type_shared(self):
+        (w1, w2) = (words.Word('X', 1), words.Word('x', 2))
+        self.assertIs(w1._word_type, w2._word_type)
+        self.assertIs(w1._word_type, words.dialect_word_map()['X'])
+
+    def test_description(self):
+        w = words.Word('X', 1)
+        self.assertEqual(w.description, "X: %s" % words.dialect_word_map()['X'].description)
+        self.assertEqual(w.value_str, words.dialect_word_map()['X'].clean_value(1.0))
+
+
+class WordSlotsTests(unittest.TestCase):
+    def test_no_dict(self):
+        for w in [words.Word('X', 1), words.intern_word('G', 1)]:
+            self.assertFalse(hasattr(w, '__dict__'))
+            with self.assertRaises(AttributeError):
+                w.foo = 1
+
+
+class InternedWordTests(unittest.TestCase):
+    def test_shared(self):
+        (w1, w2) = (list(words.text2words('G1 X1'))[0], list(words.text2words('g01 X2'))[0])
+        self.assertIs(w1, w2)
+        self.assertIsInstance(w1, words.FrozenWord)
+        self.assertIs(words.intern_word('G', 1), w1)
+        self.assertEqual(w1, words.Word('G', 1))
+        self.assertEqual(hash(w1), hash(words.Word('G', 1)))
+
+    def test_params_not_interned(self):
+        (w,) = words.text2words('X1')
+        self.assertNotIsInstance(w, words.FrozenWord)
+        (w,) = words.text2words('G1', intern_words=False)
+        self.assertNotIsInstance(w, words.FrozenWord)
+
+    def test_immutable(self):
+        w = words.intern_word('M', 104)
+        with self.assertRaises(AttributeError):
+            w.value = 109
+        w2 = copy(w)
+        self.assertNotIsInstance(w2, words.FrozenWord)
+        w2.value = 109
+        self.assertEqual(w, words.Word('M', 104))
+        self.assertIs(deepcopy(w), w)
+        self.assertIs(pickle.loads(pickle.dumps(w)), w)
+
+
 class WordValueMatchTest(unittest.TestCase):
     def regex_assertions(self, regex, positive_list, negative_list):
         # Assert all elements of positive_list match regex
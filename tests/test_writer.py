@@ -0,0 +1,144 @@
+import io
+import random
+import unittest
+
+# Add relative pygcode to path
+from testutils import add_pygcode_to_path, str_lines
+add_pygcode_to_path()
+
+# Units under test
+from pygcode import GCodeWriter, Line, Word, parse_file
+from pygcode.writer import number_formatter
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+def written(objs, method='write_lines', **kwargs):
+    fileobj = io.StringIO()
+    with GCodeWriter(fileobj, **kwargs) as writer:
+        getattr(writer, method)(objs)
+    return fileobj.getvalue()
+
+
+class NumberFormatterTests(unittest.TestCase):
+    def test_format(self):
+        format_number = number_formatter(3)
+        self.assertEqual(format_number(1.5), '1.5')
+        self.assertEqual(format_number(10.0), '10')
+        self.assertEqual(format_number(1.23456), '1.235')
+        self.assertEqual(format_number(-0.0001), '0')
+        self.assertEqual(format_number(0.00001), '0')  # (not scientific)
+        self.assertEqual(format_number(123456.7), '123456.7')
+        self.assertEqual(number_formatter(0)(120.0), '120')
+
+
+class GCodeWriterTests(unittest.TestCase):
+    def test_same_as_str(self):
+        # (with the dialect's 3 decimal places) lines are written as str(line)
+        rand = random.Random(0)
+        lines = [Line(l) for l in [
+            'G1 X%.4f Y%.4f E%.5f F1200 ; move' % (rand.random() * 100, rand.random() * 100, rand.random())
+            for i in range(100)
+        ] + ['G28', 'M104 S200', 'T1', 'G92 E0', 'M204 P1000 T2000', '', '; comment', 'X1 Y2']]
+        self.assertEqual(written(lines, keep_text=False), ''.join(str(l) + '\n' for l in lines))
+
+    def test_decimal_places(self):
+        lines = [Line('G1 X1.23456 Y1.23456 E0.0123456')]
+        self.assertEqual(written(lines, decimal_places={'e': 5}, keep_text=False), 'G01 E0.01235 X1.235 Y1.235\n')
+        self.assertEqual(written(lines, default_decimal_places=1, keep_text=False), 'G01 E0 X1.2 Y1.2\n')
+
+    def test_write(self):
+        fileobj = io.StringIO()
+        with GCodeWriter(fileobj) as writer:
+            writer.write(Line('G1 X1').block.gcodes[0], Word('Y', 2), '; text')
+            writer.write()
+        self.assertEqual(fileobj.getvalue(), 'G01 X1 Y2 ; text\n\n')
+
+    def test_buffered(self):
+        fileobj = io.BytesIO()
+        writer = GCodeWriter(fileobj, buffer_size=20)
+        writer.write_lines(['G28', 'M104 S200'])
+        self.assertEqual(fileobj.getvalue(), b'')
+        writer.write_lines(['G1 X10 Y10 Z10'])
+        self.assertEqual(fileobj.getvalue(), b'G28\nM104 S200\nG1 X10 Y10 Z10\n')
+        writer.write_lines(['G28'])
+        writer.flush()
+        self.assertEqual(fileobj.getvalue().splitlines()[-1], b'G28')
+
+    def test_parsed(self):
+        text = 'G90\nG1 X1.5 Y2 F1200\nG1 X3 E0.25\n'
+        self.assertEqual(
+            written(parse_file(io.StringIO(text)), keep_text=False),
+            'G90\nG01 F1200 X1.5 Y2\nG01 E0.25 X3\n',
+        )
+
+    def test_keep_text(self):
+        # only changed lines are formatted
+        text = 'G90\ng1  x1.50000 Y2 F1200 ; move\nG1 X3 E0.25\n\n(comment)\nG1 X4 E.5\r\n'
+        lines = list(parse_file(io.StringIO(text)))
+        self.assertEqual(written(lines), text.replace('\r', ''))
+        lines[1].block.gcodes[0].X = 2
+        lines[2].comment = lines[4].comment  # (block text is kept)
+        lines[5].block.modal_params = []
+        self.assertEqual(written(lines), (
+            'G90\nG01 F1200 X2 Y2 ; move\nG1 X3 E0.25 (comment)\n\n(comment)\nG01 E0.5 X4\n'
+        ))
+        self.assertEqual(written([lines[0].block, lines[1].block]), 'G90\nG01 F1200 X2 Y2\n')
+
+
+@unittest.skipIf(numpy is None, "numpy not installed")
+class WriteMovesTests(unittest.TestCase):
+    def test_columns(self):
+        fileobj = io.StringIO()
+        with GCodeWriter(fileobj, decimal_places={'E': 5}) as writer:
+            writer.write_moves(Word('G', 1), [
+                ('X', numpy.array([1.0, 2.5, -0.0001])),
+                ('Y', numpy.array([numpy.nan, 3.14159, 100.0])),
+                ('E', [0.000001, 0.123456, 2]),
+            ])
+        self.assertEqual(fileobj.getvalue(), (
+            'G01 X1.000 E0.00000\n'
+            'G01 X2.500 Y3.142 E0.12346\n'
+            'G01 X0.000 Y100.000 E2.00000\n'
+        ))
+
+    def test_same_as_rows(self):
+        rand = numpy.random.RandomState(0)
+        values = (rand.rand(1000, 3) - 0.5) * 200
+        values[::7, 1] = numpy.nan
+        (by_column, by_row) = (io.StringIO(), io.StringIO())
+        with GCodeWriter(by_column, buffer_size=1000) as writer:
+            writer.write_moves('G1', [(a, values[:, i]) for (i, a) in enumerate('XYZ')])
+        with GCodeWriter(by_row) as writer:
+            writer.write_lines('G1 ' + ' '.join(
+                '%s%.3f' % (a, v) for (a, v) in zip('XYZ', row) if not numpy.isnan(v)
+            ) for row in values)
+        self.assertEqual(by_column.getvalue(), by_row.getvalue())
+
+    def test_chunked(self):
+        # rows are formatted in chunks of about buffer_size
+        class WriteSizes(io.StringIO):
+            sizes = []
+            def write(self, text):
+                self.sizes.append(len(text))
+                return super(WriteSizes, self).write(text)
+
+        values = numpy.arange(3000, dtype=float).reshape(1000, 3)
+        columns = [(a, values[:, i]) for (i, a) in enumerate('XYZ')]
+        (chunked, whole) = (WriteSizes(), io.StringIO())
+        with GCodeWriter(chunked, buffer_size=1000) as writer:
+            writer.write_moves('G1', columns)
+        with GCodeWriter(whole, buffer_size=10 ** 6) as writer:
+            writer.write_moves('G1', columns)
+        self.assertEqual(chunked.getvalue(), whole.getvalue())
+        self.assertGreater(len(WriteSizes.sizes), 10)
+        self.assertLess(max(WriteSizes.sizes), 2000)
+
+    def test_numpy_values(self):
+        # numpy floats are written with the letter's decimal places
+        with GCodeWriter(io.StringIO(), decimal_places={'E': 5}) as writer:
+            self.assertEqual(writer.formatter('X')(numpy.float64(1.23456)), 'X1.235')
+            self.assertEqual(writer.formatter('E')(numpy.float64(0.0123456)), 'E0.01235')